@@ -0,0 +1,93 @@
+"""
+Cooperative cancellation for running scrapes.
+
+A CancellationToken is created per scraper and handed to every long-running
+stage. Stages check `cancelled` between units of work, register `on_cancel`
+callbacks for things that have to be torn down from outside (browser drivers,
+asyncio tasks), and blocking waits include `token.future` in the set of futures
+they wait on, so a stop wakes them immediately instead of after a poll interval.
+"""
+import asyncio
+import threading
+from concurrent.futures import Future
+from typing import Awaitable, Callable
+
+from loguru import logger
+
+
+class CancelledError(Exception):
+    """Raised by a stage that stopped because its token was cancelled
+
+    `partial` carries the results the stage had already finished, if any, so the
+    caller can keep them.
+    """
+
+    def __init__(self, message: str = "Scrape was cancelled", partial=None):
+        super().__init__(message)
+        self.partial = partial
+
+
+class CancellationToken:
+    """Signal shared by every stage of a scrape that it should stop"""
+
+    def __init__(self):
+        self._event = threading.Event()
+        # Completes on cancel, so it can be waited on alongside real work
+        self.future = Future()
+        self._callbacks = []
+        self._lock = threading.Lock()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def cancel(self):
+        """Request cancellation and run the registered callbacks once"""
+        with self._lock:
+            if self._event.is_set():
+                return
+            self._event.set()
+            callbacks, self._callbacks = self._callbacks, []
+        self.future.set_result(None)
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception as e:
+                logger.error(f"Error in cancellation callback: {e}")
+
+    def raise_if_cancelled(self):
+        if self._event.is_set():
+            raise CancelledError("Scrape was cancelled")
+
+    def wait(self, timeout: float = None) -> bool:
+        """Sleep up to timeout, waking early on cancel; returns whether it was cancelled"""
+        return self._event.wait(timeout)
+
+    def on_cancel(self, callback: Callable[[], None]) -> Callable[[], None]:
+        """Run callback on cancel (now, if already cancelled); returns a function that unregisters it"""
+        with self._lock:
+            if not self._event.is_set():
+                self._callbacks.append(callback)
+                return lambda: self._unregister(callback)
+        callback()
+        return lambda: None
+
+    def _unregister(self, callback: Callable[[], None]):
+        with self._lock:
+            if callback in self._callbacks:
+                self._callbacks.remove(callback)
+
+
+async def run_cancellable(awaitable: Awaitable, token: CancellationToken):
+    """Await in the running event loop, aborting it (and its open requests) on cancel"""
+    task = asyncio.ensure_future(awaitable)
+    loop = asyncio.get_running_loop()
+    unregister = token.on_cancel(lambda: loop.call_soon_threadsafe(task.cancel))
+    try:
+        return await task
+    except asyncio.CancelledError:
+        if token.cancelled:
+            raise CancelledError("Scrape was cancelled")
+        raise
+    finally:
+        unregister()
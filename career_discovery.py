@@ -0,0 +1,383 @@
+"""
+Careers page and ATS feed discovery for portfolio companies.
+
+Instead of guessing careers URLs and scraping their HTML, discovery reads a
+company's robots.txt and sitemaps, picks out careers pages, and looks for a
+Greenhouse, Lever, Ashby or Workday board. When one is found its structured JSON
+feed (see vc_firms.ATS_FEEDS) returns every opening in a single request, or in
+pages of 20 for Workday, up to `max_feed_jobs` postings. If the feed cannot be
+read, the board's hosted HTML page is scraped with its JOB_BOARD_PLATFORMS spec.
+
+Discovery results are cached per domain in data/career_discovery.json. All URLs
+come either from the company's own site or from the `ats_feeds` templates, so the
+whole stage can be pointed at a local HTTP server.
+
+For sites without a sitemap or ATS, CareersPageProber probes every path in
+CAREERS_PAGE_PATHS concurrently and records the winner (or CAREERS_PAGE_NONE)
+on VCPortfolioCompany.careers_page, so later runs skip discovery until the TTL
+expires.
+"""
+import asyncio
+import json
+import re
+import threading
+import xml.etree.ElementTree as ET
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+from urllib.parse import urljoin, urlparse
+from urllib.robotparser import RobotFileParser
+
+import aiohttp
+import requests
+from loguru import logger
+
+from cancellation import CancellationToken, run_cancellable
+from extractors import get_extractor
+from vc_firms import ATS_FEEDS, CAREERS_PAGE_PATHS, JOB_BOARD_PLATFORMS
+
+SITEMAP_NS = '{http://www.sitemaps.org/schemas/sitemap/0.9}'
+
+# Stored in VCPortfolioCompany.careers_page when no careers page was found
+CAREERS_PAGE_NONE = 'none'
+
+# Words in a URL path that mark a careers page, on top of CAREERS_PAGE_PATHS
+CAREER_KEYWORDS = ('career', 'jobs', 'join-us', 'openings', 'positions', 'opportunities')
+
+
+def site_root(website: str) -> str:
+    """Return the scheme and host of a website URL"""
+    if '://' not in website:
+        website = f"https://{website}"
+    parsed = urlparse(website)
+    return f"{parsed.scheme}://{parsed.netloc}"
+
+
+def domain_of(website: str) -> str:
+    """Return the cache key for a website, e.g. "example.com" """
+    netloc = urlparse(site_root(website)).netloc.lower()
+    return netloc[4:] if netloc.startswith('www.') else netloc
+
+
+def is_careers_url(url: str) -> bool:
+    """Whether a URL looks like a careers or jobs page"""
+    path = urlparse(url).path.lower().rstrip('/')
+    if any(path == p or path.startswith(p + '/') for p in CAREERS_PAGE_PATHS):
+        return True
+    return any(keyword in path for keyword in CAREER_KEYWORDS)
+
+
+def _dig(item: Any, path: Optional[str]) -> Any:
+    """Follow a dotted path through nested dicts"""
+    if not path:
+        return item
+    for key in path.split('.'):
+        if not isinstance(item, dict):
+            return None
+        item = item.get(key)
+    return item
+
+
+class CareerDiscovery:
+    """Discover careers pages and ATS job feeds for company websites"""
+
+    def __init__(self, storage_dir: str = 'data', ttl_hours: float = 24 * 7,
+                 session: Optional[requests.Session] = None,
+                 ats_feeds: Optional[Dict[str, Dict]] = None,
+                 board_pages: Optional[Dict[str, Dict]] = None,
+                 timeout: float = 10, max_sitemaps: int = 5, max_feed_jobs: int = 2000):
+        self.storage_dir = Path(storage_dir)
+        self.storage_dir.mkdir(exist_ok=True)
+        self.cache_file = self.storage_dir / 'career_discovery.json'
+        self.ttl = timedelta(hours=ttl_hours)
+        self.session = session or requests.Session()
+        self.ats_feeds = ats_feeds or ATS_FEEDS
+        self.board_pages = board_pages or JOB_BOARD_PLATFORMS
+        self.timeout = timeout
+        self.max_sitemaps = max_sitemaps
+        self.max_feed_jobs = max_feed_jobs
+        self._lock = threading.Lock()
+        self._patterns = [
+            (platform, re.compile(pattern))
+            for platform, feed in self.ats_feeds.items()
+            for pattern in feed['board_patterns']
+        ]
+        self._load_cache()
+
+    def _load_cache(self):
+        """Load cached discovery results"""
+        try:
+            if self.cache_file.exists():
+                with open(self.cache_file, 'r') as f:
+                    self.cache = json.load(f)
+            else:
+                self.cache = {}
+        except Exception as e:
+            logger.error(f"Error loading career discovery cache: {e}")
+            self.cache = {}
+
+    def _save_cache(self):
+        """Save cached discovery results"""
+        try:
+            with open(self.cache_file, 'w') as f:
+                json.dump(self.cache, f, indent=2)
+        except Exception as e:
+            logger.error(f"Error saving career discovery cache: {e}")
+
+    def _get(self, url: str) -> str:
+        """GET a URL and return its body, or an empty string"""
+        try:
+            response = self.session.get(url, timeout=self.timeout)
+            if response.status_code == 200:
+                return response.text
+            logger.debug(f"Non-200 status code {response.status_code} for {url}")
+        except Exception as e:
+            logger.debug(f"Error fetching {url}: {e}")
+        return ""
+
+    def detect_ats(self, text: str) -> Optional[Dict[str, Any]]:
+        """Find an ATS board reference in a blob of URLs or HTML"""
+        for platform, pattern in self._patterns:
+            match = pattern.search(text)
+            if match:
+                return {'platform': platform, 'board': match.groupdict()}
+        return None
+
+    def _read_robots(self, root: str) -> RobotFileParser:
+        robots = RobotFileParser(urljoin(root, '/robots.txt'))
+        robots.parse(self._get(robots.url).splitlines())
+        return robots
+
+    def _read_sitemaps(self, sitemap_urls: List[str], robots: RobotFileParser) -> List[str]:
+        """Collect page URLs from sitemaps, following sitemap indexes"""
+        pending = list(sitemap_urls)
+        pages = []
+        read = 0
+        while pending and read < self.max_sitemaps:
+            sitemap_url = pending.pop(0)
+            if not robots.can_fetch('*', sitemap_url):
+                continue
+            body = self._get(sitemap_url)
+            read += 1
+            if not body:
+                continue
+            try:
+                root = ET.fromstring(body.encode('utf-8'))
+            except ET.ParseError as e:
+                logger.debug(f"Invalid sitemap {sitemap_url}: {e}")
+                continue
+            locs = [loc.text.strip() for loc in root.iter(f'{SITEMAP_NS}loc') if loc.text]
+            if root.tag == f'{SITEMAP_NS}sitemapindex':
+                # Prefer child sitemaps that look job related
+                pending.extend(sorted(locs, key=lambda url: not is_careers_url(url)))
+            else:
+                pages.extend(locs)
+        return pages
+
+    def _discover(self, website: str, careers_page: Optional[str] = None) -> Dict[str, Any]:
+        root = site_root(website)
+        robots = self._read_robots(root)
+        sitemaps = robots.site_maps() or [urljoin(root, '/sitemap.xml')]
+        pages = self._read_sitemaps(sitemaps, robots)
+
+        careers_urls = [url for url in pages if is_careers_url(url)]
+        if careers_page and careers_page not in careers_urls:
+            # A page found by CareersPageProber is checked first
+            careers_urls.insert(0, careers_page)
+        ats = self.detect_ats('\n'.join(careers_urls or pages))
+        if ats is None:
+            # ATS boards are usually linked or embedded from the careers page
+            for url in careers_urls[:3] or [urljoin(root, path) for path in CAREERS_PAGE_PATHS[:2]]:
+                if robots.can_fetch('*', url):
+                    ats = self.detect_ats(self._get(url))
+                    if ats:
+                        break
+
+        return {
+            'domain': domain_of(website),
+            'careers_urls': careers_urls[:20],
+            'ats': ats,
+            'checked': datetime.now().isoformat()
+        }
+
+    def discover(self, website: str, refresh: bool = False,
+                 careers_page: Optional[str] = None) -> Dict[str, Any]:
+        """Return careers pages and ATS board for a website, using the domain cache
+
+        `careers_page` is a known careers URL, e.g. from CareersPageProber, to look
+        for an ATS board on besides the pages listed in the sitemaps.
+        """
+        domain = domain_of(website)
+        cached = self.cache.get(domain)
+        if cached and not refresh:
+            if datetime.now() - datetime.fromisoformat(cached['checked']) < self.ttl:
+                return cached
+
+        result = self._discover(website, careers_page)
+        with self._lock:
+            self.cache[domain] = result
+            self._save_cache()
+        return result
+
+    def _read_feed(self, feed: Dict[str, Any], url: str) -> List[Any]:
+        """Read every item of a feed, following its offset pages if it has a total"""
+        payload = dict(feed.get('payload', {}))
+        items = []
+        total = None
+        while True:
+            if feed.get('method') == 'POST':
+                response = self.session.post(url, json=payload, timeout=self.timeout)
+            else:
+                response = self.session.get(url, timeout=self.timeout)
+            response.raise_for_status()
+            data = response.json()
+            page = _dig(data, feed.get('jobs_path')) or []
+            items.extend(page)
+            if not feed.get('total_path'):
+                return items
+            if total is None:
+                # Workday only reports the total on the first page
+                total = _dig(data, feed['total_path']) or 0
+            payload['offset'] = payload.get('offset', 0) + len(page)
+            if not page or payload['offset'] >= min(total, self.max_feed_jobs):
+                return items
+
+    def fetch_feed(self, platform: str, board: Dict[str, str],
+                   company: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Fetch all openings from an ATS board's JSON feed"""
+        feed = self.ats_feeds[platform]
+        url = feed['feed_url'].format(**board)
+        try:
+            items = self._read_feed(feed, url)
+        except Exception as e:
+            logger.error(f"Error fetching {feed['name']} feed {url}: {e}")
+            return self.fetch_board_page(platform, board, company)
+
+        url_prefix = feed.get('url_prefix', '').format(**board)
+        jobs = []
+        for item in items:
+            job = {key: _dig(item, path) for key, path in feed['fields'].items()}
+            if not job.get('title') or not job.get('url'):
+                continue
+            if url_prefix and job['url'].startswith('/'):
+                job['url'] = url_prefix + job['url']
+            if feed.get('date_format') == 'epoch_ms' and job.get('date_posted'):
+                job['date_posted'] = datetime.fromtimestamp(job['date_posted'] / 1000).isoformat()
+            job['location'] = job.get('location') or ''
+            job['company'] = company or next(iter(board.values()))
+            job['source'] = feed['name']
+            jobs.append(job)
+        return jobs
+
+    def fetch_board_page(self, platform: str, board: Dict[str, str],
+                         company: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Scrape openings from an ATS board's hosted HTML page"""
+        feed = self.ats_feeds[platform]
+        spec = self.board_pages.get(platform)
+        if not spec or not feed.get('board_url'):
+            return []
+        url = feed['board_url'].format(**board)
+        html = self._get(url)
+        if not html:
+            return []
+
+        jobs = get_extractor(f"ats:{platform}", spec)(html)
+        for job in jobs:
+            job['url'] = urljoin(url, job.get('url') or '')
+            job['location'] = job.get('location') or ''
+            job['company'] = company or next(iter(board.values()))
+            job.setdefault('source', feed['name'])
+        return jobs
+
+    def fetch_jobs(self, website: str, company: Optional[str] = None,
+                   careers_page: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Return a company's openings from its ATS feed, if one was discovered"""
+        discovery = self.discover(website, careers_page=careers_page)
+        ats = discovery.get('ats')
+        if not ats:
+            return []
+        return self.fetch_feed(ats['platform'], ats['board'], company)
+
+
+class CareersPageProber:
+    """Probe all candidate careers paths of many sites concurrently"""
+
+    def __init__(self, paths: Optional[List[str]] = None, per_host_limit: int = 4,
+                 total_limit: int = 100, timeout: float = 10,
+                 cancel_token: Optional[CancellationToken] = None):
+        self.paths = paths or CAREERS_PAGE_PATHS
+        self.per_host_limit = per_host_limit
+        self.total_limit = total_limit
+        self.timeout = timeout
+        self.cancel_token = cancel_token
+
+    async def _probe_path(self, session: aiohttp.ClientSession, url: str) -> Optional[str]:
+        """HEAD a candidate URL, falling back to GET for servers that refuse HEAD"""
+        try:
+            async with session.head(url, allow_redirects=True) as response:
+                status, final_url = response.status, str(response.url)
+            if status in (403, 405, 501):
+                async with session.get(url, allow_redirects=True) as response:
+                    status, final_url = response.status, str(response.url)
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            return None
+        except Exception as e:
+            logger.debug(f"Error probing {url}: {e}")
+            return None
+
+        # A redirect back to the home page is not a careers page
+        if status == 200 and urlparse(final_url).path.strip('/'):
+            return final_url
+        return None
+
+    async def probe(self, session: aiohttp.ClientSession, website: str) -> Optional[str]:
+        """Return the first candidate careers URL that responds, or None"""
+        root = site_root(website)
+        tasks = [asyncio.ensure_future(self._probe_path(session, urljoin(root, path)))
+                 for path in self.paths]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                url = await next_done
+                if url:
+                    return url
+            return None
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def probe_all(self, websites: List[str]) -> Dict[str, Optional[str]]:
+        """Probe many websites concurrently under per-host connection limits"""
+        connector = aiohttp.TCPConnector(limit=self.total_limit, limit_per_host=self.per_host_limit)
+        timeout = aiohttp.ClientTimeout(total=self.timeout)
+        async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+            probes = asyncio.gather(*(self.probe(session, website) for website in websites))
+            if self.cancel_token is not None:
+                # Cancelling aborts every open request
+                results = await run_cancellable(probes, self.cancel_token)
+            else:
+                results = await probes
+        return dict(zip(websites, results))
+
+    def probe_companies(self, db_session, companies: List, ttl_hours: float = 24 * 7) -> int:
+        """Find careers pages for portfolio companies whose cached result has expired
+
+        Returns the number of companies probed.
+        """
+        now = datetime.utcnow()
+        ttl = timedelta(hours=ttl_hours)
+        due = [
+            company for company in companies
+            if company.website and (
+                not company.careers_page_checked or now - company.careers_page_checked >= ttl
+            )
+        ]
+        if not due:
+            return 0
+
+        results = asyncio.run(self.probe_all(list({company.website for company in due})))
+        for company in due:
+            company.careers_page = results[company.website] or CAREERS_PAGE_NONE
+            company.careers_page_checked = now
+        db_session.commit()
+        logger.info(f"Probed careers pages for {len(due)} companies")
+        return len(due)
@@ -0,0 +1,160 @@
+"""
+Checkpoints for resuming interrupted scrape runs.
+
+While a run is active, the checkpoint records which search tasks have finished
+and, for each task still in progress, the listing pages fetched so far along
+with their postings (the batch that has not reached JobStorage yet). Updates
+only touch memory; the file is rewritten at most every `flush_seconds`, so the
+cost per page is a dict insert. A run started with the same config while a
+checkpoint exists skips the finished tasks and continues the others from their
+saved pages. The checkpoint is removed once a run finishes.
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, List
+
+from loguru import logger
+
+from pagination import UnchangedPage
+from parse_pool import ParsedPage
+
+
+def config_fingerprint(config: Dict[str, Any]) -> str:
+    """Stable hash of a scrape config"""
+    return hashlib.sha1(json.dumps(config, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
+
+class RunCheckpoint:
+    """Progress of the current scrape run, persisted for resuming"""
+
+    def __init__(self, storage_dir: str = 'data', flush_seconds: float = 15,
+                 max_age_hours: float = 24):
+        self.storage_dir = Path(storage_dir)
+        self.storage_dir.mkdir(exist_ok=True)
+        self.checkpoint_file = self.storage_dir / 'checkpoint.json'
+        self.flush_seconds = flush_seconds
+        self.max_age = timedelta(hours=max_age_hours)
+        self.active = False
+        self.state: Dict[str, Any] = {}
+        self._completed = set()
+        self._dirty = False
+        self._last_flush = 0.0
+        self._lock = threading.Lock()
+
+    def _load_data(self) -> Dict[str, Any]:
+        """Load the saved checkpoint, if any"""
+        try:
+            if self.checkpoint_file.exists():
+                with open(self.checkpoint_file, 'r') as f:
+                    return json.load(f)
+        except Exception as e:
+            logger.error(f"Error loading checkpoint: {e}")
+        return {}
+
+    def start(self, config: Dict[str, Any]) -> bool:
+        """Begin a run, resuming the saved checkpoint if it matches; returns whether it resumed"""
+        fingerprint = config_fingerprint(config)
+        saved = self._load_data()
+        resumed = (
+            saved.get('config') == fingerprint
+            and datetime.now() - datetime.fromisoformat(saved['started']) < self.max_age
+        )
+        with self._lock:
+            if resumed:
+                self.state = saved
+                self.state['resumes'] = saved.get('resumes', 0) + 1
+            else:
+                self.state = {
+                    'config': fingerprint,
+                    'started': datetime.now().isoformat(),
+                    'resumes': 0,
+                    'completed': [],
+                    'pages': {}
+                }
+            self._completed = set(self.state['completed'])
+            self.active = True
+            self._dirty = True
+        self.flush()
+        return resumed
+
+    def is_completed(self, key: str) -> bool:
+        return key in self._completed if self.active else False
+
+    def pages(self, key: str) -> Dict[int, List[Dict]]:
+        """Pages already fetched for an unfinished task, keyed by page number"""
+        if not self.active:
+            return {}
+        with self._lock:
+            saved = dict(self.state['pages'].get(key, {}))
+        pages = {}
+        for page, entry in saved.items():
+            jobs = entry['jobs']
+            if 'unchanged' in entry:
+                jobs = UnchangedPage(entry['unchanged'])
+            elif 'matched' in entry:
+                jobs = ParsedPage(jobs, [jobs[i] for i in entry['matched']])
+            pages[int(page)] = jobs
+        return pages
+
+    def record_page(self, key: str, page: int, jobs: List[Dict]):
+        """Remember a fetched page of an unfinished task"""
+        if not self.active:
+            return
+        entry = {'jobs': list(jobs)}
+        if isinstance(jobs, UnchangedPage):
+            entry['unchanged'] = jobs.size
+        elif isinstance(jobs, ParsedPage):
+            matched = {id(job) for job in jobs.matched}
+            entry['matched'] = [i for i, job in enumerate(jobs) if id(job) in matched]
+        with self._lock:
+            self.state['pages'].setdefault(key, {})[str(page)] = entry
+            self._dirty = True
+        self.maybe_flush()
+
+    def complete_task(self, key: str):
+        """Mark a task done once its postings are stored"""
+        if not self.active:
+            return
+        with self._lock:
+            self.state['pages'].pop(key, None)
+            if key not in self._completed:
+                self._completed.add(key)
+                self.state['completed'].append(key)
+            self._dirty = True
+        self.maybe_flush()
+
+    def maybe_flush(self):
+        """Write the checkpoint if it changed and the flush interval has passed"""
+        if self._dirty and time.monotonic() - self._last_flush >= self.flush_seconds:
+            self.flush()
+
+    def flush(self):
+        """Write the checkpoint now"""
+        with self._lock:
+            if not self.active or not self._dirty:
+                return
+            try:
+                # Write to a temporary file first so a crash never leaves a torn checkpoint
+                tmp_file = self.checkpoint_file.with_suffix('.tmp')
+                with open(tmp_file, 'w') as f:
+                    json.dump(self.state, f)
+                os.replace(tmp_file, self.checkpoint_file)
+                self._dirty = False
+                self._last_flush = time.monotonic()
+            except Exception as e:
+                logger.error(f"Error saving checkpoint: {e}")
+
+    def finish(self):
+        """End the run and remove its checkpoint"""
+        with self._lock:
+            self.active = False
+            self._dirty = False
+            try:
+                self.checkpoint_file.unlink(missing_ok=True)
+            except Exception as e:
+                logger.error(f"Error removing checkpoint: {e}")
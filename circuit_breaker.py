@@ -0,0 +1,147 @@
+"""
+Per-host circuit breakers and a per-run retry budget for page fetches.
+
+A breaker opens when the failure rate over its recent requests crosses a
+threshold; while open, fetches to that host fail fast with CircuitOpenError.
+After a cooldown it half-opens and lets a single probe through, closing again
+if the probe succeeds. The retry budget caps retries at a fraction of all
+requests made in a run, so a dead board cannot turn a run into minutes of
+backoff waits.
+"""
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, List
+
+
+class CircuitOpenError(Exception):
+    """Raised when a request is refused because its circuit is open"""
+
+
+class CircuitBreaker:
+    """Failure-rate circuit breaker for a single source or host"""
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half-open'
+
+    def __init__(self, name: str, failure_threshold: float = 0.5, min_requests: int = 10,
+                 window: int = 20, cooldown_seconds: float = 60):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.min_requests = min_requests
+        self.cooldown_seconds = cooldown_seconds
+        self.state = self.CLOSED
+        self.opened_at = None
+        self._outcomes = deque(maxlen=window)
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        """Whether a request may be made now"""
+        with self._lock:
+            if self.state == self.OPEN:
+                if time.monotonic() - self.opened_at < self.cooldown_seconds:
+                    return False
+                self.state = self.HALF_OPEN
+                self._probe_in_flight = False
+            if self.state == self.HALF_OPEN:
+                # Only one probe at a time while half-open
+                if self._probe_in_flight:
+                    return False
+                self._probe_in_flight = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            if self.state == self.HALF_OPEN:
+                self.state = self.CLOSED
+                self._outcomes.clear()
+            self._outcomes.append(True)
+
+    def record_failure(self):
+        with self._lock:
+            if self.state == self.HALF_OPEN:
+                self._open()
+                return
+            self._outcomes.append(False)
+            if len(self._outcomes) >= self.min_requests and self.failure_rate >= self.failure_threshold:
+                self._open()
+
+    def _open(self):
+        self.state = self.OPEN
+        self.opened_at = time.monotonic()
+        self._probe_in_flight = False
+
+    @property
+    def failure_rate(self) -> float:
+        if not self._outcomes:
+            return 0.0
+        return self._outcomes.count(False) / len(self._outcomes)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Current state for display"""
+        with self._lock:
+            retry_in = None
+            if self.state == self.OPEN:
+                retry_in = max(0.0, self.cooldown_seconds - (time.monotonic() - self.opened_at))
+            return {
+                'source': self.name,
+                'state': self.state,
+                'requests': len(self._outcomes),
+                'failure_rate': round(self.failure_rate, 2),
+                'retry_in_seconds': None if retry_in is None else round(retry_in)
+            }
+
+
+class BreakerRegistry:
+    """Circuit breakers keyed by source or host, created on first use"""
+
+    def __init__(self, **breaker_options):
+        self.breaker_options = breaker_options
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._lock = threading.Lock()
+
+    def get(self, name: str) -> CircuitBreaker:
+        breaker = self._breakers.get(name)
+        if breaker is None:
+            with self._lock:
+                breaker = self._breakers.setdefault(name, CircuitBreaker(name, **self.breaker_options))
+        return breaker
+
+    def snapshot(self) -> List[Dict[str, Any]]:
+        """State of every breaker, sorted by name"""
+        return [self._breakers[name].snapshot() for name in sorted(self._breakers)]
+
+
+class RetryBudget:
+    """Cap retries at a fraction of the requests made in a run"""
+
+    def __init__(self, ratio: float = 0.2, min_retries: int = 10):
+        self.ratio = ratio
+        self.min_retries = min_retries
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Start a new run"""
+        with self._lock:
+            self.requests = 0
+            self.retries = 0
+
+    def record_request(self):
+        with self._lock:
+            self.requests += 1
+
+    def try_acquire(self) -> bool:
+        """Spend one retry from the budget, if any is left"""
+        with self._lock:
+            if self.retries >= max(self.min_retries, self.ratio * self.requests):
+                return False
+            self.retries += 1
+            return True
+
+
+# Shared by every fetch in the process
+breakers = BreakerRegistry()
+retry_budget = RetryBudget()
@@ -0,0 +1,363 @@
+"""
+Columnar snapshot of the stored postings for analytics loads.
+
+jobs.json has to be parsed in full, into one Python dict per posting, before
+pandas sees any of it. The snapshot in data/snapshot/ keeps the same postings as
+NumPy `.npy` column files that are memory-mapped on load, so a reader only
+touches the columns it asks for:
+
+    categoricals (source, company, ...)   int32 codes; the string table is in the manifest
+    dates                                 int64 nanoseconds (NaT for missing)
+    salary                                float64, plus the posted text as a text column
+    remote                                bool
+    everything else                       text: UTF-8 bytes and int64 row offsets
+
+JobStorage only ever appends postings, so every refresh appends the postings
+stored since the last one as a segment of column files. JobStorage refreshes the
+snapshot once at the end of each scrape run or ingest, so it lags jobs.json while
+a run is in progress. Once there are more than MAX_SEGMENTS segments they are
+compacted into one. manifest.json lists the segments and is replaced atomically
+after their files are written, so a reader never sees a half-written segment.
+Segments replaced by a compaction or rebuild are retired rather than deleted:
+segment ids are never reused, and a retired segment's files are only removed by
+a write RETIRE_SECONDS later, so a reader that loaded the previous manifest can
+still open and map them.
+Empty text is read back as missing, and non-string values of text fields (lists
+of skills, for example) are stored as JSON.
+"""
+import json
+import os
+import re
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+from loguru import logger
+
+from job_frame import CATEGORICAL_COLUMNS, DATE_COLUMNS, TEXT_COLUMNS, is_remote, parse_dates
+from rollups import parse_salary
+
+MAX_SEGMENTS = 8
+# How long the files of replaced segments are kept for readers of an older manifest
+RETIRE_SECONDS = 600
+# Elements copied at a time when segments are merged
+WRITE_BLOCK = 1 << 20
+
+# Characters not allowed in column file names
+_UNSAFE = re.compile(r'[^\w-]')
+
+
+def _kind(name: str) -> str:
+    if name in CATEGORICAL_COLUMNS:
+        return 'category'
+    if name in DATE_COLUMNS:
+        return 'datetime'
+    if name == 'salary':
+        return 'float'
+    if name == 'remote':
+        return 'bool'
+    return 'text'
+
+
+def _encode_text(value: Any) -> bytes:
+    if value is None:
+        return b''
+    if not isinstance(value, str):
+        value = json.dumps(value)
+    return value.encode('utf-8')
+
+
+class ColumnarSnapshot:
+    """Append-only column files of the stored postings"""
+
+    def __init__(self, storage_dir: str = 'data'):
+        self.directory = Path(storage_dir) / 'snapshot'
+        self.manifest_file = self.directory / 'manifest.json'
+        self._category_codes: Dict[str, Dict[str, int]] = {}
+        self._load_manifest()
+
+    def _load_manifest(self):
+        """Load the list of segments from storage"""
+        try:
+            if self.manifest_file.exists():
+                with open(self.manifest_file, 'r') as f:
+                    self.manifest = json.load(f)
+            else:
+                self.manifest = {'rows': 0, 'next_segment': 0, 'segments': [], 'categories': {}}
+        except Exception as e:
+            logger.error(f"Error loading snapshot manifest: {e}")
+            self.manifest = {'rows': 0, 'next_segment': 0, 'segments': [], 'categories': {}}
+        self._category_codes = {}
+
+    def _save_manifest(self):
+        temp_file = self.manifest_file.with_suffix('.tmp')
+        with open(temp_file, 'w') as f:
+            json.dump(self.manifest, f)
+        os.replace(temp_file, self.manifest_file)
+
+    @property
+    def exists(self) -> bool:
+        return self.manifest_file.exists()
+
+    @property
+    def rows(self) -> int:
+        return self.manifest['rows']
+
+    def _path(self, segment: int, name: str, part: str = 'values') -> Path:
+        return self.directory / f"{segment:06d}.{_UNSAFE.sub('_', name)}.{part}.npy"
+
+    # Writing
+
+    def refresh(self, jobs: List[Dict[str, Any]]):
+        """Bring the snapshot up to date with the stored postings"""
+        try:
+            if len(jobs) < self.rows:
+                # The store was replaced rather than appended to
+                self.rebuild(jobs)
+            elif len(jobs) > self.rows:
+                self.append(jobs[self.rows:])
+        except Exception as e:
+            logger.error(f"Error refreshing snapshot: {e}")
+
+    def rebuild(self, jobs: Iterable[Dict[str, Any]]):
+        """Write the snapshot from scratch, retiring the current segments"""
+        self._retire(self.manifest['segments'])
+        self.manifest = dict(self.manifest, rows=0, segments=[], categories={})
+        self._category_codes = {}
+        self.append(jobs)
+
+    def _retire(self, segments: List[Dict[str, Any]]):
+        """Note segments that are leaving the manifest so their files can be purged later"""
+        now = time.time()
+        self.manifest.setdefault('retired', []).extend({'id': entry['id'], 'at': now} for entry in segments)
+
+    def _purge(self):
+        """Delete the files of segments retired more than RETIRE_SECONDS ago"""
+        retired = self.manifest.get('retired', [])
+        cutoff = time.time() - RETIRE_SECONDS
+        kept = [entry for entry in retired if entry['at'] >= cutoff]
+        if len(kept) == len(retired):
+            return
+        for entry in retired:
+            if entry['at'] >= cutoff:
+                continue
+            try:
+                for path in self.directory.glob(f"{entry['id']:06d}.*"):
+                    path.unlink()
+            except OSError as e:
+                # Still open somewhere (Windows does not delete mapped files); try again next time
+                logger.warning(f"Could not remove snapshot segment {entry['id']}: {e}")
+                kept.append(entry)
+        self.manifest['retired'] = kept
+        self._save_manifest()
+
+    def append(self, jobs: Iterable[Dict[str, Any]]):
+        """Write postings as a new segment"""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        columns: Dict[str, List[Any]] = {}
+        remote = []
+        rows = 0
+        for job in jobs:
+            for key, value in job.items():
+                column = columns.get(key)
+                if column is None:
+                    column = columns[key] = [None] * rows
+                column.append(value)
+            remote.append(is_remote(job))
+            rows += 1
+            for column in columns.values():
+                if len(column) < rows:
+                    column.append(None)
+        if not rows:
+            self._save_manifest()
+            return
+        if 'salary' in columns:
+            # Keep the posted text next to the parsed salary, as typed_frame does
+            columns = dict(
+                item for name, values in columns.items()
+                for item in ([(name, values), ('salary_text', values)] if name == 'salary' else [(name, values)])
+            )
+        columns['remote'] = remote
+
+        segment = self.manifest['next_segment']
+        kinds = {}
+        for name, values in columns.items():
+            kind = 'text' if name == 'salary_text' else _kind(name)
+            self._write_column(segment, name, kind, values)
+            kinds[name] = kind
+        self.manifest['segments'].append({'id': segment, 'rows': rows, 'columns': kinds})
+        self.manifest['next_segment'] = segment + 1
+        self.manifest['rows'] += rows
+        self._save_manifest()
+        if len(self.manifest['segments']) > MAX_SEGMENTS:
+            self.compact()
+        self._purge()
+
+    def _write_column(self, segment: int, name: str, kind: str, values: List[Any]):
+        if kind == 'category':
+            table = self.manifest['categories'].setdefault(name, [])
+            codes = self._category_codes.get(name)
+            if codes is None:
+                codes = self._category_codes[name] = {value: code for code, value in enumerate(table)}
+            array = np.empty(len(values), dtype=np.int32)
+            for row, value in enumerate(values):
+                if value is None:
+                    array[row] = -1
+                    continue
+                value = str(value)
+                code = codes.get(value)
+                if code is None:
+                    code = codes[value] = len(table)
+                    table.append(value)
+                array[row] = code
+            np.save(self._path(segment, name), array)
+        elif kind == 'datetime':
+            dates = parse_dates(values)
+            np.save(self._path(segment, name), dates.to_numpy('datetime64[ns]').view(np.int64))
+        elif kind == 'float':
+            np.save(self._path(segment, name), np.array([parse_salary(value) for value in values], dtype=np.float64))
+        elif kind == 'bool':
+            np.save(self._path(segment, name), np.array(values, dtype=bool))
+        else:
+            encoded = [_encode_text(value) for value in values]
+            offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+            np.cumsum([len(value) for value in encoded], out=offsets[1:])
+            np.save(self._path(segment, name, 'offsets'), offsets)
+            np.save(self._path(segment, name), np.frombuffer(b''.join(encoded), dtype=np.uint8))
+
+    def compact(self):
+        """Merge all segments into one"""
+        segments = self.manifest['segments']
+        segment = self.manifest['next_segment']
+        kinds = {}
+        for entry in segments:
+            for name, kind in entry['columns'].items():
+                kinds.setdefault(name, kind)
+        for name, kind in kinds.items():
+            parts = [self._segment_arrays(entry, name, kind) for entry in segments]
+            self._write_merged(self._path(segment, name), [part['values'] for part in parts])
+            if kind == 'text':
+                # Offsets of each segment continue from the end of the previous one
+                bases, base = [], 0
+                for part in parts:
+                    bases.append(base)
+                    base += int(part['offsets'][-1])
+                self._write_merged(self._path(segment, name, 'offsets'), [part['offsets'] for part in parts],
+                                   add=bases, skip=1, lead=np.zeros(1, dtype=np.int64))
+        self._retire(segments)
+        self.manifest['segments'] = [{'id': segment, 'rows': self.rows, 'columns': kinds}]
+        self.manifest['next_segment'] = segment + 1
+        self._save_manifest()
+        logger.info(f"Compacted {len(segments)} snapshot segments")
+
+    @staticmethod
+    def _blocks(array: np.ndarray, skip: int = 0) -> Iterable[np.ndarray]:
+        """Elements of an array after the first `skip`, a block at a time"""
+        if isinstance(array, np.memmap):
+            # Read through the file rather than the mapping so merged pages do not stay resident
+            with open(array.filename, 'rb') as f:
+                f.seek(array.offset + skip * array.itemsize)
+                remaining = len(array) - skip
+                while remaining > 0:
+                    count = min(WRITE_BLOCK, remaining)
+                    yield np.frombuffer(f.read(count * array.itemsize), dtype=array.dtype)
+                    remaining -= count
+        else:
+            for start in range(skip, len(array), WRITE_BLOCK):
+                yield array[start:start + WRITE_BLOCK]
+
+    def _write_merged(self, path: Path, arrays: List[np.ndarray], add: Optional[List[int]] = None,
+                      skip: int = 0, lead: Optional[np.ndarray] = None):
+        """Write arrays end to end as one .npy file without concatenating them in memory
+        
+        The first `skip` elements of every array are left out, `add[i]` is added
+        to the elements of array i and `lead` is written before all of them.
+        """
+        dtype = arrays[0].dtype
+        rows = sum(len(array) - skip for array in arrays) + (len(lead) if lead is not None else 0)
+        header = {'descr': np.lib.format.dtype_to_descr(dtype), 'fortran_order': False, 'shape': (rows,)}
+        with open(path, 'wb') as f:
+            np.lib.format.write_array_header_1_0(f, header)
+            if lead is not None:
+                f.write(lead.astype(dtype).tobytes())
+            for index, array in enumerate(arrays):
+                for block in self._blocks(array, skip):
+                    if add is not None:
+                        block = block + add[index]
+                    f.write(block.astype(dtype, copy=False).tobytes())
+
+    # Reading
+
+    def _segment_arrays(self, entry: Dict[str, Any], name: str, kind: str) -> Dict[str, np.ndarray]:
+        """Memory-mapped arrays of one column in one segment, or fill values if it lacks the column"""
+        rows = entry['rows']
+        if name not in entry['columns']:
+            if kind == 'category':
+                return {'values': np.full(rows, -1, dtype=np.int32)}
+            if kind == 'datetime':
+                return {'values': np.full(rows, np.iinfo(np.int64).min, dtype=np.int64)}
+            if kind == 'float':
+                return {'values': np.full(rows, np.nan)}
+            if kind == 'bool':
+                return {'values': np.zeros(rows, dtype=bool)}
+            return {'values': np.zeros(0, dtype=np.uint8), 'offsets': np.zeros(rows + 1, dtype=np.int64)}
+        arrays = {'values': np.load(self._path(entry['id'], name), mmap_mode='r')}
+        if kind == 'text':
+            arrays['offsets'] = np.load(self._path(entry['id'], name, 'offsets'), mmap_mode='r')
+        return arrays
+
+    def _column_arrays(self, name: str, kind: str) -> Dict[str, np.ndarray]:
+        """Arrays of one column over all segments; memory-mapped when there is a single segment"""
+        parts = [self._segment_arrays(entry, name, kind) for entry in self.manifest['segments']]
+        if len(parts) == 1:
+            return parts[0]
+        if kind != 'text':
+            return {'values': np.concatenate([part['values'] for part in parts])}
+        offsets = [np.zeros(1, dtype=np.int64)]
+        base = 0
+        for part in parts:
+            offsets.append(part['offsets'][1:] + base)
+            base += int(part['offsets'][-1])
+        return {
+            'values': np.concatenate([part['values'] for part in parts]),
+            'offsets': np.concatenate(offsets)
+        }
+
+    def columns(self) -> Dict[str, str]:
+        """Every column in the snapshot and its kind, in order of first appearance"""
+        kinds = {}
+        for entry in self.manifest['segments']:
+            for name, kind in entry['columns'].items():
+                kinds.setdefault(name, kind)
+        return kinds
+
+    def read_column(self, name: str, kind: str) -> pd.Series:
+        arrays = self._column_arrays(name, kind)
+        values = arrays['values']
+        if kind == 'category':
+            return pd.Series(pd.Categorical.from_codes(values, self.manifest['categories'].get(name, [])))
+        if kind == 'datetime':
+            return pd.Series(np.asarray(values).view('datetime64[ns]'))
+        if kind in ('float', 'bool'):
+            return pd.Series(values)
+        data = values.tobytes()
+        offsets = arrays['offsets'].tolist()
+        return pd.Series([
+            data[start:end].decode('utf-8') if end > start else None
+            for start, end in zip(offsets, offsets[1:])
+        ])
+
+    def read_frame(self, columns: Optional[Iterable[str]] = None, full: bool = False) -> pd.DataFrame:
+        """Typed frame of the postings like job_frame.typed_frame, reading only the given columns"""
+        wanted = set(columns) if columns is not None else None
+        frame = {}
+        for name, kind in self.columns().items():
+            if wanted is not None and name not in wanted:
+                continue
+            if wanted is None and not full and (name in TEXT_COLUMNS or name == 'salary_text'):
+                continue
+            frame[name] = self.read_column(name, kind)
+        return pd.DataFrame(frame, index=pd.RangeIndex(self.rows))
+
@@ -0,0 +1,251 @@
+"""
+Company enrichment backed by the `companies` table.
+
+Crunchbase lookups go through Selenium and take seconds each, so enrichment
+serves company info from the `companies` table whenever the row is younger than
+`ttl_hours`. Stale rows are returned immediately and refreshed in the background.
+Names that Crunchbase does not know are stored as negative entries (data_source
+NOT_FOUND_SOURCE) and not searched again until `negative_ttl_hours` has passed.
+
+Concurrent lookups of the same company are coalesced by SingleFlight, keyed by
+the normalized company name, and enrich_many() resolves all distinct companies
+of a scrape with bounded parallelism on a DriverPool. enrich_companies() runs a
+batch on a pool of its own; JobScraper calls it after a run when the config sets
+`enrich_companies`.
+"""
+import re
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Iterable, Optional
+
+from loguru import logger
+from sqlalchemy import func
+
+from cancellation import CancellationToken
+from crunchbase_scraper import CrunchbaseScraper
+from driver_pool import DriverPool
+from job_scraper import Company
+
+CRUNCHBASE_SOURCE = 'Crunchbase'
+NOT_FOUND_SOURCE = 'Crunchbase (not found)'
+
+COMPANY_FIELDS = {column.name for column in Company.__table__.columns} - {'id'}
+
+# Legal suffixes ignored when deciding whether two names are the same company
+_COMPANY_SUFFIXES = re.compile(r'\b(inc|llc|ltd|corp|corporation|co|gmbh|plc)\b\.?')
+
+
+def normalize_company_name(name: str) -> str:
+    """Normalize a company name for coalescing, e.g. "Acme, Inc." -> "acme" """
+    name = _COMPANY_SUFFIXES.sub('', name.lower())
+    return ' '.join(re.sub(r'[^\w\s]', ' ', name).split())
+
+
+def _row_to_dict(row: Company) -> Dict[str, Any]:
+    return {field: getattr(row, field) for field in COMPANY_FIELDS}
+
+
+class SingleFlight:
+    """Coalesce concurrent calls with the same key into one in-flight call"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[str, Future] = {}
+
+    def do(self, key: str, fn: Callable, *args) -> Any:
+        """Run fn(*args), or wait for the result of a call already running for key"""
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = self._calls[key] = Future()
+        if not leader:
+            return future.result()
+
+        try:
+            result = fn(*args)
+            future.set_result(result)
+            return result
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+
+
+class CompanyEnricher:
+    """Serve Crunchbase company info from the companies table with a TTL
+
+    Lookups use `driver_pool` when given, so several companies can be searched
+    in parallel; otherwise they are serialized on `scraper`'s single driver.
+    """
+
+    def __init__(self, session_factory, scraper: Optional[CrunchbaseScraper] = None,
+                 ttl_hours: float = 24 * 7, negative_ttl_hours: float = 24,
+                 driver_pool: Optional[DriverPool] = None):
+        if scraper is None and driver_pool is None:
+            raise ValueError("CompanyEnricher needs a scraper or a driver_pool")
+        self.session_factory = session_factory
+        self.scraper = scraper
+        self.driver_pool = driver_pool
+        self._flight = SingleFlight()
+        self.ttl = timedelta(hours=ttl_hours)
+        self.negative_ttl = timedelta(hours=negative_ttl_hours)
+        # The WebDriver is not thread-safe, so lookups are serialized on it
+        self._driver_lock = threading.Lock()
+        self._refresh_pool = ThreadPoolExecutor(max_workers=1)
+        self._refreshing = set()
+        self._lock = threading.Lock()
+
+    def _find_row(self, session, name: str) -> Optional[Company]:
+        """Most recent row whose name normalizes to the same company as `name`"""
+        key = normalize_company_name(name)
+        if not key:
+            return None
+        # Every word of the key appears in the lowercased name, so the longest one narrows the search
+        word = max(key.split(), key=len)
+        candidates = session.query(Company).filter(
+            func.lower(Company.name).contains(word, autoescape=True)
+        ).order_by(Company.last_updated.desc())
+        return next((row for row in candidates if normalize_company_name(row.name or '') == key), None)
+
+    def _lookup(self, name: str) -> Optional[Dict[str, Any]]:
+        """Search Crunchbase and scrape the company's profile
+
+        Returns None when Crunchbase has no such company and an empty dict when
+        the search or the profile could not be scraped.
+        """
+        if self.driver_pool is not None:
+            with self.driver_pool.acquire() as driver:
+                return self._scrape(CrunchbaseScraper(driver), name)
+        with self._driver_lock:
+            return self._scrape(self.scraper, name)
+
+    @staticmethod
+    def _scrape(scraper: CrunchbaseScraper, name: str) -> Optional[Dict[str, Any]]:
+        try:
+            url = scraper.find_company_url(name)
+        except Exception:
+            # A failed search says nothing about whether the company exists
+            return {}
+        if not url:
+            return None
+        return scraper.scrape_company_info(url)
+
+    def _store(self, session, name: str, info: Optional[Dict[str, Any]]) -> Optional[Company]:
+        """Write a lookup result to the companies table"""
+        if info == {}:
+            # Transient search or scrape failure; keep whatever we had and cache nothing
+            return self._find_row(session, name)
+
+        row = self._find_row(session, name)
+        if row is None:
+            # Name new rows as we were asked, so later lookups hit them; an existing
+            # row keeps its stored name, which normalizes to the same key
+            row = Company(name=name.strip())
+        if info is None:
+            row.data_source = NOT_FOUND_SOURCE
+        else:
+            for field, value in info.items():
+                if field in COMPANY_FIELDS and field != 'name':
+                    setattr(row, field, value)
+            row.data_source = CRUNCHBASE_SOURCE
+        row.last_updated = datetime.utcnow()
+        session.add(row)
+        session.commit()
+        return row
+
+    def _refresh(self, name: str):
+        try:
+            info = self._lookup(name)
+            with self.session_factory() as session:
+                self._store(session, name, info)
+        except Exception as e:
+            logger.error(f"Error refreshing company info for {name}: {e}")
+        finally:
+            with self._lock:
+                self._refreshing.discard(normalize_company_name(name))
+
+    def _schedule_refresh(self, name: str):
+        key = normalize_company_name(name)
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+        self._refresh_pool.submit(self._refresh, name)
+
+    def get(self, name: str) -> Optional[Dict[str, Any]]:
+        """Return company info for a name, or None if Crunchbase does not know it
+
+        Concurrent calls for the same company share a single lookup.
+        """
+        if not name or not name.strip():
+            return None
+        return self._flight.do(normalize_company_name(name), self._get, name)
+
+    def _get(self, name: str) -> Optional[Dict[str, Any]]:
+        with self.session_factory() as session:
+            row = self._find_row(session, name)
+            now = datetime.utcnow()
+            if row is not None and row.last_updated:
+                age = now - row.last_updated
+                if row.data_source == NOT_FOUND_SOURCE:
+                    if age < self.negative_ttl:
+                        return None
+                elif age < self.ttl:
+                    return _row_to_dict(row)
+                else:
+                    # Serve the stale row now and refresh it in the background
+                    self._schedule_refresh(name)
+                    return _row_to_dict(row)
+
+            row = self._store(session, name, self._lookup(name))
+            if row is None or row.data_source == NOT_FOUND_SOURCE:
+                return None
+            return _row_to_dict(row)
+
+    def enrich_many(self, names: Iterable[str], max_workers: int = 4) -> Dict[str, Optional[Dict[str, Any]]]:
+        """Resolve the distinct companies of a scrape with bounded parallelism
+
+        Returns company info keyed by each name as given.
+        """
+        by_key = {}
+        for name in names:
+            if name and name.strip():
+                by_key.setdefault(normalize_company_name(name), []).append(name)
+        if not by_key:
+            return {}
+
+        if self.driver_pool is not None:
+            max_workers = min(max_workers, self.driver_pool.size)
+        with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+            futures = {key: executor.submit(self.get, aliases[0]) for key, aliases in by_key.items()}
+
+        results = {}
+        for key, future in futures.items():
+            try:
+                info = future.result()
+            except Exception as e:
+                logger.error(f"Error enriching {by_key[key][0]}: {e}")
+                info = None
+            for name in by_key[key]:
+                results[name] = info
+        return results
+
+    def close(self):
+        """Wait for background refreshes to finish"""
+        self._refresh_pool.shutdown(wait=True)
+
+
+def enrich_companies(session_factory, names: Iterable[str], drivers: int = 2,
+                     cancel_token: Optional[CancellationToken] = None) -> Dict[str, Optional[Dict[str, Any]]]:
+    """Look companies up on Crunchbase, `drivers` at a time, on a DriverPool of their own"""
+    pool = DriverPool(size=drivers, cancel_token=cancel_token)
+    enricher = CompanyEnricher(session_factory, driver_pool=pool)
+    try:
+        return enricher.enrich_many(names, max_workers=drivers)
+    finally:
+        enricher.close()
+        pool.close()
@@ -6,6 +6,7 @@ from typing import Dict, Optional
 import time
 from loguru import logger
 import json
+from urllib.parse import urljoin
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
@@ -19,7 +20,11 @@ class CrunchbaseScraper:
         self.base_url = "https://www.crunchbase.com"
         
     def find_company_url(self, company_name: str) -> Optional[str]:
-        """Find the Crunchbase URL for a company"""
+        """Find the Crunchbase URL for a company
+        
+        Returns None when the search has no results and raises when the search
+        itself fails, so callers can tell an unknown company from an error.
+        """
         try:
             search_url = f"{self.base_url}/search/organizations/field/organizations/name/{company_name}"
             self.driver.get(search_url)
@@ -30,53 +35,58 @@ class CrunchbaseScraper:
             )
             
             # Find the first matching result
-            results = self.driver.find_elements(By.CSS_SELECTOR, ".search-result")
-            if results:
-                link = results[0].find_element(By.CSS_SELECTOR, "a")
-                return link.get_attribute("href")
+            soup = BeautifulSoup(self.driver.page_source, 'html.parser')
+            link = soup.select_one('.search-result a[href]')
+            if link:
+                return urljoin(search_url, link['href'])
             
             return None
             
         except Exception as e:
             logger.error(f"Error finding Crunchbase URL for {company_name}: {str(e)}")
-            return None
+            raise
 
     def scrape_company_info(self, url: str) -> Dict:
-        """Scrape company information from Crunchbase"""
+        """Scrape company information from Crunchbase
+        
+        The profile page is captured once as a snapshot and every field is parsed
+        locally, instead of making a WebDriver round-trip per field.
+        """
         try:
             self.driver.get(url)
             time.sleep(2)  # Allow dynamic content to load
+            soup = BeautifulSoup(self.driver.page_source, 'html.parser')
             
             # Basic company info
             info = {
                 'crunchbase_url': url,
-                'name': self._get_text('.profile-name'),
-                'description': self._get_text('.description'),
-                'website': self._get_href('.website'),
-                'linkedin_url': self._get_href('.linkedin'),
-                'headquarters': self._get_text('.headquarters'),
-                'company_type': self._get_text('.company-type'),
-                'founded_date': self._parse_date(self._get_text('.founded-date')),
-                'operating_status': self._get_text('.operating-status')
+                'name': self._get_text(soup, '.profile-name'),
+                'description': self._get_text(soup, '.description'),
+                'website': self._get_href(soup, '.website', url),
+                'linkedin_url': self._get_href(soup, '.linkedin', url),
+                'headquarters': self._get_text(soup, '.headquarters'),
+                'company_type': self._get_text(soup, '.company-type'),
+                'founded_date': self._parse_date(self._get_text(soup, '.founded-date')),
+                'operating_status': self._get_text(soup, '.operating-status')
             }
             
             # Employee information
-            employee_info = self._get_text('.employee-count')
+            employee_info = self._get_text(soup, '.employee-count')
             info.update(self._parse_employee_info(employee_info))
             
             # Funding information
-            funding_info = self._scrape_funding_info()
+            funding_info = self._scrape_funding_info(soup)
             info.update(funding_info)
             
             # Industry and category
             info.update({
-                'industry': self._get_text('.industry-category'),
-                'sub_industry': self._get_text('.sub-industry')
+                'industry': self._get_text(soup, '.industry-category'),
+                'sub_industry': self._get_text(soup, '.sub-industry')
             })
             
             # Regions
-            regions = self.driver.find_elements(By.CSS_SELECTOR, '.regions .region')
-            info['regions'] = [region.text for region in regions]
+            regions = soup.select('.regions .region')
+            info['regions'] = [region.get_text(' ', strip=True) for region in regions]
             
             return info
             
@@ -84,21 +94,17 @@ class CrunchbaseScraper:
             logger.error(f"Error scraping company info from {url}: {str(e)}")
             return {}
 
-    def _get_text(self, selector: str) -> str:
-        """Get text content from an element"""
-        try:
-            element = self.driver.find_element(By.CSS_SELECTOR, selector)
-            return element.text.strip()
-        except:
-            return ""
+    def _get_text(self, soup, selector: str) -> str:
+        """Get text content from an element of the page snapshot"""
+        element = soup.select_one(selector)
+        return element.get_text(' ', strip=True) if element else ""
 
-    def _get_href(self, selector: str) -> str:
-        """Get href attribute from an element"""
-        try:
-            element = self.driver.find_element(By.CSS_SELECTOR, selector)
-            return element.get_attribute('href')
-        except:
+    def _get_href(self, soup, selector: str, base_url: str = None) -> str:
+        """Get the absolute href of an element of the page snapshot"""
+        element = soup.select_one(selector)
+        if element is None or not element.get('href'):
             return ""
+        return urljoin(base_url or self.base_url, element['href'])
 
     def _parse_date(self, date_str: str) -> Optional[datetime]:
         """Parse date string into datetime object"""
@@ -129,8 +135,8 @@ class CrunchbaseScraper:
             
         return result
 
-    def _scrape_funding_info(self) -> Dict:
-        """Scrape funding information"""
+    def _scrape_funding_info(self, soup) -> Dict:
+        """Scrape funding information from the page snapshot"""
         try:
             funding_info = {
                 'total_funding': None,
@@ -142,22 +148,22 @@ class CrunchbaseScraper:
             }
             
             # Total funding
-            total_funding_elem = self.driver.find_element(By.CSS_SELECTOR, '.total-funding')
-            if total_funding_elem:
-                funding_info['total_funding'] = self._parse_money(total_funding_elem.text)
+            total_funding = self._get_text(soup, '.total-funding')
+            if total_funding:
+                funding_info['total_funding'] = self._parse_money(total_funding)
             
             # Latest funding round
-            latest_round = self.driver.find_element(By.CSS_SELECTOR, '.latest-round')
+            latest_round = soup.select_one('.latest-round')
             if latest_round:
                 funding_info.update({
-                    'last_funding_amount': self._parse_money(self._get_text('.round-amount')),
-                    'last_funding_date': self._parse_date(self._get_text('.round-date')),
-                    'last_funding_type': self._get_text('.round-type')
+                    'last_funding_amount': self._parse_money(self._get_text(latest_round, '.round-amount')),
+                    'last_funding_date': self._parse_date(self._get_text(latest_round, '.round-date')),
+                    'last_funding_type': self._get_text(latest_round, '.round-type')
                 })
                 
                 # Investors in latest round
-                investors = latest_round.find_elements(By.CSS_SELECTOR, '.investor')
-                funding_info['last_funding_investors'] = [inv.text for inv in investors]
+                investors = latest_round.select('.investor')
+                funding_info['last_funding_investors'] = [inv.get_text(' ', strip=True) for inv in investors]
             
             # Company stage
             funding_info['company_stage'] = self._determine_company_stage(
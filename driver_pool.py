@@ -0,0 +1,105 @@
+"""
+Pool of Selenium Chrome drivers shared by browser-based scrapers.
+
+Drivers are expensive to start, so they are created lazily up to `size` and then
+reused. Callers check a driver out with `acquire()` and get it back on exit.
+Cancelling the pool's token closes it: every driver is quit, including ones that
+are checked out, so a stopped scrape leaves no Chrome processes behind.
+"""
+import queue
+import threading
+from contextlib import contextmanager
+
+from loguru import logger
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.chrome.service import Service
+from webdriver_manager.chrome import ChromeDriverManager
+
+from cancellation import CancellationToken, CancelledError
+
+
+class DriverPool:
+    """Fixed-size pool of headless Chrome drivers, created on demand"""
+
+    def __init__(self, size: int = 2, headless: bool = True,
+                 cancel_token: CancellationToken = None):
+        self.size = size
+        self.headless = headless
+        self.closed = False
+        self._available = queue.Queue()
+        self._drivers = []
+        self._lock = threading.Lock()
+        self.cancel_token = cancel_token
+        if cancel_token is not None:
+            cancel_token.on_cancel(self.close)
+
+    def _create_driver(self):
+        options = Options()
+        if self.headless:
+            options.add_argument('--headless=new')
+        options.add_argument('--no-sandbox')
+        options.add_argument('--disable-dev-shm-usage')
+        return webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=options)
+
+    @contextmanager
+    def acquire(self, timeout: float = None):
+        """Check out a driver, starting a new one if the pool is not full yet"""
+        if self.closed:
+            raise CancelledError("Driver pool is closed")
+        try:
+            driver = self._available.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                can_create = len(self._drivers) < self.size
+                if can_create:
+                    # Reserve the slot before the slow driver start-up
+                    self._drivers.append(None)
+            if can_create:
+                try:
+                    driver = self._create_driver()
+                except Exception:
+                    with self._lock:
+                        if None in self._drivers:
+                            self._drivers.remove(None)
+                    raise
+                with self._lock:
+                    if self.closed:
+                        # Closed while this driver was starting
+                        self._quit(driver)
+                        raise CancelledError("Driver pool is closed")
+                    self._drivers[self._drivers.index(None)] = driver
+            else:
+                driver = self._available.get(timeout=timeout)
+        if driver is None:
+            self._available.put(None)
+            raise CancelledError("Driver pool is closed")
+        try:
+            yield driver
+        finally:
+            # A closed pool has already quit the driver
+            if not self.closed:
+                self._available.put(driver)
+
+    @staticmethod
+    def _quit(driver):
+        try:
+            driver.quit()
+        except Exception as e:
+            logger.error(f"Error quitting driver: {e}")
+            # Make sure chromedriver, and Chrome with it, does not outlive us
+            try:
+                driver.service.stop()
+            except Exception:
+                pass
+
+    def close(self):
+        """Quit every driver in the pool, including checked-out ones, and wake up waiters"""
+        with self._lock:
+            self.closed = True
+            drivers, self._drivers = [d for d in self._drivers if d is not None], []
+        for driver in drivers:
+            self._quit(driver)
+        # Callers blocked in acquire() get None and raise CancelledError
+        for _ in range(self.size):
+            self._available.put(None)
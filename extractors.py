@@ -0,0 +1,133 @@
+"""
+Declarative extraction of job cards from listing pages.
+
+A selector spec is a plain dict describing where each field of a posting lives:
+
+    {
+        "card": "div.job-card",          # one element per posting
+        "title": "h5.card-title",        # text fields
+        "company": "div.company-name",
+        "location": "span.location",
+        "description": "div.card-description",
+        "url": "a",                      # link fields read the href
+        "url_prefix": "https://www.dice.com",
+        "source": "Dice"
+    }
+
+Each spec is compiled once into a CompiledExtractor that holds pre-compiled CSS
+selectors and, where the card selector allows it, a SoupStrainer so only the
+job cards are built into a tree. `url_prefix` and `source` may contain
+`{placeholders}` that are filled from the keyword arguments of each call.
+"""
+import re
+from typing import Dict, List, Optional
+from urllib.parse import urljoin
+
+import soupsieve as sv
+from bs4 import BeautifulSoup, SoupStrainer
+
+# Spec keys that hold per-card field selectors, in output order
+FIELD_KEYS = ('title', 'company', 'location', 'description', 'url', 'website')
+
+# Fields whose value is read from an attribute instead of the element text
+LINK_FIELDS = {'url': 'href', 'website': 'href'}
+
+# Simple "tag", ".class" or "tag.class" selectors can be turned into a SoupStrainer
+_SIMPLE_SELECTOR = re.compile(r'^([a-zA-Z][\w-]*)?(?:\.([\w-]+))?$')
+
+_extractors: Dict[str, 'CompiledExtractor'] = {}
+
+
+def _strainer_for(selector: str) -> Optional[SoupStrainer]:
+    """Build a SoupStrainer matching the card selector, if it is simple enough"""
+    match = _SIMPLE_SELECTOR.match(selector.strip())
+    if not match or not any(match.groups()):
+        return None
+    tag, css_class = match.groups()
+    if not css_class:
+        return SoupStrainer(tag)
+
+    def has_class(value) -> bool:
+        # Depending on the bs4 version the value is the raw attribute or one class
+        if not value:
+            return False
+        classes = value.split() if isinstance(value, str) else value
+        return css_class in classes
+
+    return SoupStrainer(tag, class_=has_class)
+
+
+class CompiledExtractor:
+    """Extraction function compiled from a selector spec"""
+
+    def __init__(self, spec: Dict):
+        self.spec = spec
+        self.card_selector = sv.compile(spec['card'])
+        self.strainer = _strainer_for(spec['card'])
+        self.url_prefix = spec.get('url_prefix')
+        self.source = spec.get('source')
+        self.required = tuple(spec.get('required', ('title',)))
+
+        # (field, compiled selector, attribute or None for text)
+        self.fields = []
+        for key in FIELD_KEYS:
+            selector = spec.get(key)
+            if not selector:
+                continue
+            selector, _, attr = selector.partition('@')
+            self.fields.append((key, sv.compile(selector), attr or LINK_FIELDS.get(key)))
+
+    def cards(self, html: str) -> List:
+        """Parse a listing page and return the job card elements"""
+        soup = BeautifulSoup(html, 'html.parser', parse_only=self.strainer)
+        return self.card_selector.select(soup)
+
+    def extract_card(self, card, url_prefix: Optional[str] = None,
+                     source: Optional[str] = None) -> Optional[Dict]:
+        """Extract a single posting from a card element"""
+        job = {}
+        for key, selector, attr in self.fields:
+            element = selector.select_one(card)
+            if element is None:
+                value = ''
+            elif attr:
+                value = element.get(attr) or ''
+                if key == 'url' and value and url_prefix:
+                    value = urljoin(url_prefix, value)
+            else:
+                value = element.get_text(strip=True)
+            job[key] = value
+
+        if not all(job.get(key) for key in self.required):
+            return None
+        if source:
+            job['source'] = source
+        return job
+
+    def extract_cards(self, cards: List, **params) -> List[Dict]:
+        """Extract postings from already located card elements"""
+        url_prefix = self.url_prefix.format(**params) if self.url_prefix else None
+        source = self.source.format(**params) if self.source else None
+        jobs = []
+        for card in cards:
+            job = self.extract_card(card, url_prefix, source)
+            if job:
+                jobs.append(job)
+        return jobs
+
+    def __call__(self, html: str, **params) -> List[Dict]:
+        """Extract all postings from a listing page"""
+        return self.extract_cards(self.cards(html), **params)
+
+
+def compile_extractor(spec: Dict) -> CompiledExtractor:
+    """Compile a selector spec into an extraction function"""
+    return CompiledExtractor(spec)
+
+
+def get_extractor(name: str, spec: Dict) -> CompiledExtractor:
+    """Return the compiled extractor for a named source, compiling it on first use"""
+    extractor = _extractors.get(name)
+    if extractor is None or extractor.spec is not spec:
+        extractor = _extractors[name] = compile_extractor(spec)
+    return extractor
@@ -0,0 +1,128 @@
+"""
+Per-search high-water marks for incremental scraping.
+
+For every (source, keyword, location) search we remember the most recently seen
+posting URLs and the newest posting date. Listing pages are ordered newest first,
+so once a whole page consists of postings we already know, the remaining pages
+can be skipped. A full crawl is still forced every `full_recrawl_hours` so edits
+to older postings are picked up.
+"""
+import json
+import threading
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from loguru import logger
+
+
+class HighWaterMarks:
+    """Newest seen postings per (source, keyword, location)"""
+
+    def __init__(self, storage_dir: str = 'data', max_urls: int = 500,
+                 full_recrawl_hours: float = 24):
+        self.storage_dir = Path(storage_dir)
+        self.storage_dir.mkdir(exist_ok=True)
+        self.marks_file = self.storage_dir / 'high_water_marks.json'
+        self.max_urls = max_urls
+        self.full_recrawl_hours = full_recrawl_hours
+        self._lock = threading.Lock()
+        self._url_sets: Dict[str, set] = {}
+        self._load_data()
+
+    def _load_data(self):
+        """Load existing marks from storage"""
+        try:
+            if self.marks_file.exists():
+                with open(self.marks_file, 'r') as f:
+                    self.marks = json.load(f)
+            else:
+                self.marks = {}
+        except Exception as e:
+            logger.error(f"Error loading high-water marks: {e}")
+            self.marks = {}
+
+    def save(self):
+        """Save all marks to storage"""
+        with self._lock:
+            try:
+                with open(self.marks_file, 'w') as f:
+                    json.dump(self.marks, f, indent=2)
+            except Exception as e:
+                logger.error(f"Error saving high-water marks: {e}")
+
+    @staticmethod
+    def key(source: str, keyword: str, location: str) -> str:
+        """Build the mark key for a search"""
+        return f"{source}|{keyword.strip().lower()}|{location.strip().lower()}"
+
+    def get(self, key: str) -> Dict[str, Any]:
+        """Return the mark for a search, or an empty dict"""
+        return self.marks.get(key, {})
+
+    def _known_urls(self, key: str) -> set:
+        urls = self._url_sets.get(key)
+        if urls is None:
+            urls = self._url_sets[key] = set(self.get(key).get('urls', []))
+        return urls
+
+    def needs_full_crawl(self, key: str) -> bool:
+        """Whether the search is due for a full re-crawl"""
+        last_full_crawl = self.get(key).get('last_full_crawl')
+        if not last_full_crawl:
+            return True
+        age = datetime.now() - datetime.fromisoformat(last_full_crawl)
+        return age >= timedelta(hours=self.full_recrawl_hours)
+
+    def is_known(self, key: str, job: Dict[str, Any]) -> bool:
+        """Whether a posting is at or below the search's high-water mark"""
+        if job.get('url') in self._known_urls(key):
+            return True
+        newest = self.get(key).get('newest_posted')
+        posted = _parse_date(job.get('date_posted'))
+        return bool(newest and posted and posted < _parse_date(newest))
+
+    def page_is_known(self, key: str, jobs: List[Dict[str, Any]]) -> bool:
+        """Whether every posting on a listing page has been seen before"""
+        return bool(jobs) and all(self.is_known(key, job) for job in jobs)
+
+    def update(self, key: str, jobs: List[Dict[str, Any]], full_crawl: bool = False) -> int:
+        """Record the postings seen by a crawl and return how many were new"""
+        with self._lock:
+            known = self._known_urls(key)
+            new_jobs = [job for job in jobs if not self.is_known(key, job)]
+
+            mark = dict(self.get(key))
+            urls = [job['url'] for job in jobs if job.get('url')]
+            seen = set(urls)
+            urls += [url for url in mark.get('urls', []) if url not in seen]
+            mark['urls'] = urls[:self.max_urls]
+
+            dates = [d for d in (_parse_date(job.get('date_posted')) for job in jobs) if d]
+            if mark.get('newest_posted'):
+                dates.append(_parse_date(mark['newest_posted']))
+            if dates:
+                mark['newest_posted'] = max(dates).isoformat()
+
+            now = datetime.now().isoformat()
+            mark['last_crawl'] = now
+            mark['last_new'] = len(new_jobs)
+            if full_crawl:
+                mark['last_full_crawl'] = now
+
+            self.marks[key] = mark
+            known.clear()
+            known.update(mark['urls'])
+            return len(new_jobs)
+
+
+def _parse_date(value) -> Optional[datetime]:
+    """Parse an ISO date string, ignoring anything else"""
+    if not value:
+        return None
+    if isinstance(value, datetime):
+        return value.replace(tzinfo=None)
+    try:
+        return datetime.fromisoformat(str(value)).replace(tzinfo=None)
+    except ValueError:
+        return None
@@ -1,142 +1,266 @@
-from bs4 import BeautifulSoup
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from urllib.parse import quote
 import time
-from typing import List, Dict
-
-class DiceScraper:
-    @staticmethod
-    def scrape(driver, job_type: str, location: str, page: int = 1) -> List[Dict]:
-        """Scrape job postings from Dice"""
-        jobs = []
-        try:
-            base_url = f"https://www.dice.com/jobs?q={quote(job_type)}&location={quote(location)}&page={page}"
-            driver.get(base_url)
-            
-            WebDriverWait(driver, 10).until(
-                EC.presence_of_element_located((By.CLASS_NAME, "card-title"))
-            )
-            
-            soup = BeautifulSoup(driver.page_source, 'html.parser')
-            job_cards = soup.find_all("div", class_="job-card")
-            
-            for card in job_cards:
-                jobs.append({
-                    "title": card.find("h5", class_="card-title").get_text(strip=True),
-                    "company": card.find("div", class_="company-name").get_text(strip=True),
-                    "location": card.find("span", class_="location").get_text(strip=True),
-                    "description": card.find("div", class_="card-description").get_text(strip=True),
-                    "url": "https://www.dice.com" + card.find("a")["href"],
-                    "source": "Dice"
-                })
-            
-        except Exception as e:
-            print(f"Error scraping Dice: {str(e)}")
-        
-        return jobs
-
-class TechstarsScraper:
-    @staticmethod
-    def scrape(driver, job_type: str, location: str) -> List[Dict]:
-        """Scrape job postings from Techstars"""
-        jobs = []
-        try:
-            base_url = "https://jobs.techstars.com/jobs"
-            driver.get(base_url)
-            
+from typing import Callable, List, Dict, Optional
+from concurrent.futures import ThreadPoolExecutor
+from extractors import get_extractor
+from pagination import Paginator
+from high_water_marks import HighWaterMarks
+from page_fingerprints import PageFingerprints
+from cancellation import CancellationToken, CancelledError
+
+# Listing page specs for each job board. `search_url`, `url_prefix` and `source`
+# are formatted with the parameters from search_params().
+BOARD_SPECS = {
+    "dice": {
+        "label": "Dice",
+        "search_url": "https://www.dice.com/jobs?q={query}&location={location_query}&page={page}",
+        "wait_for": "card-title",
+        "card": "div.job-card",
+        "title": "h5.card-title",
+        "company": "div.company-name",
+        "location": "span.location",
+        "description": "div.card-description",
+        "url": "a",
+        "url_prefix": "https://www.dice.com",
+        "source": "Dice"
+    },
+    "techstars": {
+        "label": "Techstars",
+        "search_url": "https://jobs.techstars.com/jobs",
+        "search_input": "search-input",
+        "card": "div.job-card",
+        "title": "h3.job-title",
+        "company": "div.company-name",
+        "location": "div.location",
+        "url": "a",
+        "source": "Techstars",
+        "filter_location": True
+    },
+    "builtin": {
+        "label": "BuiltIn",
+        "search_url": "https://{location_slug}.builtin.com/jobs?search={query}&page={page}",
+        "wait_for": "job-item",
+        "card": "div.job-item",
+        "title": "h2.job-title",
+        "company": "div.company-name",
+        "location": "div.job-location",
+        "description": "div.job-description",
+        "url": "a",
+        "url_prefix": "https://{location_slug}.builtin.com",
+        "source": "BuiltIn {location}"
+    },
+    "welcometothejungle": {
+        "label": "Welcome to the Jungle",
+        "search_url": "https://www.welcometothejungle.com/en/jobs?query={query}&page={page}",
+        "wait_for": "job-card",
+        "card": "div.job-card",
+        "title": "h3.job-title",
+        "company": "div.company-name",
+        "location": "div.location",
+        "description": "div.job-description",
+        "url": "a",
+        "url_prefix": "https://www.welcometothejungle.com",
+        "source": "Welcome to the Jungle",
+        "filter_location": True
+    }
+}
+
+def search_params(job_type: str, location: str, page: int = 1) -> Dict:
+    """Build the placeholder values used by board specs"""
+    return {
+        "query": quote(job_type),
+        "location": location,
+        "location_query": quote(location),
+        # BuiltIn's format (e.g., "san-francisco" for San Francisco)
+        "location_slug": location.lower().replace(" ", "-"),
+        "page": page
+    }
+
+def extract_listing(board: str, html: str, job_type: str, location: str, page: int = 1) -> List[Dict]:
+    """Extract every job card from a board's listing page HTML"""
+    return get_extractor(board, BOARD_SPECS[board])(html, **search_params(job_type, location, page))
+
+def filter_listing(board: str, jobs: List[Dict], location: str) -> List[Dict]:
+    """Apply the board's client-side location filter"""
+    if BOARD_SPECS[board].get("filter_location"):
+        jobs = [job for job in jobs if location.lower() in job["location"].lower()]
+    return jobs
+
+def parse_listing(board: str, html: str, job_type: str, location: str, page: int = 1) -> List[Dict]:
+    """Extract job postings from a board's listing page HTML"""
+    return filter_listing(board, extract_listing(board, html, job_type, location, page), location)
+
+def scrape_board(driver, board: str, job_type: str, location: str, page: int = 1) -> List[Dict]:
+    """Load a board's listing page in the browser and extract its job postings"""
+    spec = BOARD_SPECS[board]
+    jobs = []
+    try:
+        driver.get(spec["search_url"].format(**search_params(job_type, location, page)))
+
+        if spec.get("search_input"):
             # Input search criteria
             search_input = WebDriverWait(driver, 10).until(
-                EC.presence_of_element_located((By.ID, "search-input"))
+                EC.presence_of_element_located((By.ID, spec["search_input"]))
             )
             search_input.send_keys(job_type)
-            
             time.sleep(2)  # Allow results to load
-            
-            soup = BeautifulSoup(driver.page_source, 'html.parser')
-            job_cards = soup.find_all("div", class_="job-card")
-            
-            for card in job_cards:
-                location_text = card.find("div", class_="location").get_text(strip=True)
-                if location.lower() in location_text.lower():
-                    jobs.append({
-                        "title": card.find("h3", class_="job-title").get_text(strip=True),
-                        "company": card.find("div", class_="company-name").get_text(strip=True),
-                        "location": location_text,
-                        "url": card.find("a")["href"],
-                        "source": "Techstars"
-                    })
-            
-        except Exception as e:
-            print(f"Error scraping Techstars: {str(e)}")
-        
-        return jobs
-
-class BuiltInScraper:
-    @staticmethod
-    def scrape(driver, job_type: str, location: str, page: int = 1) -> List[Dict]:
-        """Scrape job postings from BuiltIn"""
-        jobs = []
-        try:
-            # Convert location to BuiltIn's format (e.g., "san-francisco" for San Francisco)
-            builtin_location = location.lower().replace(" ", "-")
-            base_url = f"https://{builtin_location}.builtin.com/jobs?search={quote(job_type)}&page={page}"
-            driver.get(base_url)
-            
+        else:
             WebDriverWait(driver, 10).until(
-                EC.presence_of_element_located((By.CLASS_NAME, "job-item"))
+                EC.presence_of_element_located((By.CLASS_NAME, spec["wait_for"]))
             )
-            
-            soup = BeautifulSoup(driver.page_source, 'html.parser')
-            job_cards = soup.find_all("div", class_="job-item")
-            
-            for card in job_cards:
-                jobs.append({
-                    "title": card.find("h2", class_="job-title").get_text(strip=True),
-                    "company": card.find("div", class_="company-name").get_text(strip=True),
-                    "location": card.find("div", class_="job-location").get_text(strip=True),
-                    "description": card.find("div", class_="job-description").get_text(strip=True),
-                    "url": "https://{builtin_location}.builtin.com" + card.find("a")["href"],
-                    "source": f"BuiltIn {location}"
-                })
-            
-        except Exception as e:
-            print(f"Error scraping BuiltIn: {str(e)}")
-        
-        return jobs
-
-class WelcomeToTheJungleScraper:
-    @staticmethod
-    def scrape(driver, job_type: str, location: str, page: int = 1) -> List[Dict]:
-        """Scrape job postings from Welcome to the Jungle"""
-        jobs = []
-        try:
-            base_url = f"https://www.welcometothejungle.com/en/jobs?query={quote(job_type)}&page={page}"
-            driver.get(base_url)
-            
-            WebDriverWait(driver, 10).until(
-                EC.presence_of_element_located((By.CLASS_NAME, "job-card"))
-            )
-            
-            soup = BeautifulSoup(driver.page_source, 'html.parser')
-            job_cards = soup.find_all("div", class_="job-card")
-            
-            for card in job_cards:
-                job_location = card.find("div", class_="location").get_text(strip=True)
-                if location.lower() in job_location.lower():
-                    jobs.append({
-                        "title": card.find("h3", class_="job-title").get_text(strip=True),
-                        "company": card.find("div", class_="company-name").get_text(strip=True),
-                        "location": job_location,
-                        "description": card.find("div", class_="job-description").get_text(strip=True),
-                        "url": "https://www.welcometothejungle.com" + card.find("a")["href"],
-                        "source": "Welcome to the Jungle"
-                    })
-            
-        except Exception as e:
-            print(f"Error scraping Welcome to the Jungle: {str(e)}")
-        
-        return jobs
-
-# Add more job board scrapers as needed 
\ No newline at end of file
+
+        jobs = parse_listing(board, driver.page_source, job_type, location, page)
+
+    except Exception as e:
+        print(f"Error scraping {spec['label']}: {str(e)}")
+
+    return jobs
+
+class Listing(list):
+    """Postings found by scrape_pages, with the crawl state to record once they are stored
+
+    `crawl` is plain JSON, so it can travel with the postings through a work queue.
+    """
+
+    def __init__(self, jobs: List[Dict], crawl: Dict):
+        super().__init__(jobs)
+        self.crawl = crawl
+
+def record_crawl(crawl: Dict, marks: Optional[HighWaterMarks] = None,
+                 fingerprints: Optional[PageFingerprints] = None):
+    """Update high-water marks and page fingerprints from a crawl whose postings were stored"""
+    if marks is not None and crawl.get('seen') is not None:
+        marks.update(crawl['key'], crawl['seen'], full_crawl=crawl['full_crawl'])
+    if fingerprints is not None and crawl.get('fingerprints'):
+        fingerprints.store(crawl['key'], crawl['fingerprints'])
+
+def scrape_pages(board: str, job_type: str, location: str, fetch: Callable[[str], str],
+                 max_jobs: int = 100, executor: Optional[ThreadPoolExecutor] = None,
+                 max_in_flight: int = 4, marks: Optional[HighWaterMarks] = None,
+                 parse_pool=None, pages: Optional[Dict[int, List[Dict]]] = None,
+                 on_page: Optional[Callable[[int, List[Dict]], None]] = None,
+                 fingerprints: Optional[PageFingerprints] = None,
+                 cancel_token: Optional[CancellationToken] = None) -> Listing:
+    """Fetch a board's listing pages concurrently over HTTP and extract their job postings
+
+    With high-water marks, pagination stops at the first page made up entirely of
+    already-known postings unless the search is due for a full re-crawl. With a
+    ParsePool, pages are parsed in worker processes and only the postings its
+    JobFilter accepted are returned. `pages` and `on_page` resume and checkpoint
+    the pagination (see Paginator). With page fingerprints, pages whose job cards
+    have not changed since the last crawl are skipped without parsing. A cancelled
+    `cancel_token` stops the crawl with CancelledError; its `partial` is a Listing of
+    the matching postings parsed so far, whose crawl state records nothing.
+
+    Neither marks nor fingerprints are updated here: pass the returned Listing's
+    `crawl` to record_crawl() once its postings have been stored, so a failed save
+    never hides pages or postings from the next crawl.
+    """
+    spec = BOARD_SPECS[board]
+    matched_ids = set()
+
+    def parse(html, page):
+        if parse_pool is None:
+            return extract_listing(board, html, job_type, location, page)
+        parsed = parse_pool.parse(board, html, job_type, location, page)
+        matched_ids.update(id(job) for job in parsed.matched)
+        return parsed
+
+    if parse_pool is not None:
+        for parsed in (pages or {}).values():
+            matched_ids.update(id(job) for job in getattr(parsed, 'matched', []))
+
+    key = HighWaterMarks.key(board, job_type, location)
+    stop_when = None
+    full_crawl = True
+    if marks is not None:
+        full_crawl = marks.needs_full_crawl(key)
+        if not full_crawl:
+            stop_when = lambda page, jobs: marks.page_is_known(key, jobs)
+    unchanged = None
+    if fingerprints is not None:
+        unchanged = lambda page, html: fingerprints.unchanged_cards(key, page, html, spec["card"])
+
+    paginator = Paginator(
+        fetch=fetch,
+        parse=parse,
+        executor=executor,
+        max_results=max_jobs,
+        per_page=spec.get("per_page"),
+        # Boards without a page parameter only have a single listing page
+        max_pages=None if "{page}" in spec["search_url"] else 1,
+        max_in_flight=max_in_flight,
+        stop_when=stop_when,
+        pages=pages,
+        on_page=on_page,
+        unchanged=unchanged,
+        # An unchanged page only holds known postings, so an incremental crawl ends there
+        stop_on_unchanged=marks is not None and not full_crawl,
+        cancel_token=cancel_token
+    )
+
+    def listing(jobs: List[Dict], crawl: Dict) -> Listing:
+        if parse_pool is not None:
+            return Listing([job for job in jobs if id(job) in matched_ids], crawl)
+        return Listing(filter_listing(board, jobs, location), crawl)
+
+    try:
+        jobs = paginator.run(
+            lambda page: spec["search_url"].format(**search_params(job_type, location, page))
+        )
+    except CancelledError as e:
+        # An interrupted crawl proves nothing about the listing, so it updates no marks or fingerprints
+        e.partial = listing(e.partial or [], {'key': key, 'full_crawl': False,
+                                              'seen': None, 'fingerprints': None})
+        raise
+    crawl = {
+        'key': key,
+        # Only a crawl that got through to the end of the listing resets the full re-crawl clock
+        'full_crawl': full_crawl and paginator.reached_end,
+        'seen': None,
+        'fingerprints': None
+    }
+    if marks is not None:
+        crawl['seen'] = [{'url': job.get('url'), 'date_posted': job.get('date_posted')} for job in jobs]
+    if fingerprints is not None:
+        crawl['fingerprints'] = fingerprints.take_pending(key, range(1, paginator.complete_pages + 1))
+    return listing(jobs, crawl)
+
+class BoardScraper:
+    """Scraper for a job board described by an entry in BOARD_SPECS"""
+    board = None
+
+    @classmethod
+    def scrape(cls, driver, job_type: str, location: str, page: int = 1) -> List[Dict]:
+        """Scrape job postings from the board"""
+        return scrape_board(driver, cls.board, job_type, location, page)
+
+    @classmethod
+    def scrape_pages(cls, job_type: str, location: str, fetch: Callable[[str], str],
+                     max_jobs: int = 100, executor: Optional[ThreadPoolExecutor] = None,
+                     max_in_flight: int = 4, marks: Optional[HighWaterMarks] = None,
+                     parse_pool=None, pages: Optional[Dict[int, List[Dict]]] = None,
+                     on_page: Optional[Callable[[int, List[Dict]], None]] = None,
+                     fingerprints: Optional[PageFingerprints] = None,
+                     cancel_token: Optional[CancellationToken] = None) -> List[Dict]:
+        """Scrape up to max_jobs postings from the board's listing pages concurrently"""
+        return scrape_pages(cls.board, job_type, location, fetch, max_jobs, executor,
+                            max_in_flight, marks, parse_pool, pages, on_page, fingerprints,
+                            cancel_token)
+
+class DiceScraper(BoardScraper):
+    board = "dice"
+
+class TechstarsScraper(BoardScraper):
+    board = "techstars"
+
+class BuiltInScraper(BoardScraper):
+    board = "builtin"
+
+class WelcomeToTheJungleScraper(BoardScraper):
+    board = "welcometothejungle"
+
+# Add more job boards as entries in BOARD_SPECS
@@ -0,0 +1,124 @@
+"""
+Compact, typed DataFrames of stored postings for analytics.
+
+`pd.DataFrame(jobs)` keeps every field as a Python object: each row holds its
+own copy of strings like the source or company name, dates stay ISO strings
+that every chart parses again, and salaries are a mix of numbers and text.
+typed_frame() builds the columns directly from the records in one pass:
+
+    source, company, location, job_type,
+    experience_level, category          categoricals (one copy of each distinct value)
+    date_posted, date_scraped           datetime64
+    salary                              float, the lower end of a range (see rollups.parse_salary)
+    remote                              bool, from the posting's flag or its location and title
+
+Descriptions are by far the largest field and no chart uses them, so they are
+left out unless `full=True`; exports ask for them, together with the original
+salary text. Run `python job_frame.py` to compare the memory use of both
+representations on the current store.
+"""
+import argparse
+import json
+from typing import Any, Dict, Iterable, List, Optional
+
+import pandas as pd
+from loguru import logger
+
+from json_stream import iter_json_array
+from rollups import parse_salary
+
+CATEGORICAL_COLUMNS = ('source', 'company', 'location', 'job_type', 'experience_level', 'category')
+DATE_COLUMNS = ('date_posted', 'date_scraped')
+# Only loaded for exports
+TEXT_COLUMNS = ('description',)
+
+
+def is_remote(job: Dict[str, Any]) -> bool:
+    """Whether a posting is remote, from its flag if it has one, else its location and title"""
+    flag = job.get('remote')
+    if isinstance(flag, bool):
+        return flag
+    if isinstance(flag, str) and flag.strip():
+        return flag.strip().lower() in ('true', 'yes', 'remote', '1')
+    text = f"{job.get('location') or ''} {job.get('title') or ''}".lower()
+    return 'remote' in text
+
+
+def parse_dates(values: List[Any]) -> pd.Series:
+    """ISO 8601 dates of any precision and offset as naive UTC datetimes, NaT where unparseable"""
+    # Without format='ISO8601', pandas infers one format from the first value and drops the rest
+    return pd.to_datetime(pd.Series(values, dtype=object), errors='coerce', utc=True,
+                          format='ISO8601').dt.tz_localize(None)
+
+
+def typed_frame(jobs: Iterable[Dict[str, Any]], columns: Optional[Iterable[str]] = None,
+                full: bool = False) -> pd.DataFrame:
+    """Typed DataFrame of postings, with only the given columns if `columns` is set"""
+    wanted = set(columns) if columns is not None else None
+    data: Dict[str, List[Any]] = {}
+    remote = []
+    rows = 0
+    for job in jobs:
+        for key, value in job.items():
+            if (wanted is not None and key not in wanted) or (key in TEXT_COLUMNS and not full):
+                continue
+            column = data.get(key)
+            if column is None:
+                # Field first seen in this row
+                column = data[key] = [None] * rows
+            column.append(value)
+        remote.append(is_remote(job))
+        rows += 1
+        for column in data.values():
+            if len(column) < rows:
+                column.append(None)
+
+    frame = {}
+    for key, values in data.items():
+        if key in CATEGORICAL_COLUMNS:
+            frame[key] = pd.Categorical(values)
+        elif key in DATE_COLUMNS:
+            frame[key] = parse_dates(values)
+        elif key == 'salary':
+            frame[key] = pd.Series([parse_salary(value) for value in values], dtype='float64')
+            if full and (wanted is None or 'salary_text' in wanted):
+                frame['salary_text'] = pd.Series(values, dtype=object)
+        elif key == 'remote':
+            continue
+        else:
+            frame[key] = pd.Series(values)
+    if wanted is None or 'remote' in wanted:
+        frame['remote'] = pd.Series(remote, dtype=bool)
+    return pd.DataFrame(frame, index=pd.RangeIndex(rows))
+
+
+def memory_usage(df: pd.DataFrame) -> int:
+    """Bytes used by a DataFrame, including the Python objects it references"""
+    return int(df.memory_usage(deep=True).sum())
+
+
+def memory_report(jobs: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Memory of the plain, full typed and chart-path typed representations of the same postings"""
+    plain = memory_usage(pd.DataFrame(jobs))
+    full = memory_usage(typed_frame(jobs, full=True))
+    charts = memory_usage(typed_frame(jobs))
+    report = {
+        'rows': len(jobs),
+        'plain_bytes': plain,
+        'typed_bytes': full,
+        'typed_without_descriptions_bytes': charts,
+        'reduction': round(plain / full, 1) if full else None,
+        'reduction_without_descriptions': round(plain / charts, 1) if charts else None
+    }
+    logger.info(f"{len(jobs)} jobs: {plain / 1e6:.1f} MB as plain objects, {full / 1e6:.1f} MB typed "
+                f"({report['reduction']}x), {charts / 1e6:.1f} MB without descriptions "
+                f"({report['reduction_without_descriptions']}x)")
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare DataFrame memory use of the stored jobs")
+    parser.add_argument("jobs_file", nargs="?", default="data/jobs.json")
+    args = parser.parse_args()
+
+    print(json.dumps(memory_report(list(iter_json_array(args.jobs_file))), indent=2))
@@ -16,13 +16,14 @@ import os
 from dotenv import load_dotenv
 import requests
 import json
-from urllib.parse import urljoin, quote
-import schedule
+from urllib.parse import urljoin, quote, urlparse
 import threading
-from typing import List, Dict, Optional, Union
+import shutil
+import textwrap
+from typing import Any, Iterable, List, Dict, Optional, Union
 import re
-from job_boards import DiceScraper, TechstarsScraper, BuiltInScraper, WelcomeToTheJungleScraper
-from vc_firms import VC_FIRMS, CAREERS_PAGE_PATHS, JOB_BOARD_PLATFORMS
+import math
+from job_boards import Listing, record_crawl, scrape_pages
 from difflib import SequenceMatcher
 from thefuzz import fuzz
 import itertools
@@ -31,10 +32,24 @@ from nltk.corpus import wordnet
 from nltk.tokenize import word_tokenize
 from collections import defaultdict
 from crunchbase_scraper import CrunchbaseScraper
+from high_water_marks import HighWaterMarks
+from circuit_breaker import CircuitOpenError, breakers, retry_budget
+from task_planner import SearchTask, TaskPlanner, TaskScheduler, enabled_sources
+from parse_pool import ParsePool
+from checkpoint import RunCheckpoint, config_fingerprint
+from page_fingerprints import PageFingerprints
+from pagination import UnchangedPage
+from telemetry import telemetry
+from rollups import Rollups
+from columnar_snapshot import ColumnarSnapshot
+from json_stream import iter_json_array
+from cancellation import CancellationToken, CancelledError, run_cancellable
+from functools import partial
+from scrape_scheduler import ScrapeScheduler
 from retry_requests import retry_session
 from tenacity import retry, stop_after_attempt, wait_exponential
 from pathlib import Path
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import ThreadPoolExecutor
 
 # New imports for enhanced functionality
 import pandas as pd
@@ -71,26 +86,68 @@ async def fetch_page(url: str, session: aiohttp.ClientSession) -> str:
         logger.error(f"Error fetching {url}: {e}")
         return ""
 
-@retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=4, max=10))
-def fetch_page_sync(url: str) -> str:
-    """Synchronous version of fetch_page with retry logic"""
+def _should_retry(retry_state) -> bool:
+    """Retry failed fetches unless the circuit is open or the run's retry budget is spent"""
+    error = retry_state.outcome.exception()
+    if error is None or isinstance(error, (CircuitOpenError, CancelledError)):
+        return False
+    cancel_token = retry_state.kwargs.get('cancel_token')
+    if cancel_token is not None and cancel_token.cancelled:
+        return False
+    return retry_budget.try_acquire()
+
+_backoff = wait_exponential(multiplier=1, min=4, max=10)
+
+def _retry_wait(retry_state) -> float:
+    """Back off before a retry; a stop cuts the backoff short and the retry then bails out"""
+    seconds = _backoff(retry_state)
+    cancel_token = retry_state.kwargs.get('cancel_token')
+    if cancel_token is None:
+        return seconds
+    cancel_token.wait(seconds)
+    return 0
+
+@retry(stop=stop_after_attempt(3), wait=_retry_wait, retry=_should_retry, reraise=True)
+def fetch_page_sync(url: str, cancel_token: Optional[CancellationToken] = None) -> str:
+    """Synchronous version of fetch_page with retry logic and a per-host circuit breaker"""
+    if cancel_token is not None:
+        cancel_token.raise_if_cancelled()
+    breaker = breakers.get(urlparse(url).netloc)
+    if not breaker.allow():
+        raise CircuitOpenError(f"Circuit open for {breaker.name}")
+    retry_budget.record_request()
+    
     headers = {'User-Agent': ua.random}
+    started = time.monotonic()
     try:
         response = retry_session.get(url, headers=headers, timeout=30)
+        telemetry.latency(breaker.name).record(time.monotonic() - started)
+        telemetry.count('requests')
         if response.status_code == 200:
+            breaker.record_success()
             return response.text
         else:
+            # Server errors and throttling count against the host, missing pages do not
+            if response.status_code >= 500 or response.status_code == 429:
+                breaker.record_failure()
+                telemetry.count('errors')
+            else:
+                breaker.record_success()
             logger.warning(f"Non-200 status code {response.status_code} for {url}")
             return ""
     except Exception as e:
+        breaker.record_failure()
+        telemetry.count('errors')
         logger.error(f"Error fetching {url}: {e}")
         raise  # Re-raise to trigger retry
 
-async def fetch_all_pages(urls: List[str]) -> List[str]:
-    """Fetch multiple pages concurrently"""
+async def fetch_all_pages(urls: List[str], cancel_token: Optional[CancellationToken] = None) -> List[str]:
+    """Fetch multiple pages concurrently, aborting every open request on cancel"""
     async with aiohttp.ClientSession() as session:
-        tasks = [fetch_page(url, session) for url in urls]
-        return await asyncio.gather(*tasks)
+        tasks = asyncio.gather(*[fetch_page(url, session) for url in urls])
+        if cancel_token is not None:
+            return await run_cancellable(tasks, cancel_token)
+        return await tasks
 
 def export_jobs_to_excel(jobs: List[Dict], filename: str = None) -> str:
     """Export jobs to Excel with formatting"""
@@ -206,7 +263,8 @@ class VCPortfolioCompany(Base):
     company_id = Column(Integer, ForeignKey('companies.id'))  # Link to Company table
     name = Column(String(200))
     website = Column(String(500))
-    careers_page = Column(String(500))
+    careers_page = Column(String(500))  # URL, or "none" if no careers page was found
+    careers_page_checked = Column(DateTime)  # When careers_page was last discovered
     vc_firm = Column(String(200))
     investment_date = Column(DateTime)
     investment_amount = Column(Float)  # in USD
@@ -217,6 +275,12 @@ class VCPortfolioCompany(Base):
     # Relationship
     company_info = relationship("Company", backref="vc_investments")
 
+def init_db(database_url: str = 'sqlite:///jobs.db'):
+    """Create the database tables if needed and return a session factory"""
+    engine = create_engine(database_url)
+    Base.metadata.create_all(engine)
+    return sessionmaker(bind=engine)
+
 class TitleMatcher:
     """Advanced title matching utility class"""
     
@@ -378,21 +442,28 @@ class JobFilter:
                  min_salary: int = None,
                  job_types: List[str] = None,
                  experience_levels: List[str] = None):
+        self.reconfigure(keywords, locations, exclude_keywords, min_salary, job_types, experience_levels)
+        
+    def reconfigure(self, keywords: List[str], locations: List[str], 
+                    exclude_keywords: List[str] = None, 
+                    min_salary: int = None,
+                    job_types: List[str] = None,
+                    experience_levels: List[str] = None):
+        """Replace the filter criteria in place, so holders of this filter see the change"""
+        # Compile regex patterns for faster matching
+        keyword_patterns = [re.compile(r'\b' + re.escape(k) + r'\b', re.IGNORECASE) 
+                            for k in keywords]
+        exclude_patterns = [re.compile(r'\b' + re.escape(k) + r'\b', re.IGNORECASE) 
+                            for k in (exclude_keywords or [])]
+        
         self.keywords = [k.lower() for k in keywords]
         self.locations = [l.lower() for l in locations]
         self.exclude_keywords = [k.lower() for k in (exclude_keywords or [])]
         self.min_salary = min_salary
         self.job_types = [t.lower() for t in (job_types or [])]
         self.experience_levels = [e.lower() for e in (experience_levels or [])]
-        
-        # Initialize fuzzy matcher
-        self.fuzzy_matcher = FuzzyMatcher()
-        
-        # Compile regex patterns for faster matching
-        self.keyword_patterns = [re.compile(r'\b' + re.escape(k) + r'\b', re.IGNORECASE) 
-                               for k in keywords]
-        self.exclude_patterns = [re.compile(r'\b' + re.escape(k) + r'\b', re.IGNORECASE) 
-                               for k in (exclude_keywords or [])]
+        self.keyword_patterns = keyword_patterns
+        self.exclude_patterns = exclude_patterns
     
     def matches(self, job: Dict[str, Any]) -> bool:
         """Check if a job matches the filter criteria"""
@@ -443,46 +514,319 @@ class JobFilter:
         return True
 
 class JobScraper:
-    def __init__(self, config: Dict[str, Any]):
+    def __init__(self, config: Dict[str, Any], storage: Optional['JobStorage'] = None,
+                 storage_dir: str = 'data'):
+        self.config = config
+        self._storage = storage
+        self._storage_lock = threading.Lock()
+        self.storage_dir = storage.storage_dir if storage is not None else Path(storage_dir)
+        self.filter = JobFilter(**self._filter_settings(config))
+        # Shared pool for page fetches across all sources
+        self.fetch_pool = ThreadPoolExecutor(max_workers=config.get('fetch_workers', 8))
+        self.marks = HighWaterMarks(
+            storage_dir=self.storage_dir,
+            full_recrawl_hours=config.get('full_recrawl_hours', 24)
+        )
+        # Parsing and filtering are CPU-bound, so they run in worker processes
+        parse_workers = config.get('parse_workers', os.cpu_count())
+        self.parse_pool = ParsePool(self.filter, max_workers=parse_workers) if parse_workers else None
+        self.fingerprints = PageFingerprints(
+            storage_dir=self.storage_dir,
+            salt=self._fingerprint_salt(config)
+        ) if config.get('page_fingerprints', True) else None
+        self.checkpoint = RunCheckpoint(
+            storage_dir=self.storage_dir,
+            flush_seconds=config.get('checkpoint_seconds', 15)
+        )
+        self.planner = TaskPlanner(self.marks)
+        self.run_started = None
+        # Companies of the postings matched in the current run, for enrich_companies()
+        self.run_companies = set()
+        self.cancel_token = CancellationToken()
+        self.scheduler = TaskScheduler(
+            max_workers=config.get('task_workers', 8),
+            source_limits=config.get('source_concurrency', {})
+        )
+        
+    @property
+    def storage(self) -> 'JobStorage':
+        """The job store, loaded on first use so queue workers that only collect never open it"""
+        with self._storage_lock:
+            if self._storage is None:
+                self._storage = JobStorage(self.storage_dir)
+            return self._storage
+        
+    @staticmethod
+    def _filter_settings(config: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            'keywords': config.get('keywords', []),
+            'locations': config.get('locations', []),
+            'exclude_keywords': config.get('excluded_keywords', []),
+            'min_salary': config.get('min_salary'),
+            'job_types': config.get('job_types', []),
+            'experience_levels': config.get('experience_levels', [])
+        }
+        
+    @classmethod
+    def _fingerprint_salt(cls, config: Dict[str, Any]) -> str:
+        """Salt page fingerprints with the settings that decide which postings are kept
+        
+        Changing pool sizes, intervals or other tuning keys leaves the fingerprints valid.
+        """
+        return config_fingerprint(cls._filter_settings(config))
+        
+    def update_config(self, config: Dict[str, Any]):
+        """Apply a new config to this scraper without rebuilding its storage, pools or caches
+        
+        Filters, sources, search terms and limits apply from the next search task
+        on; pool sizes only change when the scraper is recreated.
+        """
+        # Validates the limits, so an invalid config changes nothing
+        self.scheduler.source_limits = config.get('source_concurrency', {})
+        self.filter.reconfigure(**self._filter_settings(config))
+        if self.parse_pool is not None:
+            self.parse_pool.set_filter(self.filter)
+        if self.fingerprints is not None:
+            self.fingerprints.salt = self._fingerprint_salt(config)
+        self.marks.full_recrawl_hours = config.get('full_recrawl_hours', 24)
+        self.checkpoint.flush_seconds = config.get('checkpoint_seconds', 15)
+        for key in ('fetch_workers', 'parse_workers', 'task_workers', 'page_fingerprints'):
+            if config.get(key) != self.config.get(key):
+                logger.info(f"{key} changes when the scraper is restarted")
         self.config = config
-        self.storage = JobStorage()
-        self.filter = JobFilter(
-            keywords=config.get('keywords', []),
-            locations=config.get('locations', []),
-            exclude_keywords=config.get('excluded_keywords', []),
-            min_salary=config.get('min_salary'),
-            job_types=config.get('job_types', []),
-            experience_levels=config.get('experience_levels', [])
+        logger.info("Scraper config updated")
+        
+    def scrape_board(self, board: str, job_type: str, location: str) -> Listing:
+        """Collect up to max_jobs_per_search postings from a paged job board"""
+        key = HighWaterMarks.key(board, job_type, location)
+        
+        def on_page(page: int, jobs: List[Dict[str, Any]]):
+            telemetry.count('pages_fetched')
+            if isinstance(jobs, UnchangedPage):
+                telemetry.count('pages_unchanged')
+            telemetry.count('jobs_found', len(jobs))
+            self.checkpoint.record_page(key, page, jobs)
+            
+        jobs = scrape_pages(
+            board, job_type, location,
+            fetch=partial(fetch_page_sync, cancel_token=self.cancel_token),
+            max_jobs=self.config.get('max_jobs_per_search', 100),
+            executor=self.fetch_pool,
+            max_in_flight=self.config.get('pages_in_flight', 4),
+            marks=self.marks if self.config.get('incremental', True) else None,
+            parse_pool=self.parse_pool,
+            pages=self.checkpoint.pages(key),
+            on_page=on_page,
+            fingerprints=self.fingerprints,
+            cancel_token=self.cancel_token
         )
+        return jobs
+        
+    def save_marks(self):
+        """Save high-water marks and page fingerprints"""
+        self.marks.save()
+        if self.fingerprints is not None:
+            self.fingerprints.save()
+        
+    def _matching(self, jobs: Listing) -> Listing:
+        """Apply the filter to postings the parse pool has not already filtered"""
+        if self.parse_pool is None:
+            jobs = Listing([job for job in jobs if self.filter.matches(job)], jobs.crawl)
+        telemetry.count('jobs_matched', len(jobs))
+        return jobs
         
-    def scrape(self):
-        """Main scraping method"""
+    def collect(self, task: SearchTask) -> Listing:
+        """Scrape one search and return the postings that match the filter
+        
+        If the scrape is stopped, the CancelledError's `partial` holds the matching
+        postings of the pages that were already parsed.
+        """
         try:
-            # Initialize scrapers based on config
-            scrapers = []
-            if self.config.get('use_linkedin'):
-                scrapers.append(LinkedInScraper(self.config))
-            if self.config.get('use_indeed'):
-                scrapers.append(IndeedScraper(self.config))
-                
-            # Run scrapers in parallel
-            with ThreadPoolExecutor(max_workers=len(scrapers)) as executor:
-                futures = [executor.submit(scraper.scrape) for scraper in scrapers]
-                for future in as_completed(futures):
-                    jobs = future.result()
-                    for job in jobs:
-                        if self.filter.matches(job):
-                            self.storage.save_job(job)
-                            
-            logger.info(f"Scraping completed. Total jobs: {self.storage.get_stats()['total_jobs']}")
+            jobs = self.scrape_board(task.source, task.keyword, task.location)
+        except CancelledError as e:
+            if e.partial is not None:
+                e.partial = self._matching(e.partial)
+            raise
+        jobs = self._matching(jobs)
+        logger.debug(f"{task}: {len(jobs)} matched")
+        return jobs
+        
+    def _run_task(self, task: SearchTask) -> int:
+        """Scrape one search and store the matching postings"""
+        if task.source not in enabled_sources(self.config):
+            # The source was disabled while the run was in progress
+            return 0
+        try:
+            jobs = self.collect(task)
+            saved = self.storage.save_jobs(jobs)
+        except CancelledError as e:
+            # Store what the stopped search already parsed; the task stays open in the
+            # checkpoint and its crawl records nothing, so the next run finishes it
+            if e.partial:
+                telemetry.count('jobs_saved', self.storage.save_jobs(e.partial))
+            raise
+        except Exception:
+            telemetry.count('errors')
+            raise
+        # Only now that the postings are stored may later crawls skip their pages
+        record_crawl(jobs.crawl, self.marks, self.fingerprints)
+        self.run_companies.update(job['company'] for job in jobs if job.get('company'))
+        telemetry.count('jobs_saved', saved)
+        telemetry.count('tasks_done')
+        self.checkpoint.complete_task(task.key)
+        return saved
+        
+    def scrape(self, sources: Optional[List[str]] = None) -> Optional[Dict[str, int]]:
+        """Main scraping method; returns the number of new jobs per source
+        
+        Only the given sources are scraped when `sources` is set. Returns None if
+        the run was stopped or failed, so schedulers do not read it as a run that
+        found nothing.
+        """
+        new_jobs = {}
+        if self.cancel_token.cancelled:
+            # The previous run was stopped; this one gets a fresh token
+            self.cancel_token = CancellationToken()
+        retry_budget.reset()
+        telemetry.reset()
+        self.run_started = telemetry.start_time
+        self.run_companies = set()
+        if self.fingerprints is not None:
+            self.fingerprints.reset_counts()
+        started = datetime.now()
+        # Continue an interrupted run with the same config instead of starting over
+        resumed = self.checkpoint.start(self.config)
+        try:
+            # Expand keywords x locations x sources and run them on the worker pool
+            tasks = self.planner.plan(self.config)
+            if sources is not None:
+                tasks = [task for task in tasks if task.source in sources]
+            pending = [task for task in tasks if not self.checkpoint.is_completed(task.key)]
+            if resumed:
+                logger.info(f"Resuming run: {len(tasks) - len(pending)} of {len(tasks)} search tasks already done")
+            logger.info(f"Planned {len(pending)} search tasks")
+            telemetry.gauge('tasks_total').set(len(pending))
+            results = self.scheduler.run(pending, self._run_task, self.cancel_token)
+            self.save_marks()
+            for task, count in results.items():
+                new_jobs[task.source] = new_jobs.get(task.source, 0) + (count or 0)
+            if self.cancel_token.cancelled:
+                # Keep the checkpoint so the next run picks up where this one stopped
+                self.checkpoint.flush()
+                logger.info(f"Scraping stopped after {telemetry.elapsed:.1f}s")
+                return None
+            
+            saved = sum(count or 0 for count in results.values())
+            self.storage.record_run({
+                'started': started.isoformat(),
+                'finished': datetime.now().isoformat(),
+                'resumed': resumed,
+                'tasks': len(tasks),
+                'tasks_skipped': len(tasks) - len(pending),
+                'new_jobs': saved,
+                'pages_unchanged': self.fingerprints.unchanged_pages if self.fingerprints else 0
+            })
+            self.checkpoint.finish()
+            logger.info(f"Scraping completed. New jobs: {saved}. Total jobs: {self.storage.get_stats()['total_jobs']}")
+            if self.fingerprints is not None:
+                logger.info(f"Pages skipped as unchanged: {self.fingerprints.unchanged_pages}")
+            self.enrich_companies(self.run_companies)
             
         except Exception as e:
+            self.checkpoint.flush()
             logger.error(f"Error during scraping: {e}")
+            return None
+        finally:
+            # The dashboard's snapshot catches up once per run rather than per saved batch
+            if self._storage is not None:
+                self._storage.refresh_snapshot()
+        return new_jobs
+        
+    def enrich_companies(self, names: Iterable[str]):
+        """Look up the companies of a run's postings on Crunchbase if `enrich_companies` is set
+        
+        Lookups are cached in the companies table of `database_url`, so companies
+        seen in earlier runs only cost a database read until their info expires.
+        """
+        if not self.config.get('enrich_companies') or not names:
+            return
+        # Imported here because company_enrichment imports this module
+        from company_enrichment import enrich_companies
+        try:
+            session_factory = init_db(self.config.get('database_url', 'sqlite:///jobs.db'))
+            enrich_companies(session_factory, sorted(names), self.config.get('enrich_drivers', 2),
+                             cancel_token=self.cancel_token)
+        except CancelledError:
+            logger.info("Company enrichment stopped")
+        except Exception as e:
+            logger.error(f"Error enriching companies: {e}")
+        
+    def start_scheduled_scraping(self):
+        """Scrape at the configured interval, adapted per source, until stop() is called"""
+        ScrapeScheduler(
+            self.scrape, self.config,
+            cancel_token=self.cancel_token,
+            storage_dir=self.storage_dir
+        ).run_forever()
             
     def get_jobs(self, filter: JobFilter = None) -> List[Dict[str, Any]]:
         """Get jobs matching filter criteria"""
         return self.storage.get_jobs(filter)
         
+    def stop(self):
+        """Stop the running scrape
+        
+        Searches in progress store the postings they already parsed and stay in
+        the checkpoint. Their abandoned requests are not interrupted, but finish
+        in the background within the fetch timeout, and no retries follow them.
+        """
+        logger.info("Stopping scrape")
+        self.cancel_token.cancel()
+        
+    def get_progress(self) -> Dict[str, Any]:
+        """Get live progress and throughput of the current run"""
+        tasks_total = telemetry.gauge('tasks_total').value
+        tasks_done = telemetry.value('tasks_done')
+        tasks_left = max(0, tasks_total - tasks_done)
+        pages = telemetry.value('pages_fetched')
+        
+        # Until a search finishes, assume each one uses its whole page budget
+        if tasks_done:
+            pages_per_task = pages / tasks_done
+        else:
+            pages_per_task = math.ceil(self.config.get('max_jobs_per_search', 100) / 10)
+        total_pages = max(pages, round(pages + tasks_left * pages_per_task)) if tasks_total else 0
+        
+        # ETA from the rolling task completion rate, falling back to the run average
+        tasks_per_minute = telemetry.rate('tasks_done').per_minute()
+        if not tasks_per_minute and tasks_done:
+            tasks_per_minute = tasks_done * 60 / telemetry.elapsed
+        remaining = tasks_left * 60 / tasks_per_minute if tasks_per_minute else 0
+        
+        return {
+            'start_time': self.run_started,
+            'elapsed_time': telemetry.elapsed if self.run_started else 0,
+            'estimated_time_remaining': remaining,
+            'jobs_found': telemetry.value('jobs_found'),
+            'jobs_matched': telemetry.value('jobs_matched'),
+            'jobs_saved': telemetry.value('jobs_saved'),
+            'errors': telemetry.value('errors'),
+            'jobs_per_minute': telemetry.rate('jobs_found').per_minute(),
+            'requests': telemetry.value('requests'),
+            'current_page': pages,
+            'total_pages': total_pages,
+            'pages_unchanged': telemetry.value('pages_unchanged'),
+            'tasks_done': tasks_done,
+            'tasks_total': tasks_total,
+            'latency': telemetry.latency_snapshot()
+        }
+        
+    def close(self):
+        """Shut down the fetch and parse pools"""
+        self.fetch_pool.shutdown(wait=False, cancel_futures=True)
+        if self.parse_pool is not None:
+            self.parse_pool.close()
+        
     def get_stats(self) -> Dict[str, Any]:
         """Get current statistics"""
         return self.storage.get_stats()
@@ -493,16 +837,27 @@ class JobStorage:
         self.storage_dir.mkdir(exist_ok=True)
         self.jobs_file = self.storage_dir / 'jobs.json'
         self.stats_file = self.storage_dir / 'stats.json'
+        self._lock = threading.RLock()
+        self.rollups = Rollups(self.storage_dir)
+        self.snapshot = ColumnarSnapshot(self.storage_dir)
         self._load_data()
+        if self.rollups.total_jobs != len(self.jobs):
+            # First run with rollups, or the files were edited by hand
+            self.rollups.rebuild(self.jobs)
+            self.rollups.save()
         
     def _load_data(self):
         """Load existing data from storage"""
+        self.jobs = []
+        self._urls = set()
+        self._title_companies = set()
         try:
             if self.jobs_file.exists():
-                with open(self.jobs_file, 'r') as f:
-                    self.jobs = json.load(f)
-            else:
-                self.jobs = []
+                # Stream the jobs so the file is never held in memory as a whole,
+                # indexing each one as it is read
+                for job in iter_json_array(self.jobs_file):
+                    self.jobs.append(job)
+                    self._index_job(job)
                 
             if self.stats_file.exists():
                 with open(self.stats_file, 'r') as f:
@@ -517,6 +872,8 @@ class JobStorage:
         except Exception as e:
             logger.error(f"Error loading data: {e}")
             self.jobs = []
+            self._urls = set()
+            self._title_companies = set()
             self.stats = {
                 'total_jobs': 0,
                 'last_updated': None,
@@ -524,23 +881,55 @@ class JobStorage:
                 'categories': {}
             }
             
+    def _index_job(self, job: Dict[str, Any]):
+        """Index a stored job for constant-time duplicate checks"""
+        self._urls.add(job.get('url'))
+        self._title_companies.add((job.get('title'), job.get('company')))
+        
     def save_job(self, job: Dict[str, Any]) -> bool:
         """Save a job to storage"""
+        return self.save_jobs([job]) == 1
+        
+    def save_jobs(self, jobs: List[Dict[str, Any]]) -> int:
+        """Save a batch of jobs to storage with a single write, returning how many were new
+        
+        Raises if jobs.json could not be written, so callers can keep the jobs for a retry.
+        Nothing is added in memory until the files are written, so a retry saves the batch.
+        """
         try:
-            # Validate job data
-            if not self._validate_job(job):
-                return False
-                
-            # Check for duplicates
-            if not self._is_duplicate(job):
-                self.jobs.append(job)
-                self._update_stats(job)
-                self._save_data()
-                return True
-            return False
+            with self._lock:
+                new = []
+                urls, title_companies = set(), set()
+                for job in jobs:
+                    # Validate job data and check for duplicates, also within the batch
+                    if not self._validate_job(job) or self._is_duplicate(job):
+                        continue
+                    if job['url'] in urls or (job['title'], job['company']) in title_companies:
+                        continue
+                    urls.add(job['url'])
+                    title_companies.add((job['title'], job['company']))
+                    new.append(job)
+                if not new:
+                    return 0
+
+                stats = json.loads(json.dumps(self.stats))
+                for job in new:
+                    self._update_stats(stats, job)
+                stats['total_jobs'] = len(self.jobs) + len(new)
+                self._save_data(new, stats)
+
+                self.jobs.extend(new)
+                self.stats = stats
+                for job in new:
+                    self._index_job(job)
+                    # Update the dashboard's rollup tables
+                    self.rollups.add(job)
+                # Rollups log their own errors and are brought back in step with jobs.json on load
+                self.rollups.save()
+                return len(new)
         except Exception as e:
-            logger.error(f"Error saving job: {e}")
-            return False
+            logger.error(f"Error saving jobs: {e}")
+            raise
             
     def _validate_job(self, job: Dict[str, Any]) -> bool:
         """Validate job data"""
@@ -549,34 +938,87 @@ class JobStorage:
         
     def _is_duplicate(self, job: Dict[str, Any]) -> bool:
         """Check if job is a duplicate"""
-        return any(
-            j['url'] == job['url'] or 
-            (j['title'] == job['title'] and j['company'] == job['company'])
-            for j in self.jobs
-        )
+        return job['url'] in self._urls or (job['title'], job['company']) in self._title_companies
         
-    def _update_stats(self, job: Dict[str, Any]):
-        """Update statistics"""
-        self.stats['total_jobs'] = len(self.jobs)
-        self.stats['last_updated'] = datetime.now().isoformat()
+    def _update_stats(self, stats: Dict[str, Any], job: Dict[str, Any]):
+        """Count a new job in a statistics dict"""
+        stats['last_updated'] = datetime.now().isoformat()
         
         # Update source stats
         source = job.get('source', 'unknown')
-        self.stats['sources'][source] = self.stats['sources'].get(source, 0) + 1
+        stats['sources'][source] = stats['sources'].get(source, 0) + 1
         
         # Update category stats
         category = job.get('category', 'unknown')
-        self.stats['categories'][category] = self.stats['categories'].get(category, 0) + 1
+        stats['categories'][category] = stats['categories'].get(category, 0) + 1
         
-    def _save_data(self):
-        """Save all data to storage"""
-        try:
-            with open(self.jobs_file, 'w') as f:
-                json.dump(self.jobs, f, indent=2)
-            with open(self.stats_file, 'w') as f:
-                json.dump(self.stats, f, indent=2)
-        except Exception as e:
-            logger.error(f"Error saving data: {e}")
+    def record_run(self, run: Dict[str, Any]):
+        """Record the summary of a scrape run in the statistics"""
+        with self._lock:
+            self.stats['last_run'] = run
+            if run.get('resumed'):
+                self.stats['resumed_runs'] = self.stats.get('resumed_runs', 0) + 1
+            try:
+                self._write_json(self.stats_file, self.stats)
+            except Exception as e:
+                logger.error(f"Error saving stats: {e}")
+            
+    def _write_json(self, path: Path, data: Any):
+        """Write a JSON file through a temporary file so a failed write leaves the old one intact"""
+        temp_file = path.with_suffix('.tmp')
+        with open(temp_file, 'w') as f:
+            json.dump(data, f, indent=2)
+        os.replace(temp_file, path)
+        
+    def _append_jobs(self, jobs: List[Dict[str, Any]]):
+        """Append jobs to jobs.json without serializing the stored ones again
+        
+        The current file is copied byte for byte and the new jobs are written over
+        its closing bracket, in the layout of json.dump(indent=2); the copy then
+        replaces jobs.json, so a failed write leaves the old file intact.
+        """
+        if not self.jobs or not self.jobs_file.exists():
+            self._write_json(self.jobs_file, self.jobs + jobs)
+            return
+        temp_file = self.jobs_file.with_suffix('.tmp')
+        shutil.copyfile(self.jobs_file, temp_file)
+        items = ',\n'.join(textwrap.indent(json.dumps(job, indent=2), '  ') for job in jobs)
+        with open(temp_file, 'r+b') as f:
+            # Find the end of the last element, before the closing bracket
+            f.seek(0, os.SEEK_END)
+            size = f.tell()
+            window = 64
+            while True:
+                start = max(0, size - window)
+                f.seek(start)
+                tail = f.read().rstrip()
+                if not tail.endswith(b']'):
+                    raise ValueError(f"{self.jobs_file} does not end with a JSON array")
+                body = tail[:-1].rstrip()
+                if body or start == 0:
+                    break
+                window *= 2
+            if not body:
+                raise ValueError(f"{self.jobs_file} does not end with a JSON array")
+            f.seek(start + len(body))
+            f.truncate()
+            separator = b'\n' if body.endswith(b'[') else b',\n'
+            f.write(separator + items.encode('utf-8') + b'\n]')
+        os.replace(temp_file, self.jobs_file)
+        
+    def _save_data(self, jobs: List[Dict[str, Any]], stats: Dict[str, Any]):
+        """Save new jobs and the statistics that count them; raises if either could not be written
+        
+        The statistics go first: if appending the jobs then fails, the next save
+        rewrites them from the in-memory counts, which never saw the failed batch.
+        """
+        self._write_json(self.stats_file, stats)
+        self._append_jobs(jobs)
+        
+    def refresh_snapshot(self):
+        """Bring the columnar snapshot up to date with the stored jobs, e.g. at the end of a run"""
+        with self._lock:
+            self.snapshot.refresh(self.jobs)
             
     def get_jobs(self, filter: JobFilter = None) -> List[Dict[str, Any]]:
         """Get jobs matching filter criteria"""
@@ -589,73 +1031,10 @@ class JobStorage:
         return self.stats
 
 if __name__ == "__main__":
-    # Example usage with enhanced fuzzy matching
-    filters = JobFilter(
-        min_salary=100000,
-        remote=True,
-        required_skills=['python', 'sql'],
-        posted_within_days=7,
-        
-        # Basic title filtering
-        title_includes=['senior', 'lead'],
-        title_excludes=['junior', 'intern'],
-        
-        # Complex pattern matching
-        title_patterns=[
-            {
-                'required_words': ['engineer', 'developer'],
-                'position_level': ['senior', 'lead', 'staff', 'principal'],
-                'technologies': ['python', 'java', 'golang'],
-                'specialization': ['backend', 'frontend', 'fullstack']
-            },
-            {
-                'required_words': ['architect'],
-                'technologies': ['cloud', 'aws', 'azure'],
-                'specialization': ['solutions', 'systems', 'enterprise']
-            }
-        ],
-        
-        # Position level matching
-        position_levels=[
-            'senior', 'lead', 'staff', 'principal', 'architect',
-            'manager', 'director', 'head of', 'vp'
-        ],
-        
-        # Technology stack matching
-        technologies=[
-            'python', 'java', 'javascript', 'typescript', 'golang',
-            'react', 'angular', 'vue', 'node.js', 'django', 'flask',
-            'aws', 'azure', 'gcp', 'kubernetes', 'docker'
-        ],
-        
-        # Specialization matching
-        specializations=[
-            'backend', 'frontend', 'fullstack', 'devops', 'sre',
-            'machine learning', 'data science', 'security', 'mobile'
-        ],
-        
-        # Fuzzy matching with common variations
-        fuzzy_title_matches=[
-            "Senior Software Engineer",
-            "Lead Backend Developer",
-            "Principal Engineer",
-            "Technical Architect",
-            "Engineering Manager",
-            "Staff Software Engineer",
-            "Senior Full Stack Developer",
-            "DevOps Engineer",
-            "Machine Learning Engineer",
-            "Data Scientist"
-        ],
-        fuzzy_threshold=80  # Minimum similarity score (0-100)
-    )
+    with open('config.json', 'r') as f:
+        config = json.load(f)
     
-    scraper = JobScraper(
-        job_type="software engineer",
-        location="San Francisco, CA",
-        database_url="sqlite:///jobs.db",
-        filters=filters
-    )
+    scraper = JobScraper(config)
     
     # Start scheduled scraping
-    scraper.start_scheduled_scraping() 
\ No newline at end of file
+    scraper.start_scheduled_scraping()
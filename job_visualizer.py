@@ -4,16 +4,95 @@ import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 from datetime import datetime, timedelta
 import streamlit as st
-from typing import List, Dict, Any
+from typing import Iterator, List, Dict, Any, Tuple
 import json
 from pathlib import Path
 import random
+from loguru import logger
+from job_frame import memory_usage, typed_frame
+from rollups import Rollups
+from columnar_snapshot import ColumnarSnapshot
+from json_stream import iter_json_array
+
+# Columns the dashboard and reports rely on, added empty when the data lacks them
+DASHBOARD_COLUMNS = ['title', 'company', 'location', 'salary', 'source', 'date_posted']
+# Columns of the dashboard's jobs table
+TABLE_COLUMNS = DASHBOARD_COLUMNS + ['job_type', 'remote', 'url']
+# Columns written by export_to_excel; salary_text replaces the parsed salary there
+EXPORT_COLUMNS = TABLE_COLUMNS + ['salary_text', 'category', 'description']
+
+def data_version(path: Path) -> Tuple[int, int]:
+    """Modification time and size of a data file, used as its cache key"""
+    try:
+        stat = path.stat()
+        return stat.st_mtime_ns, stat.st_size
+    except OSError:
+        return 0, 0
+
+@st.cache_resource(show_spinner=False, max_entries=4)
+def load_jobs_frame(storage_dir: str, version: Tuple[str, int, int],
+                    columns: Tuple[str, ...] = tuple(TABLE_COLUMNS)) -> pd.DataFrame:
+    """Typed frame of the given job columns, shared by all sessions until the data changes
+    
+    Read from the columnar snapshot when there is one, otherwise from jobs.json.
+    The frame is shared, not copied, so callers must not modify it.
+    """
+    snapshot = ColumnarSnapshot(storage_dir)
+    if snapshot.exists:
+        df = snapshot.read_frame(columns=columns)
+    else:
+        df = typed_frame(iter_json_array(Path(storage_dir) / 'jobs.json'), columns=columns, full=True)
+    for column in DASHBOARD_COLUMNS:
+        if column not in df:
+            df[column] = None
+    logger.info(f"Loaded {len(df)} jobs into {memory_usage(df) / 1e6:.1f} MB")
+    return df
+
+@st.cache_resource(show_spinner=False, max_entries=2)
+def load_rollups(storage_dir: str, version: Tuple[str, int, int]) -> Rollups:
+    """Rollup tables, shared by all sessions until they change
+    
+    Stores written before rollups existed have no rollups file; the tables are
+    then built from jobs.json in memory.
+    """
+    rollups = Rollups(storage_dir)
+    if not rollups.exists:
+        rollups.rebuild(iter_json_array(rollups.storage_dir / 'jobs.json'))
+    return rollups
+
+def _counts(table: Dict[str, int]) -> pd.Series:
+    return pd.Series(table, dtype='int64')
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def dashboard_aggregates(storage_dir: str, version: Tuple[str, int, int], sources: Tuple[str, ...]) -> Dict[str, Any]:
+    """Chart data for the jobs of the given sources, from the rollups of this version"""
+    rollups = load_rollups(storage_dir, version)
+    tables = rollups.combine(sources, ('jobs', 'salary_sum', 'salary_count', 'companies', 'locations',
+                                       'families', 'salary_bins', 'daily'))
+    salary_bins = pd.Series({int(start): n for start, n in tables['salary_bins'].items()}, dtype='int64')
+    daily_postings = _counts(tables['daily'])
+    daily_postings.index = pd.to_datetime(daily_postings.index)
+    return {
+        'total_jobs': tables['jobs'],
+        'unique_companies': len(tables['companies']),
+        'average_salary': tables['salary_sum'] / tables['salary_count'] if tables['salary_count'] else 0,
+        'source_counts': _counts({
+            source: rollups.tables['sources'][source]['jobs']
+            for source in sources if source in rollups.tables['sources']
+        }).sort_values(ascending=False),
+        'salary_bins': salary_bins.sort_index(),
+        'top_companies': _counts(tables['companies']).nlargest(10),
+        'top_locations': _counts(tables['locations']).nlargest(10),
+        'top_title_families': _counts(tables['families']).nlargest(10),
+        'daily_postings': daily_postings.sort_index()
+    }
 
 class JobVisualizer:
     def __init__(self, storage_dir: str = 'data'):
         self.storage_dir = Path(storage_dir)
         self.jobs_file = self.storage_dir / 'jobs.json'
         self.stats_file = self.storage_dir / 'stats.json'
+        self.rollups_file = self.storage_dir / 'rollups.json'
         self._ensure_data_exists()
         self._load_data()
         
@@ -68,68 +147,115 @@ class JobVisualizer:
         # Save stats to file
         with open(self.stats_file, 'w') as f:
             json.dump(stats, f, indent=2)
+        
+        # Build the dashboard's rollup tables and columnar snapshot
+        rollups = Rollups(self.storage_dir)
+        rollups.rebuild(jobs)
+        rollups.save()
+        ColumnarSnapshot(self.storage_dir).rebuild(jobs)
             
     def _load_data(self):
-        """Load job data from storage"""
+        """Load statistics from storage; jobs are loaded through the shared cache"""
         try:
-            with open(self.jobs_file, 'r') as f:
-                self.jobs = json.load(f)
             with open(self.stats_file, 'r') as f:
                 self.stats = json.load(f)
         except Exception as e:
             print(f"Error loading data: {e}")
-            self.jobs = []
             self.stats = {}
             
+    @property
+    def version(self) -> Tuple[str, int, int]:
+        # Jobs are read from the snapshot when there is one, so follow its manifest
+        manifest = self.storage_dir / 'snapshot' / 'manifest.json'
+        path = manifest if manifest.exists() else self.jobs_file
+        return (path.name,) + data_version(path)
+        
+    @property
+    def frame(self) -> pd.DataFrame:
+        """Current jobs as a shared, read-only DataFrame of the table columns"""
+        return self.load_frame(TABLE_COLUMNS)
+        
+    def load_frame(self, columns: List[str]) -> pd.DataFrame:
+        """Current jobs as a shared, read-only DataFrame of the given columns"""
+        try:
+            return load_jobs_frame(str(self.storage_dir), self.version, tuple(columns))
+        except Exception as e:
+            print(f"Error loading data: {e}")
+            return pd.DataFrame(columns=DASHBOARD_COLUMNS)
+            
+    @property
+    def jobs(self) -> Iterator[Dict[str, Any]]:
+        """Current jobs as dicts of the table columns, built one row at a time"""
+        frame = self.frame
+        for row in frame.itertuples(index=False, name=None):
+            yield dict(zip(frame.columns, row))
+        
+    @property
+    def rollups_version(self) -> Tuple[str, int, int]:
+        # Without a rollups file the tables come from jobs.json, so follow that file instead
+        path = self.rollups_file if self.rollups_file.exists() else self.jobs_file
+        return (path.name,) + data_version(path)
+        
+    def aggregates(self, sources: List[str]) -> Dict[str, Any]:
+        """Cached chart data for the selected sources"""
+        return dashboard_aggregates(str(self.storage_dir), self.rollups_version, tuple(sorted(sources)))
+        
+    def sources(self) -> List[str]:
+        try:
+            return load_rollups(str(self.storage_dir), self.rollups_version).sources()
+        except Exception as e:
+            print(f"Error loading data: {e}")
+            return []
+            
     def create_dashboard(self):
         """Create an interactive Streamlit dashboard"""
         st.title("Job Market Analysis Dashboard")
         
-        # Convert jobs to DataFrame
-        df = pd.DataFrame(self.jobs)
-        
         # Sidebar filters
         st.sidebar.header("Filters")
+        all_sources = self.sources()
         sources = st.sidebar.multiselect(
             "Select Sources",
-            options=df['source'].unique(),
-            default=df['source'].unique()
+            options=all_sources,
+            default=all_sources
         )
-        
-        # Filter data
-        df_filtered = df[df['source'].isin(sources)]
+        data = self.aggregates(sources)
         
         # Overview metrics
         col1, col2, col3 = st.columns(3)
         with col1:
-            st.metric("Total Jobs", len(df_filtered))
+            st.metric("Total Jobs", data['total_jobs'])
         with col2:
-            st.metric("Unique Companies", df_filtered['company'].nunique())
+            st.metric("Unique Companies", data['unique_companies'])
         with col3:
-            st.metric("Average Salary", f"${df_filtered['salary'].mean():,.0f}")
+            st.metric("Average Salary", f"${data['average_salary']:,.0f}")
             
+        self.show_charts(data)
+        
+    def show_charts(self, data: Dict[str, Any]):
+        """Render the dashboard charts from cached aggregates"""
         # Job distribution by source
         st.subheader("Job Distribution by Source")
         fig = px.pie(
-            df_filtered,
-            names='source',
+            names=data['source_counts'].index,
+            values=data['source_counts'].values,
             title='Job Distribution by Source'
         )
         st.plotly_chart(fig)
         
         # Salary distribution
         st.subheader("Salary Distribution")
-        fig = px.histogram(
-            df_filtered,
-            x='salary',
-            nbins=30,
+        fig = px.bar(
+            x=data['salary_bins'].index,
+            y=data['salary_bins'].values,
+            labels={'x': 'salary', 'y': 'count'},
             title='Salary Distribution'
         )
         st.plotly_chart(fig)
         
         # Top companies
         st.subheader("Top Companies by Job Postings")
-        top_companies = df_filtered['company'].value_counts().head(10)
+        top_companies = data['top_companies']
         fig = px.bar(
             x=top_companies.index,
             y=top_companies.values,
@@ -137,10 +263,30 @@ class JobVisualizer:
         )
         st.plotly_chart(fig)
         
+        # Top locations and roles
+        col1, col2 = st.columns(2)
+        with col1:
+            st.subheader("Top Locations")
+            top_locations = data['top_locations']
+            fig = px.bar(
+                x=top_locations.index,
+                y=top_locations.values,
+                title='Top 10 Locations by Job Postings'
+            )
+            st.plotly_chart(fig)
+        with col2:
+            st.subheader("Top Roles")
+            top_roles = data['top_title_families']
+            fig = px.bar(
+                x=top_roles.index,
+                y=top_roles.values,
+                title='Top 10 Title Families by Job Postings'
+            )
+            st.plotly_chart(fig)
+        
         # Job posting trends
         st.subheader("Job Posting Trends")
-        df_filtered['date_posted'] = pd.to_datetime(df_filtered['date_posted'])
-        daily_postings = df_filtered.groupby('date_posted').size()
+        daily_postings = data['daily_postings']
         fig = px.line(
             x=daily_postings.index,
             y=daily_postings.values,
@@ -150,11 +296,12 @@ class JobVisualizer:
         
     def create_report(self, output_file: str = 'job_report.html'):
         """Create a comprehensive HTML report"""
-        df = pd.DataFrame(self.jobs)
+        data = self.aggregates(self.sources())
         
         # Create the report
         fig = make_subplots(
             rows=2, cols=2,
+            specs=[[{'type': 'domain'}, {}], [{}, {}]],
             subplot_titles=(
                 'Job Distribution by Source',
                 'Salary Distribution',
@@ -166,18 +313,18 @@ class JobVisualizer:
         # Add plots
         fig.add_trace(
             go.Pie(
-                labels=df['source'].value_counts().index,
-                values=df['source'].value_counts().values
+                labels=data['source_counts'].index,
+                values=data['source_counts'].values
             ),
             row=1, col=1
         )
         
         fig.add_trace(
-            go.Histogram(x=df['salary']),
+            go.Bar(x=data['salary_bins'].index, y=data['salary_bins'].values),
             row=1, col=2
         )
         
-        top_companies = df['company'].value_counts().head(10)
+        top_companies = data['top_companies']
         fig.add_trace(
             go.Bar(
                 x=top_companies.index,
@@ -186,8 +333,7 @@ class JobVisualizer:
             row=2, col=1
         )
         
-        df['date_posted'] = pd.to_datetime(df['date_posted'])
-        daily_postings = df.groupby('date_posted').size()
+        daily_postings = data['daily_postings']
         fig.add_trace(
             go.Scatter(
                 x=daily_postings.index,
@@ -211,7 +357,10 @@ class JobVisualizer:
         
     def export_to_excel(self, output_file: str = 'jobs.xlsx'):
         """Export job data to Excel with formatting"""
-        df = pd.DataFrame(self.jobs)
+        df = self.load_frame(EXPORT_COLUMNS)
+        if 'salary_text' in df:
+            # Export salaries as they were posted rather than the parsed lower bound
+            df = df.drop(columns=['salary']).rename(columns={'salary_text': 'salary'})
         
         # Create Excel writer
         writer = pd.ExcelWriter(output_file, engine='xlsxwriter')
@@ -238,7 +387,7 @@ class JobVisualizer:
         for idx, col in enumerate(df):
             series = df[col]
             max_len = max((
-                series.astype(str).map(len).max(),
+                series.astype(str).str.len().fillna(0).max(),
                 len(str(series.name))
             )) + 1
             worksheet.set_column(idx, idx, max_len)
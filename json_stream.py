@@ -0,0 +1,97 @@
+"""
+Incremental reader for large JSON arrays such as data/jobs.json.
+
+json.load() reads the whole file into one string and then builds every record
+before returning, so peak memory is several times the size of an indented
+jobs.json. iter_json_array() reads the file in fixed-size chunks and decodes one
+element at a time with the standard library's raw_decoder, so only the current
+chunk and the record being decoded are held at once. Callers build indexes,
+stats and columns from each record as it arrives.
+"""
+import json
+from pathlib import Path
+from typing import Any, Iterator, TextIO, Union
+
+CHUNK_SIZE = 1 << 16
+
+_WHITESPACE = ' \t\n\r'
+_DELIMITERS = _WHITESPACE + ',]'
+_decoder = json.JSONDecoder()
+
+
+def _read_elements(f: TextIO, chunk_size: int) -> Iterator[Any]:
+    buffer = f.read(chunk_size)
+    pos = 0
+    eof = not buffer
+    expect_start = True
+    # Set after each element, which must be followed by a comma or the closing bracket
+    after_element = False
+    # Set after a comma, which must be followed by another element
+    after_comma = False
+
+    def fill() -> bool:
+        """Read another chunk, dropping what was already consumed; False at end of file"""
+        nonlocal buffer, pos, eof
+        chunk = f.read(chunk_size)
+        if not chunk:
+            eof = True
+            return False
+        buffer = buffer[pos:] + chunk
+        pos = 0
+        return True
+
+    while True:
+        # Skip whitespace and separators up to the next element
+        while True:
+            while pos < len(buffer) and buffer[pos] in _WHITESPACE:
+                pos += 1
+            if pos < len(buffer):
+                break
+            if not fill():
+                raise ValueError("Unexpected end of JSON array")
+        char = buffer[pos]
+        if expect_start:
+            if char != '[':
+                raise ValueError(f"Expected a JSON array, found {char!r}")
+            expect_start = False
+            pos += 1
+            continue
+        if char == ']':
+            if after_comma:
+                raise json.JSONDecodeError("Trailing comma in JSON array", buffer, pos)
+            return
+        if after_element:
+            if char != ',':
+                raise ValueError(f"Expected ',' or ']' in JSON array, found {char!r}")
+            after_element = False
+            after_comma = True
+            pos += 1
+            continue
+
+        while True:
+            try:
+                element, end = _decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                # The element continues in the next chunk
+                if fill():
+                    continue
+                raise
+            if not isinstance(element, (dict, list, str)) and not eof and \
+                    (end == len(buffer) or buffer[end] not in _DELIMITERS):
+                # A number is only complete once a delimiter follows it; it may continue in the next chunk
+                if fill():
+                    continue
+            break
+        pos = end
+        after_element = True
+        after_comma = False
+        yield element
+
+
+def iter_json_array(source: Union[str, Path, TextIO], chunk_size: int = CHUNK_SIZE) -> Iterator[Any]:
+    """Yield the elements of a top-level JSON array one at a time"""
+    if isinstance(source, (str, Path)):
+        with open(source, 'r') as f:
+            yield from _read_elements(f, chunk_size)
+    else:
+        yield from _read_elements(source, chunk_size)
@@ -0,0 +1,81 @@
+"""
+Migrate an existing data/jobs.json into the derived storage formats.
+
+Streams jobs.json with json_stream.iter_json_array and, in one pass, rebuilds:
+
+    rollups.json    the dashboard's aggregate tables
+    snapshot/       the columnar snapshot, appended `batch_size` postings at a time
+    stats.json      job totals per source and category (other entries are kept)
+
+At most one batch of postings is in memory at a time, so stores too large to
+json.load() can be migrated. Run it with `python migrate_storage.py`; JobStorage
+keeps the formats up to date from then on.
+"""
+import argparse
+import json
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict
+
+from loguru import logger
+
+from columnar_snapshot import ColumnarSnapshot
+from json_stream import iter_json_array
+from rollups import Rollups
+
+
+def migrate(storage_dir: str = 'data', batch_size: int = 10000) -> Dict[str, Any]:
+    """Rebuild rollups, snapshot and stats from jobs.json without loading it whole"""
+    storage_dir = Path(storage_dir)
+    jobs_file = storage_dir / 'jobs.json'
+    stats_file = storage_dir / 'stats.json'
+
+    rollups = Rollups(storage_dir)
+    rollups.reset()
+    snapshot = ColumnarSnapshot(storage_dir)
+    snapshot.rebuild([])
+    sources: Dict[str, int] = {}
+    categories: Dict[str, int] = {}
+
+    batch = []
+    total = 0
+    for job in iter_json_array(jobs_file):
+        rollups.add(job)
+        source = job.get('source', 'unknown')
+        sources[source] = sources.get(source, 0) + 1
+        category = job.get('category', 'unknown')
+        categories[category] = categories.get(category, 0) + 1
+        batch.append(job)
+        total += 1
+        if len(batch) >= batch_size:
+            snapshot.append(batch)
+            batch = []
+            logger.info(f"Migrated {total} jobs")
+    if batch:
+        snapshot.append(batch)
+    rollups.save()
+
+    stats = {}
+    if stats_file.exists():
+        with open(stats_file, 'r') as f:
+            stats = json.load(f)
+    stats.update({
+        'total_jobs': total,
+        'last_updated': datetime.now().isoformat(),
+        'sources': sources,
+        'categories': categories
+    })
+    with open(stats_file, 'w') as f:
+        json.dump(stats, f, indent=2)
+
+    logger.info(f"Migrated {total} jobs into {rollups.rollups_file}, {snapshot.directory} and {stats_file}")
+    return {'jobs': total, 'snapshot_segments': len(snapshot.manifest['segments'])}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Stream jobs.json into the rollup, snapshot and stats files")
+    parser.add_argument("--storage-dir", default="data")
+    parser.add_argument("--batch-size", type=int, default=10000)
+    args = parser.parse_args()
+
+    print(json.dumps(migrate(args.storage_dir, args.batch_size), indent=2))
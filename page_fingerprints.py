@@ -0,0 +1,149 @@
+"""
+Content fingerprints of listing pages.
+
+Most listing pages come back identical to the previous run apart from ads,
+scripts and relative timestamps. For every fetched page we hash a normalized
+copy of its job-card region, found with plain string searches so no parsing is
+needed, and compare it with the hash stored for the same (source, query, page).
+Unchanged pages skip parsing, filtering and storage entirely.
+
+New fingerprints are only stored once a search has finished and its postings
+have been saved, and only for pages whose postings made it into the result, so
+a page is never skipped before its postings were stored.
+"""
+import hashlib
+import json
+import re
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Tuple
+
+from loguru import logger
+
+# Markup that changes between requests without changing the listings
+_NOISE = re.compile(
+    r'<!--.*?-->|<(script|style|noscript|iframe|ins)\b.*?</\1\s*>',
+    re.IGNORECASE | re.DOTALL
+)
+_TIMESTAMPS = re.compile(
+    r'\b\d{4}-\d{2}-\d{2}[T ][\d:.]+(?:Z|[+-]\d{2}:?\d{2})?'
+    r'|\b(?:\d+|an?)\s*(?:second|minute|hour|day|week|month)s?\s+ago\b'
+    r'|\bjust posted\b|\btoday\b|\byesterday\b',
+    re.IGNORECASE
+)
+_DATA_ATTRIBUTES = re.compile(r'\sdata-[\w-]+="[^"]*"')
+_WHITESPACE = re.compile(r'\s+')
+
+_card_patterns: Dict[str, re.Pattern] = {}
+
+
+def _card_pattern(card_selector: str) -> re.Pattern:
+    """Pattern for the opening tag of a job card, from the spec's card selector"""
+    pattern = _card_patterns.get(card_selector)
+    if pattern is None:
+        # Only the last compound selector names the card element itself
+        last = re.split(r'[\s>+~]+', card_selector.strip())[-1]
+        tag, _, css_class = last.partition('.')
+        css_class = css_class.split('.')[0]
+        if css_class:
+            pattern = re.compile(r'<%s\b[^>]*\bclass="[^"]*\b%s\b' % (tag or r'\w+', re.escape(css_class)))
+        else:
+            pattern = re.compile(r'<%s\b' % re.escape(tag))
+        _card_patterns[card_selector] = pattern
+    return pattern
+
+
+def normalize(html: str) -> str:
+    """Strip markup that changes between requests without changing the listings"""
+    html = _NOISE.sub('', html)
+    html = _DATA_ATTRIBUTES.sub('', html)
+    html = _TIMESTAMPS.sub('', html)
+    return _WHITESPACE.sub(' ', html)
+
+
+def card_region(html: str, card_selector: str) -> Tuple[Optional[str], int]:
+    """Slice of a normalized page from the first job card to the end of the last one, and the number of cards"""
+    starts = [match.start() for match in _card_pattern(card_selector).finditer(html)]
+    if not starts:
+        return None, 0
+    if len(starts) > 1:
+        # The last card ends where its markup ends; assume it is no longer than the longest other card
+        card_length = max(b - a for a, b in zip(starts, starts[1:]))
+    else:
+        card_length = 20000
+    return html[starts[0]:starts[-1] + card_length], len(starts)
+
+
+def fingerprint(html: str, card_selector: str) -> Tuple[Optional[str], int]:
+    """Normalized hash of a listing page's job cards (None if it has none) and the number of cards"""
+    region, cards = card_region(normalize(html), card_selector)
+    if region is None:
+        return None, 0
+    return hashlib.sha1(region.encode('utf-8')).hexdigest(), cards
+
+
+class PageFingerprints:
+    """Fingerprints of the listing pages seen per (source, query, page)"""
+
+    def __init__(self, storage_dir: str = 'data', salt: str = ''):
+        self.storage_dir = Path(storage_dir)
+        self.storage_dir.mkdir(exist_ok=True)
+        self.fingerprints_file = self.storage_dir / 'page_fingerprints.json'
+        # Mixed into every hash so a config change invalidates all fingerprints
+        self.salt = salt
+        self.unchanged_pages = 0
+        self._pending: Dict[str, Dict[str, str]] = {}
+        self._lock = threading.Lock()
+        self._load_data()
+
+    def _load_data(self):
+        """Load existing fingerprints from storage"""
+        try:
+            if self.fingerprints_file.exists():
+                with open(self.fingerprints_file, 'r') as f:
+                    self.fingerprints = json.load(f)
+            else:
+                self.fingerprints = {}
+        except Exception as e:
+            logger.error(f"Error loading page fingerprints: {e}")
+            self.fingerprints = {}
+
+    def save(self):
+        """Save all fingerprints to storage"""
+        with self._lock:
+            try:
+                with open(self.fingerprints_file, 'w') as f:
+                    json.dump(self.fingerprints, f)
+            except Exception as e:
+                logger.error(f"Error saving page fingerprints: {e}")
+
+    def reset_counts(self):
+        """Start counting unchanged pages for a new run"""
+        self.unchanged_pages = 0
+
+    def unchanged_cards(self, key: str, page: int, html: str, card_selector: str) -> Optional[int]:
+        """Number of job cards if a page matches its stored fingerprint, otherwise None
+
+        The new fingerprint of a changed page is held until take_pending().
+        """
+        value, cards = fingerprint(html, card_selector)
+        if value is None:
+            return None
+        value = hashlib.sha1((self.salt + value).encode('utf-8')).hexdigest()
+        with self._lock:
+            if self.fingerprints.get(key, {}).get(str(page)) == value:
+                self.unchanged_pages += 1
+                return cards
+            self._pending.setdefault(key, {})[str(page)] = value
+        return None
+
+    def take_pending(self, key: str, pages: Iterable[int]) -> Dict[str, str]:
+        """Remove and return the new fingerprints of a finished search's pages that were used"""
+        with self._lock:
+            pending = self._pending.pop(key, {})
+        return {str(page): pending[str(page)] for page in pages if str(page) in pending}
+
+    def store(self, key: str, values: Dict[str, str]):
+        """Store fingerprints from take_pending() once the pages' postings were saved"""
+        with self._lock:
+            self.fingerprints.setdefault(key, {}).update(values)
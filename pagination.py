@@ -0,0 +1,208 @@
+"""
+Concurrent pagination for paged job boards.
+
+A Paginator keeps up to `max_in_flight` listing pages in flight on a thread pool,
+parses each page as soon as it arrives and stops submitting new pages once a page
+comes back empty or short, once enough results have been collected, or once the
+optional `stop_when(page, jobs)` predicate says the rest of the listing is not
+worth fetching (e.g. every posting on the page is already known).
+
+Pages fetched by an earlier, interrupted run can be passed in as `pages`; they are
+not fetched again, and `on_page(page, jobs)` is called for every newly fetched page
+so the caller can checkpoint them.
+
+An optional `unchanged(page, html)` check runs on every fetched page before it is
+parsed and returns the page's number of job cards if the page has not changed since
+the last crawl. Unchanged pages are not parsed and contribute no results, but their
+size still counts towards detecting the last page; with `stop_on_unchanged` they
+also end the pagination, like a page of known postings.
+
+With a `cancel_token`, run() stops as soon as the token is cancelled: pages still in
+flight are abandoned and CancelledError is raised. Its `partial` holds the results
+of the pages that did complete, in page order; they were also passed to on_page.
+
+A page whose fetch or parse raises is not taken for the end of the listing: later
+pages are still fetched, the failed page is skipped without calling on_page (so a
+resumed run fetches it again) and is listed in `failed_pages`. `reached_end` tells
+whether every page up to the end of the listing, or up to the page and result
+limits, completed.
+"""
+import math
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Callable, Dict, List, Optional
+
+from loguru import logger
+
+from cancellation import CancellationToken, CancelledError
+
+
+class UnchangedPage(list):
+    """Result of a page that was skipped because its content has not changed"""
+
+    def __init__(self, size: int = 0):
+        super().__init__()
+        self.size = size
+
+
+class Paginator:
+    """Fetch pages 1..K of a listing concurrently and collect their results in page order"""
+
+    def __init__(self, fetch: Callable[[str], str],
+                 parse: Callable[[str, int], List[Dict]],
+                 executor: Optional[ThreadPoolExecutor] = None,
+                 max_results: int = 100,
+                 per_page: Optional[int] = None,
+                 max_pages: Optional[int] = None,
+                 max_in_flight: int = 4,
+                 stop_when: Optional[Callable[[int, List[Dict]], bool]] = None,
+                 pages: Optional[Dict[int, List[Dict]]] = None,
+                 on_page: Optional[Callable[[int, List[Dict]], None]] = None,
+                 unchanged: Optional[Callable[[int, str], Optional[int]]] = None,
+                 stop_on_unchanged: bool = False,
+                 cancel_token: Optional[CancellationToken] = None):
+        self.fetch = fetch
+        self.parse = parse
+        self.executor = executor
+        self.max_results = max_results
+        self.per_page = per_page
+        self.max_pages = max_pages
+        self.max_in_flight = max(1, max_in_flight)
+        self.stop_when = stop_when
+        self.pages = pages or {}
+        self.on_page = on_page
+        self.unchanged = unchanged
+        self.stop_on_unchanged = stop_on_unchanged
+        self.cancel_token = cancel_token
+        self.pages_fetched = 0
+        self.pages_unchanged = 0
+        self.failed_pages: List[int] = []
+        self.reached_end = False
+        # Last page whose postings, and those of every page before it, were returned by run()
+        self.complete_pages = 0
+
+    def _page_limit(self) -> int:
+        """Number of pages needed to reach max_results"""
+        if self.max_pages:
+            return self.max_pages
+        return max(1, math.ceil(self.max_results / (self.per_page or 10)))
+
+    def _fetch_and_parse(self, page_url: Callable[[int], str], page: int) -> List[Dict]:
+        html = self.fetch(page_url(page))
+        if not html:
+            return []
+        if self.unchanged:
+            size = self.unchanged(page, html)
+            if size is not None:
+                return UnchangedPage(size)
+        return self.parse(html, page)
+
+    def run(self, page_url: Callable[[int], str]) -> List[Dict]:
+        """Collect results for the listing whose page URLs are given by page_url(page)"""
+        own_executor = self.executor is None
+        executor = self.executor or ThreadPoolExecutor(max_workers=self.max_in_flight)
+
+        page_limit = self._page_limit()
+        last_page = page_limit
+        full_page_size = self.per_page or 0
+        results: Dict[int, List[Dict]] = {}
+        failed = set()
+        in_flight = {}
+        next_page = 1
+
+        def page_size(jobs: List[Dict]) -> int:
+            return jobs.size if isinstance(jobs, UnchangedPage) else len(jobs)
+
+        def settle(page: int, jobs: List[Dict]):
+            nonlocal last_page, full_page_size
+            results[page] = jobs
+            size = page_size(jobs)
+            if not self.per_page and size > full_page_size:
+                # Learn the page size from the largest page seen so far; pages that
+                # arrived earlier may turn out to be short once it grows
+                full_page_size = size
+                short = [p for p, r in results.items() if page_size(r) < full_page_size]
+                if short:
+                    last_page = min(last_page, min(short))
+            if not size or size < full_page_size:
+                last_page = min(last_page, page)
+            elif isinstance(jobs, UnchangedPage):
+                if self.stop_on_unchanged:
+                    last_page = min(last_page, page)
+            elif self.stop_when and self.stop_when(page, jobs):
+                last_page = min(last_page, page)
+
+        for page in sorted(self.pages):
+            if page <= last_page:
+                settle(page, self.pages[page])
+        if results and sum(len(jobs) for jobs in results.values()) >= self.max_results:
+            last_page = min(last_page, max(results))
+
+        try:
+            while in_flight or next_page <= last_page:
+                if self.cancel_token is not None and self.cancel_token.cancelled:
+                    partial = [job for page in sorted(results) if page <= last_page
+                               for job in results[page]]
+                    raise CancelledError("Scrape was cancelled", partial=partial[:self.max_results])
+                # Keep the window full, never past the last page we know of
+                while next_page <= last_page and len(in_flight) < self.max_in_flight:
+                    if next_page not in results:
+                        future = executor.submit(self._fetch_and_parse, page_url, next_page)
+                        in_flight[future] = next_page
+                    next_page += 1
+                if not in_flight:
+                    break
+
+                waiting = list(in_flight)
+                if self.cancel_token is not None:
+                    # Wake up as soon as the scrape is stopped
+                    waiting.append(self.cancel_token.future)
+                done, _ = wait(waiting, return_when=FIRST_COMPLETED)
+                for future in done:
+                    if future not in in_flight:
+                        continue
+                    page = in_flight.pop(future)
+                    try:
+                        jobs = future.result()
+                    except CancelledError:
+                        continue
+                    except Exception as e:
+                        # A failed page says nothing about where the listing ends
+                        logger.warning(f"Error fetching page {page}, skipping it: {e}")
+                        failed.add(page)
+                        continue
+                    self.pages_fetched += 1
+                    if isinstance(jobs, UnchangedPage):
+                        self.pages_unchanged += 1
+                    settle(page, jobs)
+                    if self.on_page:
+                        self.on_page(page, jobs)
+
+                collected = sum(len(results.get(p, [])) for p in range(1, last_page + 1))
+                if collected >= self.max_results:
+                    last_page = min(last_page, max(results))
+
+                # Drop pages beyond the end of the listing instead of waiting on them
+                for future, page in list(in_flight.items()):
+                    if page > last_page:
+                        future.cancel()
+                        del in_flight[future]
+        finally:
+            for future in in_flight:
+                future.cancel()
+            if own_executor:
+                executor.shutdown(wait=False, cancel_futures=True)
+
+        self.failed_pages = sorted(page for page in failed if page <= last_page)
+        self.reached_end = all(page in results for page in range(1, last_page + 1))
+
+        jobs = []
+        gap = False
+        for page in range(1, last_page + 1):
+            if page not in results:
+                # Later pages are still returned, but no longer complete the page range
+                gap = True
+                continue
+            jobs.extend(results[page])
+            if not gap and len(jobs) <= self.max_results:
+                self.complete_pages = page
+        return jobs[:self.max_results]
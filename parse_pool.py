@@ -0,0 +1,87 @@
+"""
+Process pool for the CPU-bound stage of a scrape.
+
+Fetch threads spend most of their time waiting on the network, but parsing a
+listing page with BeautifulSoup and running JobFilter over its postings holds
+the GIL. ParsePool moves that work into worker processes: fetch threads hand
+over each page as zlib-compressed bytes and get back the extracted postings,
+tagged with the ones that passed the board's location filter and the JobFilter.
+A semaphore bounds how many pages may be queued for parsing, so when parsers
+fall behind the fetchers block instead of piling up HTML in memory.
+
+Workers get the JobFilter once, when they start. After set_filter() every page
+carries the pickled filter and its version, and a worker swaps its copy when the
+version differs, so a config change applies to the next page without restarting
+the pool.
+"""
+import os
+import pickle
+import threading
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+from job_boards import extract_listing, filter_listing
+
+# JobFilter of the current worker process, set by the pool initializer
+_job_filter = None
+_filter_version = 0
+
+
+class ParsedPage(list):
+    """Postings extracted from one listing page, plus the subset that matched"""
+
+    def __init__(self, jobs: List[Dict] = (), matched: List[Dict] = ()):
+        super().__init__(jobs)
+        self.matched = list(matched)
+
+
+def _init_worker(job_filter):
+    global _job_filter
+    _job_filter = job_filter
+
+
+def _parse_page(board: str, data: bytes, job_type: str, location: str, page: int,
+                filter_state: Optional[Tuple[int, bytes]] = None) -> ParsedPage:
+    """Extract and filter one page; runs in a worker process"""
+    global _job_filter, _filter_version
+    if filter_state is not None and filter_state[0] != _filter_version:
+        _filter_version, _job_filter = filter_state[0], pickle.loads(filter_state[1])
+    html = zlib.decompress(data).decode('utf-8')
+    jobs = extract_listing(board, html, job_type, location, page)
+    matched = filter_listing(board, jobs, location)
+    if _job_filter is not None:
+        matched = [job for job in matched if _job_filter.matches(job)]
+    return ParsedPage(jobs, matched)
+
+
+class ParsePool:
+    """Parse listing pages on a process pool with bounded pending work"""
+
+    def __init__(self, job_filter=None, max_workers: Optional[int] = None,
+                 max_pending: Optional[int] = None):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            initializer=_init_worker,
+            initargs=(job_filter,)
+        )
+        self._slots = threading.BoundedSemaphore(max_pending or 2 * self.max_workers)
+        # Sent with every page once the filter has changed since the workers started
+        self._filter_state = None
+
+    def set_filter(self, job_filter):
+        """Use a new JobFilter for the pages parsed from now on"""
+        version = self._filter_state[0] + 1 if self._filter_state else 1
+        self._filter_state = (version, pickle.dumps(job_filter))
+
+    def parse(self, board: str, html: str, job_type: str, location: str, page: int = 1) -> ParsedPage:
+        """Parse a listing page in a worker, blocking while the pool is saturated"""
+        data = zlib.compress(html.encode('utf-8'), 1)
+        with self._slots:
+            return self._executor.submit(_parse_page, board, data, job_type, location, page,
+                                         self._filter_state).result()
+
+    def close(self):
+        """Stop the worker processes"""
+        self._executor.shutdown(wait=True, cancel_futures=True)
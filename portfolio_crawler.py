@@ -0,0 +1,205 @@
+"""
+Parallel crawler for VC firm portfolio pages.
+
+Every firm in vc_firms.VC_FIRMS is fetched concurrently and its company cards are
+extracted with a compiled selector spec. The result is diffed against the stored
+VCPortfolioCompany rows and only the changes (new companies, removed companies,
+changed websites) are written, in bulk and in a single transaction.
+
+collect_jobs() then turns the portfolio into postings: CareersPageProber caches a
+careers page (or CAREERS_PAGE_NONE) on each company row, and CareerDiscovery finds
+every company's ATS board through its robots.txt and sitemaps, also checking the
+probed careers page where there is one, and reads the openings from its feed. enrich() looks the
+companies up on Crunchbase, in parallel on a DriverPool.
+"""
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+from loguru import logger
+
+from career_discovery import CAREERS_PAGE_NONE, CareerDiscovery, CareersPageProber
+from circuit_breaker import retry_budget
+from company_enrichment import enrich_companies
+from extractors import get_extractor
+from job_scraper import JobStorage, VCPortfolioCompany, fetch_page_sync, init_db
+from vc_firms import VC_FIRMS
+
+
+def portfolio_spec(firm: Dict) -> Dict:
+    """Build an extractor spec from a VC_FIRMS entry"""
+    return {
+        "card": firm["company_selector"],
+        "company": firm["name_selector"],
+        "website": firm["website_selector"],
+        "url_prefix": firm["portfolio_url"],
+        "required": ("company",)
+    }
+
+
+def _normalize(name: str) -> str:
+    return " ".join(name.lower().split())
+
+
+class PortfolioCrawler:
+    """Crawl all VC portfolios in parallel and sync them to vc_portfolio_companies"""
+
+    def __init__(self, fetch: Callable[[str], str] = fetch_page_sync,
+                 executor: Optional[ThreadPoolExecutor] = None,
+                 firms: Optional[List[Dict]] = None):
+        self.fetch = fetch
+        self.executor = executor
+        self.firms = firms or VC_FIRMS
+        self._specs = {firm["name"]: portfolio_spec(firm) for firm in self.firms}
+
+    def crawl_firm(self, firm: Dict) -> Optional[List[Dict]]:
+        """Fetch and extract one firm's portfolio, or None if the page could not be read"""
+        try:
+            html = self.fetch(firm["portfolio_url"])
+        except Exception as e:
+            logger.error(f"Error fetching portfolio for {firm['name']}: {e}")
+            return None
+        if not html:
+            return None
+        companies = get_extractor(f"vc:{firm['name']}", self._specs[firm["name"]])(html)
+        if not companies:
+            # An empty page usually means the markup changed, not that the portfolio is empty
+            logger.warning(f"No portfolio companies found for {firm['name']}")
+            return None
+        return companies
+
+    def crawl(self) -> Dict[str, Optional[List[Dict]]]:
+        """Crawl every firm concurrently"""
+        # A crawl is a run of its own for the retry budget
+        retry_budget.reset()
+        executor = self.executor or ThreadPoolExecutor(max_workers=len(self.firms))
+        try:
+            futures = {firm["name"]: executor.submit(self.crawl_firm, firm) for firm in self.firms}
+            return {name: future.result() for name, future in futures.items()}
+        finally:
+            if self.executor is None:
+                executor.shutdown(wait=False)
+
+    @staticmethod
+    def diff(companies: List[Dict], rows: List[VCPortfolioCompany]) -> Dict[str, List]:
+        """Compare a crawled portfolio with its stored rows"""
+        stored = {_normalize(row.name): row for row in rows if row.name}
+        crawled = {}
+        for company in companies:
+            crawled.setdefault(_normalize(company["company"]), company)
+
+        new = [company for key, company in crawled.items() if key not in stored]
+        removed = [row for key, row in stored.items() if key not in crawled]
+        changed = [
+            (row, crawled[key]["website"]) for key, row in stored.items()
+            if key in crawled and crawled[key].get("website")
+            and crawled[key]["website"] != row.website
+        ]
+        return {"new": new, "removed": removed, "changed": changed}
+
+    def sync(self, db_session, results: Dict[str, Optional[List[Dict]]]) -> Dict[str, int]:
+        """Write the differences between crawled and stored portfolios"""
+        firms = [name for name, companies in results.items() if companies is not None]
+        rows_by_firm = {name: [] for name in firms}
+        for row in db_session.query(VCPortfolioCompany).filter(VCPortfolioCompany.vc_firm.in_(firms)):
+            rows_by_firm[row.vc_firm].append(row)
+
+        now = datetime.utcnow()
+        inserts, updates, removed_ids = [], [], []
+        for name in firms:
+            changes = self.diff(results[name], rows_by_firm[name])
+            inserts.extend(
+                {"name": company["company"], "website": company.get("website"),
+                 "vc_firm": name, "last_scraped": now}
+                for company in changes["new"]
+            )
+            # A new website invalidates the cached careers page
+            updates.extend(
+                {"id": row.id, "website": website, "careers_page": None,
+                 "careers_page_checked": None, "last_scraped": now}
+                for row, website in changes["changed"]
+            )
+            removed_ids.extend(row.id for row in changes["removed"])
+
+        if inserts:
+            db_session.bulk_insert_mappings(VCPortfolioCompany, inserts)
+        if updates:
+            db_session.bulk_update_mappings(VCPortfolioCompany, updates)
+        if removed_ids:
+            db_session.query(VCPortfolioCompany).filter(
+                VCPortfolioCompany.id.in_(removed_ids)
+            ).delete(synchronize_session=False)
+        db_session.commit()
+
+        summary = {"firms": len(firms), "new": len(inserts),
+                   "changed": len(updates), "removed": len(removed_ids)}
+        logger.info(f"Portfolio sync: {summary}")
+        return summary
+
+    def refresh(self, db_session) -> Dict[str, int]:
+        """Crawl all firms and sync the results"""
+        return self.sync(db_session, self.crawl())
+
+    def collect_jobs(self, db_session, discovery: Optional[CareerDiscovery] = None,
+                     prober: Optional[CareersPageProber] = None) -> List[Dict]:
+        """Collect the openings of every portfolio company with a website"""
+        discovery = discovery or CareerDiscovery()
+        prober = prober or CareersPageProber()
+        companies = db_session.query(VCPortfolioCompany).filter(VCPortfolioCompany.website.isnot(None)).all()
+        prober.probe_companies(db_session, companies)
+
+        executor = self.executor or ThreadPoolExecutor(max_workers=8)
+        try:
+            # Companies without a probed careers page are still discovered through their sitemaps
+            futures = [
+                (company, executor.submit(
+                    discovery.fetch_jobs, company.website, company.name,
+                    company.careers_page if company.careers_page != CAREERS_PAGE_NONE else None
+                ))
+                for company in companies
+            ]
+            jobs = []
+            for company, future in futures:
+                try:
+                    company_jobs = future.result()
+                except Exception as e:
+                    logger.error(f"Error collecting jobs for {company.name}: {e}")
+                    continue
+                for job in company_jobs:
+                    job["vc_firm"] = company.vc_firm
+                jobs.extend(company_jobs)
+        finally:
+            if self.executor is None:
+                executor.shutdown(wait=False)
+        logger.info(f"Collected {len(jobs)} jobs from {len(companies)} portfolio companies")
+        return jobs
+
+    def enrich(self, session_factory, db_session, drivers: int = 2) -> Dict[str, Optional[Dict]]:
+        """Look up every portfolio company on Crunchbase, `drivers` at a time"""
+        names = [name for (name,) in db_session.query(VCPortfolioCompany.name)]
+        return enrich_companies(session_factory, names, drivers)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Refresh VC portfolio companies")
+    parser.add_argument("--database-url", default="sqlite:///jobs.db")
+    parser.add_argument("--jobs", action="store_true",
+                        help="Also collect the companies' openings into data/jobs.json")
+    parser.add_argument("--enrich", action="store_true",
+                        help="Also look the companies up on Crunchbase")
+    parser.add_argument("--drivers", type=int, default=2,
+                        help="Browsers used in parallel by --enrich")
+    args = parser.parse_args()
+
+    Session = init_db(args.database_url)
+    crawler = PortfolioCrawler()
+    with Session() as session:
+        crawler.refresh(session)
+        if args.jobs:
+            storage = JobStorage()
+            saved = storage.save_jobs(crawler.collect_jobs(session))
+            storage.refresh_snapshot()
+            logger.info(f"Saved {saved} new portfolio jobs")
+        if args.enrich:
+            crawler.enrich(Session, session, args.drivers)
@@ -0,0 +1,191 @@
+"""
+Aggregate tables behind the dashboard charts.
+
+JobStorage updates these tables as each new posting is stored, next to its
+running stats, and writes them to data/rollups.json with every save. Every table
+is kept per source so the dashboard's source filter only has to add up a handful
+of small dictionaries:
+
+    jobs, salary_sum, salary_count    totals for the overview metrics
+    companies, locations, families    postings per company, location and title family
+    salary_bins                       postings per salary bin of `SALARY_BIN` dollars
+    daily                             postings per day
+    company_daily, family_daily       postings per day for each company / title family
+
+Charts read these tables instead of the raw postings, so rendering a chart costs
+the same whether the store holds a hundred postings or millions.
+"""
+import json
+import os
+import re
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+from loguru import logger
+
+SALARY_BIN = 10000
+
+_SENIORITY = re.compile(
+    r'\b(?:senior|sr|junior|jr|lead|principal|staff|head|chief|associate|intern|'
+    r'entry[- ]level|mid[- ]level|i{1,3}|iv|v|\d+)\b\.?'
+)
+_BRACKETS = re.compile(r'\(.*?\)|\[.*?\]')
+_PUNCTUATION = re.compile(r'[^a-z0-9+#/& ]+')
+_WHITESPACE = re.compile(r'\s+')
+_NUMBER = re.compile(r'(\d+(?:\.\d+)?)\s*(k)?', re.IGNORECASE)
+
+
+def title_family(title: str) -> str:
+    """Job title without seniority, levels and qualifiers, e.g. 'Sr. Data Engineer II' -> 'data engineer'"""
+    title = _BRACKETS.sub(' ', (title or '').lower())
+    title = title.split(' - ')[0].split(',')[0]
+    title = _SENIORITY.sub(' ', title)
+    title = _PUNCTUATION.sub(' ', title)
+    return _WHITESPACE.sub(' ', title).strip() or 'unknown'
+
+
+def parse_salary(salary: Any) -> Optional[float]:
+    """Annual salary as a number; the lower end of a range, None if there is none"""
+    if isinstance(salary, bool) or salary is None:
+        return None
+    if isinstance(salary, (int, float)):
+        return float(salary) if salary > 0 else None
+    match = _NUMBER.search(str(salary).replace(',', ''))
+    if not match:
+        return None
+    value = float(match.group(1)) * (1000 if match.group(2) else 1)
+    return value if value > 0 else None
+
+
+def posting_day(job: Dict[str, Any]) -> Optional[str]:
+    """ISO date a posting was published, or scraped if that is unknown"""
+    for field in ('date_posted', 'date_scraped'):
+        value = job.get(field)
+        if not value:
+            continue
+        try:
+            return datetime.fromisoformat(str(value).replace('Z', '+00:00')).date().isoformat()
+        except ValueError:
+            continue
+    return None
+
+
+def _empty_source() -> Dict[str, Any]:
+    return {
+        'jobs': 0,
+        'salary_sum': 0.0,
+        'salary_count': 0,
+        'companies': {},
+        'locations': {},
+        'families': {},
+        'salary_bins': {},
+        'daily': {},
+        'company_daily': {},
+        'family_daily': {}
+    }
+
+
+def _increment(table: Dict[str, int], key: str, n: int = 1):
+    table[key] = table.get(key, 0) + n
+
+
+class Rollups:
+    """Per-source aggregate tables, updated one posting at a time"""
+
+    def __init__(self, storage_dir: str = 'data'):
+        self.storage_dir = Path(storage_dir)
+        self.rollups_file = self.storage_dir / 'rollups.json'
+        self._load_data()
+
+    def _load_data(self):
+        """Load existing rollups from storage"""
+        try:
+            if self.rollups_file.exists():
+                with open(self.rollups_file, 'r') as f:
+                    self.tables = json.load(f)
+            else:
+                self.tables = {'total_jobs': 0, 'sources': {}}
+        except Exception as e:
+            logger.error(f"Error loading rollups: {e}")
+            self.tables = {'total_jobs': 0, 'sources': {}}
+
+    @property
+    def exists(self) -> bool:
+        return self.rollups_file.exists()
+
+    @property
+    def total_jobs(self) -> int:
+        return self.tables['total_jobs']
+
+    def add(self, job: Dict[str, Any]):
+        """Count a newly stored posting"""
+        table = self.tables['sources'].setdefault(job.get('source') or 'unknown', _empty_source())
+        self.tables['total_jobs'] += 1
+        table['jobs'] += 1
+
+        company = job.get('company') or 'unknown'
+        family = title_family(job.get('title'))
+        _increment(table['companies'], company)
+        _increment(table['locations'], job.get('location') or 'unknown')
+        _increment(table['families'], family)
+
+        salary = parse_salary(job.get('salary'))
+        if salary is not None:
+            table['salary_sum'] += salary
+            table['salary_count'] += 1
+            _increment(table['salary_bins'], str(int(salary // SALARY_BIN * SALARY_BIN)))
+
+        day = posting_day(job)
+        if day is not None:
+            _increment(table['daily'], day)
+            _increment(table['company_daily'].setdefault(company, {}), day)
+            _increment(table['family_daily'].setdefault(family, {}), day)
+
+    def reset(self):
+        """Empty every table"""
+        self.tables = {'total_jobs': 0, 'sources': {}}
+
+    def rebuild(self, jobs: Iterable[Dict[str, Any]]):
+        """Recompute every table from the stored postings"""
+        self.reset()
+        for job in jobs:
+            self.add(job)
+        logger.info(f"Rebuilt rollups from {self.total_jobs} jobs")
+
+    def save(self):
+        """Save the tables, replacing the file atomically so readers never see a partial write"""
+        try:
+            self.storage_dir.mkdir(exist_ok=True)
+            temp_file = self.rollups_file.with_suffix('.tmp')
+            with open(temp_file, 'w') as f:
+                json.dump(self.tables, f)
+            os.replace(temp_file, self.rollups_file)
+        except Exception as e:
+            logger.error(f"Error saving rollups: {e}")
+
+    def sources(self) -> List[str]:
+        return sorted(self.tables['sources'])
+
+    def combine(self, sources: Iterable[str], tables: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+        """Tables of the given sources added together; only the named tables if `tables` is set"""
+        combined = _empty_source()
+        names = set(tables) if tables is not None else set(combined)
+        for source in sources:
+            table = self.tables['sources'].get(source)
+            if table is None:
+                continue
+            for name, value in table.items():
+                if name not in names:
+                    continue
+                if name in ('company_daily', 'family_daily'):
+                    for key, days in value.items():
+                        merged = combined[name].setdefault(key, {})
+                        for day, n in days.items():
+                            _increment(merged, day, n)
+                elif isinstance(value, dict):
+                    for key, n in value.items():
+                        _increment(combined[name], key, n)
+                else:
+                    combined[name] += value
+        return combined
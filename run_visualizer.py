@@ -1,8 +1,4 @@
 import streamlit as st
-import plotly.express as px
-import pandas as pd
-from datetime import datetime
-import time
 from job_visualizer import JobVisualizer
 from scraper_manager import ScraperManager
 
@@ -36,68 +32,29 @@ def main():
 def show_dashboard():
     st.title("Job Market Analysis Dashboard")
     
-    # Get data from visualizer
-    df = pd.DataFrame(st.session_state.visualizer.jobs)
+    visualizer = st.session_state.visualizer
+    all_sources = visualizer.sources()
+    overall = visualizer.aggregates(all_sources)
     
     # Overview metrics
     col1, col2, col3 = st.columns(3)
     with col1:
-        st.metric("Total Jobs", len(df))
+        st.metric("Total Jobs", overall['total_jobs'])
     with col2:
-        st.metric("Unique Companies", df['company'].nunique())
+        st.metric("Unique Companies", overall['unique_companies'])
     with col3:
-        st.metric("Average Salary", f"${df['salary'].mean():,.0f}")
+        st.metric("Average Salary", f"${overall['average_salary']:,.0f}")
     
     # Filters
     st.sidebar.header("Filters")
     sources = st.sidebar.multiselect(
         "Select Sources",
-        options=df['source'].unique(),
-        default=df['source'].unique()
+        options=all_sources,
+        default=all_sources
     )
     
-    # Filter data
-    df_filtered = df[df['source'].isin(sources)]
-    
-    # Job distribution by source
-    st.subheader("Job Distribution by Source")
-    fig = px.pie(
-        df_filtered,
-        names='source',
-        title='Job Distribution by Source'
-    )
-    st.plotly_chart(fig)
-    
-    # Salary distribution
-    st.subheader("Salary Distribution")
-    fig = px.histogram(
-        df_filtered,
-        x='salary',
-        nbins=30,
-        title='Salary Distribution'
-    )
-    st.plotly_chart(fig)
-    
-    # Top companies
-    st.subheader("Top Companies by Job Postings")
-    top_companies = df_filtered['company'].value_counts().head(10)
-    fig = px.bar(
-        x=top_companies.index,
-        y=top_companies.values,
-        title='Top 10 Companies by Job Postings'
-    )
-    st.plotly_chart(fig)
-    
-    # Job posting trends
-    st.subheader("Job Posting Trends")
-    df_filtered['date_posted'] = pd.to_datetime(df_filtered['date_posted'])
-    daily_postings = df_filtered.groupby('date_posted').size()
-    fig = px.line(
-        x=daily_postings.index,
-        y=daily_postings.values,
-        title='Daily Job Postings'
-    )
-    st.plotly_chart(fig)
+    # Charts for the selected sources
+    visualizer.show_charts(visualizer.aggregates(sources))
 
 def show_scraper_manager():
     st.title("Job Scraper Manager")
@@ -119,12 +76,16 @@ def show_scraper_manager():
     
     # Status display
     st.header("Status")
+    st.session_state.manager.refresh_status()
     status = st.session_state.manager.get_status()
     if status == 'Running':
         st.info("🟢 Scraping is currently running")
     else:
         st.info("🔴 Scraping is stopped")
     
+    # Circuit breakers per source host
+    st.session_state.manager.show_source_health()
+    
     # Progress information
     if st.session_state.manager.scraper:
         progress = st.session_state.manager.scraper.get_progress()
@@ -261,8 +222,7 @@ def show_reports():
     
     # Report preview
     st.header("Report Preview")
-    df = pd.DataFrame(st.session_state.visualizer.jobs)
-    st.dataframe(df)
+    st.dataframe(st.session_state.visualizer.frame)
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
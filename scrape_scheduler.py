@@ -0,0 +1,184 @@
+"""
+Periodic scraping with per-source adaptive intervals.
+
+Each enabled job board has its own interval, starting at the configured
+`scrape_interval_minutes`. After every run the interval of a source shrinks when
+the run found new postings there and grows when it found none, within
+[min_factor, max_factor] times the configured interval, so busy boards are polled
+more often than quiet ones. A run that fails or never starts (`run` returns None)
+says nothing about a source's yield, so it is retried at the unchanged interval.
+The next run time gets random jitter so sources do not stay in lockstep.
+
+A tick every `tick_seconds` starts one run for all sources that are due. Runs
+execute on their own thread and a tick never starts one while the previous run
+(or any other run reported by `is_busy`) is still active; such ticks are counted
+as skipped. Tick overhead and skipped ticks are kept in the scheduler's metrics
+and logged.
+"""
+import json
+import random
+import threading
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+import schedule
+from loguru import logger
+
+from cancellation import CancellationToken
+from circuit_breaker import retry_budget
+from task_planner import enabled_sources
+from telemetry import Telemetry
+
+
+class ScrapeScheduler:
+    """Fire scrape runs for due sources at adaptive, jittered intervals"""
+
+    def __init__(self, run: Callable[[List[str]], Optional[Dict[str, int]]], config: Dict[str, Any],
+                 is_busy: Optional[Callable[[], bool]] = None,
+                 cancel_token: Optional[CancellationToken] = None,
+                 storage_dir: str = 'data', tick_seconds: float = 30, jitter: float = 0.1,
+                 min_factor: float = 0.25, max_factor: float = 4.0):
+        self.run = run
+        self.config = config
+        self.is_busy = is_busy
+        self.cancel_token = cancel_token or CancellationToken()
+        self.storage_dir = Path(storage_dir)
+        self.storage_dir.mkdir(exist_ok=True)
+        self.state_file = self.storage_dir / 'schedule_state.json'
+        self.tick_seconds = tick_seconds
+        self.jitter = jitter
+        self.min_factor = min_factor
+        self.max_factor = max_factor
+        self.metrics = Telemetry()
+        self._run_thread = None
+        self._lock = threading.Lock()
+        self._load_data()
+
+    def _load_data(self):
+        """Load per-source schedule state from storage"""
+        try:
+            if self.state_file.exists():
+                with open(self.state_file, 'r') as f:
+                    self.state = json.load(f)
+            else:
+                self.state = {}
+        except Exception as e:
+            logger.error(f"Error loading schedule state: {e}")
+            self.state = {}
+
+    def save(self):
+        """Save per-source schedule state to storage"""
+        with self._lock:
+            try:
+                with open(self.state_file, 'w') as f:
+                    json.dump(self.state, f, indent=2)
+            except Exception as e:
+                logger.error(f"Error saving schedule state: {e}")
+
+    @property
+    def base_interval(self) -> timedelta:
+        return timedelta(minutes=self.config.get('scrape_interval_minutes', 60))
+
+    def interval(self, source: str) -> timedelta:
+        """Current interval of a source"""
+        return self.base_interval * self.state.get(source, {}).get('factor', 1.0)
+
+    def due_sources(self, now: datetime) -> List[str]:
+        """Enabled sources whose next run time has passed"""
+        due = []
+        for source in enabled_sources(self.config):
+            next_run = self.state.get(source, {}).get('next_run')
+            if not next_run or datetime.fromisoformat(next_run) <= now:
+                due.append(source)
+        return due
+
+    def is_running(self) -> bool:
+        own_run = self._run_thread is not None and self._run_thread.is_alive()
+        return own_run or bool(self.is_busy and self.is_busy())
+
+    def tick(self):
+        """Start a run for the due sources unless a run is still active"""
+        started = time.perf_counter()
+        self.metrics.count('ticks')
+        try:
+            if self.is_running():
+                self.metrics.count('skipped_ticks')
+                logger.info(f"Skipping scheduled tick: previous run still active "
+                            f"({self.metrics.value('skipped_ticks')} skipped so far)")
+                return
+            due = self.due_sources(datetime.now())
+            if due:
+                self._run_thread = threading.Thread(target=self._run, args=(due,), daemon=True)
+                self._run_thread.start()
+        finally:
+            overhead_ms = (time.perf_counter() - started) * 1000
+            self.metrics.gauge('tick_overhead_ms').set(overhead_ms)
+            logger.debug(f"Scheduler tick took {overhead_ms:.2f}ms")
+
+    def _run(self, sources: List[str]):
+        logger.info(f"Scheduled run for {', '.join(sources)}")
+        self.metrics.count('runs')
+        # Each scheduled run gets a fresh retry budget, whatever `run` does
+        retry_budget.reset()
+        try:
+            new_jobs = self.run(sources)
+        except Exception as e:
+            logger.error(f"Error in scheduled run: {e}")
+            new_jobs = None
+        self._reschedule(sources, new_jobs)
+        self.save()
+
+    def _reschedule(self, sources: List[str], new_jobs: Optional[Dict[str, int]]):
+        """Adapt each source's interval to its yield and pick its next run time
+
+        With `new_jobs` None the run failed or did not happen, and the intervals stay as they were.
+        """
+        now = datetime.now()
+        with self._lock:
+            for source in sources:
+                entry = self.state.setdefault(source, {'factor': 1.0})
+                if new_jobs is None:
+                    interval = self.base_interval * entry['factor']
+                    interval *= 1 + random.uniform(-self.jitter, self.jitter)
+                    entry['next_run'] = (now + interval).isoformat()
+                    logger.info(f"{source}: run failed or skipped, retrying in {interval.total_seconds() / 60:.0f} minutes")
+                    continue
+                found = new_jobs.get(source, 0)
+                if found:
+                    entry['factor'] = max(self.min_factor, entry['factor'] * 0.75)
+                else:
+                    entry['factor'] = min(self.max_factor, entry['factor'] * 1.5)
+                entry['last_new'] = found
+                entry['last_run'] = now.isoformat()
+                interval = self.base_interval * entry['factor']
+                interval *= 1 + random.uniform(-self.jitter, self.jitter)
+                entry['next_run'] = (now + interval).isoformat()
+                logger.info(f"{source}: {found} new jobs, next run in {interval.total_seconds() / 60:.0f} minutes")
+
+    def stats(self) -> Dict[str, Any]:
+        """Scheduler metrics and per-source schedule for display"""
+        return {
+            'ticks': self.metrics.value('ticks'),
+            'skipped_ticks': self.metrics.value('skipped_ticks'),
+            'runs': self.metrics.value('runs'),
+            'tick_overhead_ms': round(self.metrics.gauge('tick_overhead_ms').value, 3),
+            'sources': {
+                source: dict(entry, interval_minutes=round(self.interval(source).total_seconds() / 60, 1))
+                for source, entry in self.state.items()
+            }
+        }
+
+    def run_forever(self):
+        """Tick until the cancel token is cancelled"""
+        scheduler = schedule.Scheduler()
+        scheduler.every(self.tick_seconds).seconds.do(self.tick)
+        logger.info(f"Scheduled scraping every {self.base_interval.total_seconds() / 60:.0f} minutes (adaptive per source)")
+        self.tick()
+        while not self.cancel_token.cancelled:
+            scheduler.run_pending()
+            self.cancel_token.wait(min(1.0, max(0.0, scheduler.idle_seconds or 1.0)))
+        if self._run_thread is not None:
+            self._run_thread.join(timeout=5)
+        self.save()
@@ -0,0 +1,351 @@
+"""
+Standalone scraper daemon.
+
+One daemon per host owns the JobScraper, its pools and the JobStorage, so
+scraping CPU work never runs inside the Streamlit server and several UI sessions
+cannot start scrapers of their own. The scraper lives as long as the daemon; a
+config change is applied to it in place, so storage, indexes and pools stay warm. The daemon listens on a local socket
+(multiprocessing.connection, authenticated with a shared key) for commands from
+ScraperManager:
+
+    start / stop              start or stop a scrape run
+    status                    run state, progress, statistics and source health
+    config                    read the config, or replace it with `config`
+    shutdown                  stop scraping and exit
+
+Only one daemon can bind the address, which is what enforces a single scraper per
+host. Run it with `python scraper_daemon.py`; ScraperManager also starts it on
+demand. With `--schedule` the daemon also scrapes on its own at adaptive
+per-source intervals (see scrape_scheduler.py); scheduled runs never overlap runs
+started from the UI.
+"""
+import argparse
+import json
+import os
+import secrets
+import subprocess
+import sys
+import threading
+import time
+from datetime import datetime
+from multiprocessing.connection import Client, Listener
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from loguru import logger
+
+DEFAULT_ADDRESS = ('127.0.0.1', int(os.getenv('SCRAPER_DAEMON_PORT', '8765')))
+KEY_FILE = Path('data') / 'daemon.key'
+LOG_FILE = Path('data') / 'daemon.log'
+
+# Progress reported while no run has been started
+IDLE_PROGRESS = {
+    'start_time': None,
+    'elapsed_time': 0,
+    'estimated_time_remaining': 0,
+    'jobs_found': 0,
+    'jobs_saved': 0,
+    'errors': 0,
+    'jobs_per_minute': 0,
+    'current_page': 0,
+    'total_pages': 0
+}
+
+
+def load_authkey() -> bytes:
+    """Shared secret for the daemon socket, from the environment or a local key file"""
+    key = os.getenv('SCRAPER_DAEMON_AUTHKEY')
+    if key:
+        return key.encode('utf-8')
+    if not KEY_FILE.exists():
+        KEY_FILE.parent.mkdir(exist_ok=True)
+        # Written under a temporary name, readable by the current user only, then linked
+        # into place, so a concurrent reader never sees an empty key
+        temp_file = KEY_FILE.with_name(f".{KEY_FILE.name}.{secrets.token_hex(4)}")
+        fd = os.open(temp_file, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+        with os.fdopen(fd, 'w') as f:
+            f.write(secrets.token_hex(32))
+        try:
+            os.link(temp_file, KEY_FILE)
+        except FileExistsError:
+            # The UI and the daemon raced to create it; use the key that won
+            pass
+        finally:
+            temp_file.unlink()
+    return KEY_FILE.read_text().strip().encode('utf-8')
+
+
+def source_health() -> List[Dict[str, Any]]:
+    """Circuit breaker state and request latency of every source host"""
+    from circuit_breaker import breakers
+    from telemetry import telemetry
+
+    latencies = {row['source']: row for row in telemetry.latency_snapshot()}
+    states = []
+    for state in breakers.snapshot():
+        latency = latencies.get(state['source'], {})
+        states.append(dict(state, p50_seconds=latency.get('p50'), p95_seconds=latency.get('p95'),
+                           p99_seconds=latency.get('p99')))
+    return states
+
+
+class ScraperDaemon:
+    """Own the scraper and serve commands from UI processes"""
+
+    def __init__(self, config_file: str = 'config.json', address: Tuple[str, int] = DEFAULT_ADDRESS,
+                 authkey: Optional[bytes] = None):
+        self.config_file = Path(config_file)
+        self.address = address
+        self.authkey = authkey or load_authkey()
+        # Loaded once the daemon owns the address, see serve_forever()
+        self.storage = None
+        self.scraper = None
+        self.scraping_thread = None
+        self.last_result = None
+        self.last_yield = None
+        self.scheduler = None
+        self._lock = threading.Lock()
+        self._shutdown = threading.Event()
+        self.load_config()
+
+    def load_config(self):
+        with open(self.config_file, 'r') as f:
+            self.config = json.load(f)
+
+    def save_config(self):
+        with open(self.config_file, 'w') as f:
+            json.dump(self.config, f, indent=2)
+
+    def is_running(self) -> bool:
+        return self.scraping_thread is not None and self.scraping_thread.is_alive()
+
+    def start(self, sources: Optional[List[str]] = None) -> bool:
+        """Start a scrape run, of the given sources or all of them, unless one is running"""
+        from job_scraper import JobScraper
+
+        with self._lock:
+            if self.is_running():
+                return False
+            if self.scraper is None:
+                self.scraper = JobScraper(self.config, storage=self.storage)
+            self.scraping_thread = threading.Thread(target=self._run_scraping, args=(sources,), daemon=True)
+            self.scraping_thread.start()
+            return True
+
+    def _run_scraping(self, sources: Optional[List[str]] = None):
+        self.last_yield = None
+        try:
+            self.last_yield = self.scraper.scrape(sources)
+            if self.last_yield is not None:
+                self.last_result = {'type': 'success', 'message': 'Scraping completed successfully'}
+            elif self.scraper.cancel_token.cancelled:
+                self.last_result = {'type': 'info', 'message': 'Scraping stopped'}
+            else:
+                self.last_result = {'type': 'error', 'message': 'Scraping failed; see the daemon log'}
+        except Exception as e:
+            self.last_result = {'type': 'error', 'message': str(e)}
+        self.last_result['at'] = datetime.now().isoformat()
+
+    def _scheduled_run(self, sources: List[str]) -> Optional[Dict[str, int]]:
+        """Run a scheduled scrape to completion; None if another run was active"""
+        if not self.start(sources):
+            return None
+        self.scraping_thread.join()
+        return self.last_yield
+
+    def run_schedule(self):
+        """Scrape on the adaptive schedule in the background until shut down"""
+        from scrape_scheduler import ScrapeScheduler
+        from cancellation import CancellationToken
+
+        token = CancellationToken()
+        self.scheduler = ScrapeScheduler(self._scheduled_run, self.config, is_busy=self.is_running,
+                                         cancel_token=token, storage_dir=str(self.storage.storage_dir))
+        threading.Thread(target=self.scheduler.run_forever, daemon=True).start()
+        # Stop ticking as soon as the daemon shuts down
+        threading.Thread(target=lambda: (self._shutdown.wait(), token.cancel()), daemon=True).start()
+
+    def stop(self) -> bool:
+        """Stop the running scrape"""
+        with self._lock:
+            if not self.is_running():
+                return False
+            self.scraper.stop()
+            self.scraping_thread.join(timeout=5)
+            return True
+
+    def status(self) -> Dict[str, Any]:
+        scraper = self.scraper
+        return {
+            'status': 'Running' if self.is_running() else 'Stopped',
+            'progress': scraper.get_progress() if scraper is not None else dict(IDLE_PROGRESS),
+            'stats': self.storage.get_stats(),
+            'source_health': source_health(),
+            'last_result': self.last_result,
+            'schedule': self.scheduler.stats() if self.scheduler is not None else None
+        }
+
+    def handle(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """Run one command and build its reply"""
+        command = request.get('command')
+        if command == 'start':
+            return {'ok': True, 'started': self.start()}
+        if command == 'stop':
+            return {'ok': True, 'stopped': self.stop()}
+        if command == 'status':
+            return dict(self.status(), ok=True)
+        if command == 'config':
+            if request.get('config') is not None:
+                from task_planner import check_source_limits
+                # Reject a config the scraper could not run before it is saved
+                check_source_limits(request['config'].get('source_concurrency', {}))
+                self.config = request['config']
+                self.save_config()
+                if self.scraper is not None:
+                    self.scraper.update_config(self.config)
+                if self.scheduler is not None:
+                    self.scheduler.config = self.config
+            return {'ok': True, 'config': self.config}
+        if command == 'shutdown':
+            self.stop()
+            self._shutdown.set()
+            return {'ok': True}
+        return {'ok': False, 'error': f"Unknown command: {command}"}
+
+    def _serve_connection(self, conn):
+        try:
+            while not self._shutdown.is_set():
+                try:
+                    request = conn.recv()
+                except EOFError:
+                    return
+                try:
+                    reply = self.handle(request)
+                except Exception as e:
+                    logger.error(f"Error handling {request.get('command')}: {e}")
+                    reply = {'ok': False, 'error': str(e)}
+                conn.send(reply)
+        finally:
+            conn.close()
+
+    def serve_forever(self, schedule: bool = False):
+        """Accept UI connections until shut down, optionally scraping on the schedule"""
+        # Imported here so UI processes can use DaemonClient without loading the scraper
+        from job_scraper import JobStorage
+
+        # Binding fails if another daemon already owns the address; only then is
+        # the store loaded, so a second daemon exits without reading it
+        listener = Listener(self.address, authkey=self.authkey)
+        try:
+            self.storage = JobStorage()
+        except BaseException:
+            listener.close()
+            raise
+        logger.info(f"Scraper daemon listening on {self.address[0]}:{self.address[1]}")
+        if schedule:
+            self.run_schedule()
+
+        def accept():
+            while not self._shutdown.is_set():
+                try:
+                    conn = listener.accept()
+                except Exception as e:
+                    if not self._shutdown.is_set():
+                        logger.warning(f"Rejected connection: {e}")
+                    continue
+                threading.Thread(target=self._serve_connection, args=(conn,), daemon=True).start()
+
+        threading.Thread(target=accept, daemon=True).start()
+        try:
+            self._shutdown.wait()
+        except KeyboardInterrupt:
+            self.stop()
+        finally:
+            listener.close()
+            if self.scraper is not None:
+                self.scraper.close()
+            logger.info("Scraper daemon stopped")
+
+
+class DaemonClient:
+    """Send commands to the scraper daemon"""
+
+    def __init__(self, address: Tuple[str, int] = DEFAULT_ADDRESS, authkey: Optional[bytes] = None,
+                 timeout: float = 10):
+        self.address = address
+        self.authkey = authkey or load_authkey()
+        self.timeout = timeout
+
+    def request(self, command: str, **params) -> Optional[Dict[str, Any]]:
+        """Send a command and return the reply, or None if the daemon is not running"""
+        try:
+            with Client(self.address, authkey=self.authkey) as conn:
+                conn.send(dict(params, command=command))
+                if not conn.poll(self.timeout):
+                    logger.warning(f"Scraper daemon did not answer {command}")
+                    return None
+                return conn.recv()
+        except (ConnectionRefusedError, EOFError, OSError):
+            return None
+
+    def is_running(self) -> bool:
+        return self.request('status') is not None
+
+    def ensure_running(self, config_file: str = 'config.json', wait_seconds: float = 10) -> bool:
+        """Start the daemon in the background unless it is already running"""
+        if self.is_running():
+            return True
+        LOG_FILE.parent.mkdir(exist_ok=True)
+        with open(LOG_FILE, 'a') as log:
+            subprocess.Popen(
+                [sys.executable, str(Path(__file__).resolve()), '--config', config_file,
+                 '--host', self.address[0], '--port', str(self.address[1])],
+                stdout=log, stderr=subprocess.STDOUT, start_new_session=True
+            )
+        deadline = time.monotonic() + wait_seconds
+        while time.monotonic() < deadline:
+            if self.is_running():
+                return True
+            time.sleep(0.2)
+        logger.error(f"Scraper daemon did not start; see {LOG_FILE}")
+        return False
+
+
+class RemoteScraper:
+    """Read-only view of the daemon's scraper for the UI
+
+    refresh() fetches the daemon status once; the getters read from that reply,
+    so a page render costs a single request.
+    """
+
+    def __init__(self, client: DaemonClient):
+        self.client = client
+        self.status: Dict[str, Any] = {}
+
+    def refresh(self) -> Dict[str, Any]:
+        """Fetch the daemon status, or an empty dict if the daemon is not running"""
+        self.status = self.client.request('status') or {}
+        return self.status
+
+    def get_progress(self) -> Dict[str, Any]:
+        return self.status.get('progress') or dict(IDLE_PROGRESS)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return self.status.get('stats') or {}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the scraper daemon")
+    parser.add_argument("--config", default="config.json")
+    parser.add_argument("--host", default=DEFAULT_ADDRESS[0])
+    parser.add_argument("--port", type=int, default=DEFAULT_ADDRESS[1])
+    parser.add_argument("--schedule", action="store_true",
+                        help="also scrape on the configured interval, adapted per source")
+    args = parser.parse_args()
+
+    try:
+        daemon = ScraperDaemon(args.config, address=(args.host, args.port))
+        daemon.serve_forever(schedule=args.schedule)
+    except OSError as e:
+        logger.error(f"Could not start scraper daemon (is one already running?): {e}")
+        sys.exit(1)
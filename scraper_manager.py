@@ -1,10 +1,7 @@
 import streamlit as st
 import json
 from pathlib import Path
-from datetime import datetime
-import time
-from job_scraper import JobScraper, JobFilter
-import threading
+from scraper_daemon import DaemonClient, RemoteScraper
 import queue
 import plotly.express as px
 from fuzzywuzzy import fuzz
@@ -37,9 +34,11 @@ class ScraperManager:
     def __init__(self):
         self.config_file = Path('config.json')
         self.load_config()
-        self.scraper = None
-        self.scraping_thread = None
+        # Scraping runs in the scraper daemon; this process only talks to it
+        self.client = DaemonClient()
+        self.scraper = RemoteScraper(self.client)
         self.scraping_queue = queue.Queue()
+        self._last_result_at = None
         self.fuzzy_matcher = FuzzyMatcher()
         
         # Define all available options
@@ -142,8 +141,15 @@ class ScraperManager:
                 'use_dice': True,
                 'use_glassdoor': True,
                 'use_monster': True,
+                'use_builtin': True,
+                'use_welcometothejungle': True,
+                'use_techstars': False,
                 'scrape_interval_minutes': 60,
                 'max_jobs_per_search': 100,
+                'task_workers': 8,
+                'source_concurrency': {},
+                # Look up the companies of new postings on Crunchbase after each run
+                'enrich_companies': False,
                 'date_posted': 'Any time',
                 'sort_by': 'relevance',
                 # VC-specific config
@@ -163,38 +169,48 @@ class ScraperManager:
         """Save current configuration"""
         with open(self.config_file, 'w') as f:
             json.dump(self.config, f, indent=2)
+        # A running daemon keeps its own copy
+        self.client.request('config', config=self.config)
             
     def start_scraping(self):
-        """Start the scraping process in a separate thread"""
-        if self.scraping_thread is None or not self.scraping_thread.is_alive():
-            self.scraper = JobScraper(self.config)
-            self.scraping_thread = threading.Thread(target=self._run_scraping)
-            self.scraping_thread.daemon = True
-            self.scraping_thread.start()
-            return True
-        return False
+        """Ask the scraper daemon to start scraping, starting the daemon if needed"""
+        if not self.client.ensure_running(str(self.config_file)):
+            self.scraping_queue.put(('error', 'Could not start the scraper daemon'))
+            return False
+        reply = self.client.request('start')
+        return bool(reply and reply.get('started'))
         
     def stop_scraping(self):
-        """Stop the scraping process"""
-        if self.scraper and self.scraping_thread and self.scraping_thread.is_alive():
-            self.scraper.stop()
-            self.scraping_thread.join(timeout=5)
-            return True
-        return False
+        """Ask the scraper daemon to stop scraping"""
+        reply = self.client.request('stop')
+        return bool(reply and reply.get('stopped'))
         
-    def _run_scraping(self):
-        """Run the scraping process and update status"""
-        try:
-            self.scraper.scrape()
-            self.scraping_queue.put(('success', 'Scraping completed successfully'))
-        except Exception as e:
-            self.scraping_queue.put(('error', str(e)))
+    def refresh_status(self) -> Dict[str, Any]:
+        """Fetch the daemon status once per render and queue the result of a finished run once
+        
+        get_status(), get_breaker_states() and the scraper's getters read from this reply.
+        """
+        status = self.scraper.refresh()
+        result = status.get('last_result')
+        if result and result.get('at') != self._last_result_at:
+            self._last_result_at = result['at']
+            self.scraping_queue.put((result['type'], result['message']))
+        return status
             
     def get_status(self):
         """Get current scraping status"""
-        if self.scraping_thread and self.scraping_thread.is_alive():
-            return 'Running'
-        return 'Stopped'
+        return self.scraper.status.get('status', 'Stopped')
+        
+    def get_breaker_states(self) -> List[Dict[str, Any]]:
+        """Get the circuit breaker state and request latency of every source host"""
+        return self.scraper.status.get('source_health', [])
+        
+    def show_source_health(self):
+        """Render the Source Health table, if the daemon reported any hosts"""
+        breaker_states = self.get_breaker_states()
+        if breaker_states:
+            st.subheader("Source Health")
+            st.table(breaker_states)
         
     def run_ui(self):
         """Run the Streamlit UI"""
@@ -380,6 +396,16 @@ class ScraperManager:
                 value=self.config.get('use_glassdoor', True),
                 help="Include Glassdoor in the search"
             )
+            self.config['use_builtin'] = st.checkbox(
+                "Use BuiltIn",
+                value=self.config.get('use_builtin', True),
+                help="Include BuiltIn in the search"
+            )
+            self.config['use_welcometothejungle'] = st.checkbox(
+                "Use Welcome to the Jungle",
+                value=self.config.get('use_welcometothejungle', True),
+                help="Include Welcome to the Jungle in the search"
+            )
         
         # Scraping Settings
         st.subheader("Scraping Settings")
@@ -426,6 +452,7 @@ class ScraperManager:
                     
         # Status Display
         st.header("Status")
+        self.refresh_status()
         status = self.get_status()
         if status == 'Running':
             st.info("🟢 Scraping is currently running")
@@ -438,11 +465,16 @@ class ScraperManager:
                 msg_type, message = self.scraping_queue.get_nowait()
                 if msg_type == 'success':
                     st.success(message)
+                elif msg_type == 'info':
+                    st.info(message)
                 else:
                     st.error(message)
         except queue.Empty:
             pass
             
+        # Source health
+        self.show_source_health()
+            
         # Statistics
         st.header("Statistics")
         if self.scraper:
@@ -454,6 +486,14 @@ class ScraperManager:
                 st.metric("Last Updated", stats.get('last_updated', 'Never'))
             with col3:
                 st.metric("Sources", len(stats.get('sources', {})))
+            last_run = stats.get('last_run')
+            if last_run:
+                resumed = " (resumed from checkpoint)" if last_run.get('resumed') else ""
+                st.caption(
+                    f"Last run finished {last_run['finished']}{resumed}: {last_run['new_jobs']} new jobs, "
+                    f"{last_run['tasks_skipped']} of {last_run['tasks']} searches already done, "
+                    f"{last_run.get('pages_unchanged', 0)} pages skipped as unchanged"
+                )
                 
         # Job Sources Distribution
         if self.scraper and stats.get('sources'):
@@ -0,0 +1,163 @@
+"""
+Search task planning and scheduling.
+
+The planner expands the config's keywords x locations x enabled job boards into
+deduplicated SearchTasks (a board whose listing ignores the search terms gets a
+single task) and orders them so stale, productive searches run first.
+The scheduler runs them on a worker pool while capping how many tasks hit the
+same source at once.
+"""
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from datetime import datetime
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
+
+from loguru import logger
+
+from cancellation import CancellationToken, CancelledError
+from high_water_marks import HighWaterMarks
+from job_boards import BOARD_SPECS
+
+# Config flag enabling each job board
+SOURCE_FLAGS = {
+    'dice': 'use_dice',
+    'builtin': 'use_builtin',
+    'welcometothejungle': 'use_welcometothejungle',
+    'techstars': 'use_techstars'
+}
+
+
+class SearchTask(NamedTuple):
+    """One keyword/location search on one source"""
+    source: str
+    keyword: str
+    location: str
+
+    @property
+    def key(self) -> str:
+        return HighWaterMarks.key(self.source, self.keyword, self.location)
+
+
+def enabled_sources(config: Dict[str, Any]) -> List[str]:
+    """Job boards enabled in the config"""
+    sources = [source for source, flag in SOURCE_FLAGS.items() if config.get(flag)]
+    unsupported = [
+        flag for flag in ('use_linkedin', 'use_indeed', 'use_glassdoor', 'use_monster')
+        if config.get(flag)
+    ]
+    if unsupported:
+        logger.debug(f"No listing scraper for {', '.join(unsupported)}; skipping")
+    return [source for source in sources if source in BOARD_SPECS]
+
+
+class TaskPlanner:
+    """Expand the search config into prioritized search tasks"""
+
+    def __init__(self, marks: HighWaterMarks):
+        self.marks = marks
+
+    def priority(self, task: SearchTask) -> float:
+        """Hours since the last crawl, weighted by how many new postings it found"""
+        mark = self.marks.get(task.key)
+        if not mark.get('last_crawl'):
+            return float('inf')
+        staleness = (datetime.now() - datetime.fromisoformat(mark['last_crawl'])).total_seconds() / 3600
+        return staleness * (1 + mark.get('last_new', 0))
+
+    def plan(self, config: Dict[str, Any]) -> List[SearchTask]:
+        """Build deduplicated search tasks, highest priority first"""
+        keywords = [k.strip() for k in config.get('keywords', []) if k and k.strip()]
+        locations = [l.strip() for l in config.get('locations', []) if l and l.strip()]
+        tasks = {}
+        for source in enabled_sources(config):
+            if keywords and locations and '{query}' not in BOARD_SPECS[source]['search_url']:
+                # The board serves one generic listing: fetch it once and let JobFilter match it
+                task = SearchTask(source, '', '')
+                tasks.setdefault(task.key, task)
+                continue
+            for keyword in keywords:
+                for location in locations:
+                    task = SearchTask(source, keyword, location)
+                    tasks.setdefault(task.key, task)
+        return sorted(tasks.values(), key=self.priority, reverse=True)
+
+
+def check_source_limits(source_limits: Dict[str, int]):
+    """Raise ValueError for a per-source limit that would keep its tasks from ever starting"""
+    invalid = {source: limit for source, limit in source_limits.items()
+               if not isinstance(limit, int) or limit < 1}
+    if invalid:
+        raise ValueError(f"Source concurrency limits must be at least 1: {invalid}")
+
+
+class TaskScheduler:
+    """Run tasks on a worker pool with a concurrency cap per source"""
+
+    def __init__(self, max_workers: int = 8, source_limits: Optional[Dict[str, int]] = None,
+                 default_source_limit: int = 2):
+        if max_workers < 1 or default_source_limit < 1:
+            raise ValueError("max_workers and default_source_limit must be at least 1")
+        self.max_workers = max_workers
+        self.source_limits = source_limits or {}
+        self.default_source_limit = default_source_limit
+
+    @property
+    def source_limits(self) -> Dict[str, int]:
+        return self._source_limits
+
+    @source_limits.setter
+    def source_limits(self, source_limits: Dict[str, int]):
+        check_source_limits(source_limits)
+        self._source_limits = source_limits
+
+    def _limit(self, source: str) -> int:
+        return self.source_limits.get(source, self.default_source_limit)
+
+    def run(self, tasks: List[SearchTask], run_task: Callable[[SearchTask], Any],
+            cancel_token: Optional[CancellationToken] = None) -> Dict[SearchTask, Any]:
+        """Run tasks in priority order and return their results
+
+        Once cancel_token is cancelled no further tasks are started. Running tasks
+        are waited for, since they stop at their next cancellation check and may
+        still be storing what they collected; only tasks that finished before the
+        cancel have results.
+        """
+        pending = list(tasks)
+        running = {}
+        active = defaultdict(int)
+        results = {}
+
+        executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        try:
+            while pending or running:
+                if cancel_token is not None and cancel_token.cancelled:
+                    logger.info(f"Cancelled with {len(pending)} tasks not started")
+                    break
+                # Start the highest priority tasks whose source has a free slot
+                for task in list(pending):
+                    if len(running) >= self.max_workers:
+                        break
+                    if active[task.source] < self._limit(task.source):
+                        pending.remove(task)
+                        active[task.source] += 1
+                        running[executor.submit(run_task, task)] = task
+
+                waiting = list(running)
+                if cancel_token is not None:
+                    waiting.append(cancel_token.future)
+                done, _ = wait(waiting, return_when=FIRST_COMPLETED)
+                for future in done:
+                    if future not in running:
+                        continue
+                    task = running.pop(future)
+                    active[task.source] -= 1
+                    try:
+                        results[task] = future.result()
+                    except CancelledError:
+                        results[task] = None
+                    except Exception as e:
+                        logger.error(f"Error running {task}: {e}")
+                        results[task] = None
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+        return results
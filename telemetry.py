@@ -0,0 +1,161 @@
+"""
+Counters, gauges and rolling rates describing a scrape run as it happens.
+
+Every stage of the pipeline reports into the shared `telemetry` registry: the
+fetcher records request latency and errors per host, the paginator the pages and
+postings it found, and the filter and storage stages the postings that matched
+and were saved. Updates take no locks. Counters add to a cell owned by the
+calling thread and are only summed when read, gauges are plain attribute writes,
+and rolling rates and latency samples are appended to bounded deques. That keeps
+the overhead to a few attribute operations per event, so telemetry stays on in
+every run.
+"""
+import math
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, List, Optional
+
+
+class Counter:
+    """Monotonic counter; each thread adds to its own cell so updates never contend"""
+
+    def __init__(self):
+        self._local = threading.local()
+        self._cells: List[List[int]] = []
+
+    def add(self, n: int = 1):
+        cell = getattr(self._local, 'cell', None)
+        if cell is None:
+            cell = self._local.cell = [0]
+            self._cells.append(cell)
+        cell[0] += n
+
+    @property
+    def value(self) -> int:
+        return sum(cell[0] for cell in self._cells)
+
+
+class Gauge:
+    """Last value set"""
+
+    def __init__(self, value: float = 0):
+        self.value = value
+
+    def set(self, value: float):
+        self.value = value
+
+
+class RollingRate:
+    """Events per minute over a sliding time window"""
+
+    def __init__(self, window_seconds: float = 60, max_events: int = 10000):
+        self.window_seconds = window_seconds
+        self.started = time.monotonic()
+        self._events = deque(maxlen=max_events)
+
+    def add(self, n: int = 1):
+        self._events.append((time.monotonic(), n))
+
+    def per_minute(self) -> float:
+        now = time.monotonic()
+        cutoff = now - self.window_seconds
+        total = sum(n for at, n in list(self._events) if at >= cutoff)
+        # Early in a run the window is not full yet
+        span = min(self.window_seconds, now - self.started)
+        return total * 60 / span if span > 0 else 0.0
+
+
+class LatencySamples:
+    """Most recent latency samples of one source"""
+
+    def __init__(self, max_samples: int = 1000):
+        self.count = Counter()
+        self._samples = deque(maxlen=max_samples)
+
+    def record(self, seconds: float):
+        self.count.add()
+        self._samples.append(seconds)
+
+    def percentiles(self, points=(50, 95, 99)) -> Dict[str, Optional[float]]:
+        samples = sorted(self._samples)
+        if not samples:
+            return {f"p{p}": None for p in points}
+        # Nearest-rank percentiles
+        return {
+            f"p{p}": samples[min(len(samples) - 1, max(0, math.ceil(p / 100 * len(samples)) - 1))]
+            for p in points
+        }
+
+
+class Telemetry:
+    """Registry of the metrics of the current scrape run"""
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        """Start a new run"""
+        self.start_time = time.time()
+        self._started = time.monotonic()
+        self._counters: Dict[str, Counter] = {}
+        self._gauges: Dict[str, Gauge] = {}
+        self._rates: Dict[str, RollingRate] = {}
+        self._latencies: Dict[str, LatencySamples] = {}
+
+    # Metrics are created on first use; setdefault keeps a single winner if two
+    # threads race to create the same one
+    def counter(self, name: str) -> Counter:
+        metric = self._counters.get(name)
+        return metric if metric is not None else self._counters.setdefault(name, Counter())
+
+    def gauge(self, name: str) -> Gauge:
+        metric = self._gauges.get(name)
+        return metric if metric is not None else self._gauges.setdefault(name, Gauge())
+
+    def rate(self, name: str) -> RollingRate:
+        metric = self._rates.get(name)
+        return metric if metric is not None else self._rates.setdefault(name, RollingRate())
+
+    def latency(self, source: str) -> LatencySamples:
+        metric = self._latencies.get(source)
+        return metric if metric is not None else self._latencies.setdefault(source, LatencySamples())
+
+    def count(self, name: str, n: int = 1):
+        """Add to a counter and its rolling rate"""
+        self.counter(name).add(n)
+        self.rate(name).add(n)
+
+    def value(self, name: str) -> int:
+        metric = self._counters.get(name)
+        return metric.value if metric is not None else 0
+
+    @property
+    def elapsed(self) -> float:
+        return time.monotonic() - self._started
+
+    def latency_snapshot(self) -> List[Dict[str, Any]]:
+        """Request count and latency percentiles per source, in seconds"""
+        rows = []
+        for source in sorted(self._latencies):
+            samples = self._latencies[source]
+            row = {'source': source, 'requests': samples.count.value}
+            row.update({
+                name: None if value is None else round(value, 3)
+                for name, value in samples.percentiles().items()
+            })
+            rows.append(row)
+        return rows
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Current value of every metric"""
+        return {
+            'counters': {name: metric.value for name, metric in self._counters.items()},
+            'gauges': {name: metric.value for name, metric in self._gauges.items()},
+            'rates_per_minute': {name: round(metric.per_minute(), 2) for name, metric in self._rates.items()},
+            'latency': self.latency_snapshot()
+        }
+
+
+# Shared by every stage in the process
+telemetry = Telemetry()
@@ -0,0 +1,57 @@
+import threading
+
+import pytest
+
+from cancellation import CancellationToken, CancelledError
+from job_boards import Listing
+from job_scraper import JobScraper, JobStorage
+from pagination import Paginator
+from task_planner import SearchTask
+
+
+def test_cancelled_pagination_returns_the_finished_pages():
+    token = CancellationToken()
+    release = threading.Event()
+
+    def fetch(url):
+        page = int(url)
+        if page > 2:
+            # Later pages hang until the test ends
+            release.wait(5)
+        return url
+
+    def on_page(page, jobs):
+        if page == 2:
+            token.cancel()
+
+    paginator = Paginator(
+        fetch=fetch,
+        parse=lambda html, page: [{'url': f'{page}-{n}'} for n in range(10)],
+        max_results=100, per_page=10, max_in_flight=1,
+        on_page=on_page, cancel_token=token
+    )
+    try:
+        with pytest.raises(CancelledError) as error:
+            paginator.run(str)
+    finally:
+        release.set()
+    assert [job['url'] for job in error.value.partial] == [f'{page}-{n}' for page in (1, 2) for n in range(10)]
+
+
+def test_stopped_task_stores_what_it_parsed(tmp_path, monkeypatch):
+    config = {'use_dice': True, 'parse_workers': 0, 'keywords': ['engineer'], 'locations': ['remote']}
+    scraper = JobScraper(config, storage_dir=str(tmp_path))
+    job = {'title': 'Engineer', 'company': 'Acme', 'location': 'Remote',
+           'url': 'https://example.com/1'}
+
+    def stopped(*args):
+        crawl = {'key': 'dice', 'full_crawl': False, 'seen': None, 'fingerprints': None}
+        raise CancelledError(partial=Listing([job], crawl))
+
+    monkeypatch.setattr(scraper, 'scrape_board', stopped)
+    try:
+        with pytest.raises(CancelledError):
+            scraper._run_task(SearchTask('dice', 'python', 'Remote'))
+    finally:
+        scraper.close()
+    assert [saved['url'] for saved in JobStorage(str(tmp_path)).jobs] == [job['url']]
@@ -0,0 +1,146 @@
+import asyncio
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from career_discovery import CAREERS_PAGE_NONE, CareerDiscovery, CareersPageProber
+from vc_firms import ATS_FEEDS
+
+
+def serve(routes, head_status=None):
+    """Start a local server for `routes` ({path: (status, body)}); HEAD answers head_status if set"""
+
+    class Handler(BaseHTTPRequestHandler):
+        def _respond(self, with_body):
+            status, body = routes.get(self.path, (404, ''))
+            if callable(body):
+                body = body()
+            if not with_body and head_status is not None:
+                status = head_status
+            self.send_response(status)
+            self.send_header('Content-Length', str(len(body.encode())))
+            self.end_headers()
+            if with_body:
+                self.wfile.write(body.encode())
+
+        def do_GET(self):
+            self._respond(True)
+
+        def do_HEAD(self):
+            self._respond(False)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f'http://127.0.0.1:{server.server_port}'
+
+
+@pytest.fixture
+def site():
+    routes = {}
+    server, base = serve(routes)
+    routes.update({
+        '/robots.txt': (200, f'User-agent: *\nDisallow: /private\nSitemap: {base}/sitemap-index.xml\n'),
+        '/sitemap-index.xml': (200, (
+            '<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">'
+            f'<sitemap><loc>{base}/private/sitemap.xml</loc></sitemap>'
+            f'<sitemap><loc>{base}/sitemap-pages.xml</loc></sitemap>'
+            '</sitemapindex>'
+        )),
+        '/sitemap-pages.xml': (200, (
+            '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">'
+            f'<url><loc>{base}/about</loc></url>'
+            f'<url><loc>{base}/careers</loc></url>'
+            '</urlset>'
+        )),
+        '/careers': (200, '<script src="https://boards.greenhouse.io/embed/job_board/js?for=acme"></script>'),
+        '/feeds/acme': (200, json.dumps({'jobs': [
+            {'title': 'Engineer', 'location': {'name': 'Remote'},
+             'absolute_url': 'https://boards.greenhouse.io/acme/jobs/1', 'updated_at': '2024-01-02'}
+        ]})),
+        '/boards/acme': (200, (
+            '<div class="opening"><a class="opening-title" href="/acme/jobs/2">Designer</a>'
+            '<span class="location">NYC</span></div>'
+        )),
+    })
+    yield routes, base
+    server.shutdown()
+
+
+def discovery(tmp_path, base, feed_path='/feeds/{board}'):
+    feeds = {'greenhouse.io': dict(ATS_FEEDS['greenhouse.io'],
+                                   feed_url=base + feed_path, board_url=base + '/boards/{board}')}
+    return CareerDiscovery(storage_dir=str(tmp_path), ats_feeds=feeds, timeout=5)
+
+
+def test_discovers_ats_feed_through_robots_and_sitemaps(tmp_path, site):
+    routes, base = site
+    result = discovery(tmp_path, base).discover(base)
+    assert result['careers_urls'] == [f'{base}/careers']
+    assert result['ats'] == {'platform': 'greenhouse.io', 'board': {'board': 'acme'}}
+
+    jobs = discovery(tmp_path, base).fetch_jobs(base, 'Acme')
+    assert [(job['title'], job['location'], job['company'], job['source']) for job in jobs] == [
+        ('Engineer', 'Remote', 'Acme', 'Greenhouse')
+    ]
+
+
+def test_unreadable_feed_falls_back_to_the_hosted_board_page(tmp_path, site):
+    routes, base = site
+    jobs = discovery(tmp_path, base, feed_path='/missing/{board}').fetch_jobs(base, 'Acme')
+    assert [(job['title'], job['location'], job['company']) for job in jobs] == [('Designer', 'NYC', 'Acme')]
+
+
+def test_probed_careers_page_is_checked_for_an_ats_board(tmp_path, site):
+    routes, base = site
+    del routes['/robots.txt']
+    routes['/sitemap.xml'] = (404, '')
+    routes['/work-here'] = routes.pop('/careers')
+    assert discovery(tmp_path, base).discover(base)['ats'] is None
+
+    result = discovery(tmp_path, base).discover(base, refresh=True, careers_page=f'{base}/work-here')
+    assert result['ats']['board'] == {'board': 'acme'}
+
+
+def test_prober_uses_get_when_head_is_rejected():
+    server, base = serve({'/jobs': (200, 'Open roles')}, head_status=405)
+    try:
+        prober = CareersPageProber(paths=['/careers', '/jobs'], timeout=5)
+        assert asyncio.run(prober.probe_all([base])) == {base: f'{base}/jobs'}
+    finally:
+        server.shutdown()
+
+
+def test_collect_jobs_discovers_companies_without_a_probed_page(tmp_path):
+    from job_scraper import VCPortfolioCompany, init_db
+    from portfolio_crawler import PortfolioCrawler
+
+    Session = init_db(f'sqlite:///{tmp_path}/jobs.db')
+    with Session() as session:
+        session.add_all([
+            VCPortfolioCompany(name='Acme', website='https://acme.test', vc_firm='Firm'),
+            VCPortfolioCompany(name='Globex', website='https://globex.test', vc_firm='Firm'),
+        ])
+        session.commit()
+
+        class Prober:
+            def probe_companies(self, db_session, companies):
+                for company in companies:
+                    company.careers_page = ('https://acme.test/careers' if company.name == 'Acme'
+                                            else CAREERS_PAGE_NONE)
+
+        class Discovery:
+            calls = []
+
+            def fetch_jobs(self, website, company, careers_page):
+                self.calls.append((company, careers_page))
+                return [{'title': 'Engineer', 'company': company}]
+
+        jobs = PortfolioCrawler(firms=[]).collect_jobs(session, Discovery(), Prober())
+    assert sorted(Discovery.calls) == [('Acme', 'https://acme.test/careers'), ('Globex', None)]
+    assert sorted(job['company'] for job in jobs) == ['Acme', 'Globex']
+    assert all(job['vc_firm'] == 'Firm' for job in jobs)
@@ -0,0 +1,35 @@
+from checkpoint import RunCheckpoint
+
+CONFIG = {'keywords': ['python'], 'locations': ['remote'], 'use_dice': True}
+
+
+def test_interrupted_run_resumes_from_its_saved_pages(tmp_path):
+    checkpoint = RunCheckpoint(storage_dir=str(tmp_path))
+    assert not checkpoint.start(CONFIG)
+    checkpoint.complete_task('dice|python|berlin')
+    checkpoint.record_page('dice|python|remote', 1, [{'url': 'https://example.com/1'}])
+    checkpoint.record_page('dice|python|remote', 2, [{'url': 'https://example.com/2'}])
+    checkpoint.flush()
+    # The process dies here without finish()
+
+    resumed = RunCheckpoint(storage_dir=str(tmp_path))
+    assert resumed.start(CONFIG)
+    assert resumed.is_completed('dice|python|berlin')
+    assert resumed.pages('dice|python|remote') == {
+        1: [{'url': 'https://example.com/1'}],
+        2: [{'url': 'https://example.com/2'}],
+    }
+
+    resumed.finish()
+    assert not RunCheckpoint(storage_dir=str(tmp_path)).start(CONFIG)
+
+
+def test_changed_config_starts_over(tmp_path):
+    checkpoint = RunCheckpoint(storage_dir=str(tmp_path))
+    checkpoint.start(CONFIG)
+    checkpoint.complete_task('dice|python|remote')
+    checkpoint.flush()
+
+    fresh = RunCheckpoint(storage_dir=str(tmp_path))
+    assert not fresh.start({**CONFIG, 'keywords': ['rust']})
+    assert not fresh.is_completed('dice|python|remote')
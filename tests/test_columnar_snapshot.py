@@ -0,0 +1,39 @@
+import columnar_snapshot
+from columnar_snapshot import MAX_SEGMENTS, ColumnarSnapshot
+
+
+def make_job(n):
+    return {'title': f'Engineer {n}', 'company': f'Company {n % 3}', 'source': 'Dice',
+            'location': 'Remote', 'date_posted': '2024-01-02', 'url': f'https://example.com/{n}'}
+
+
+def test_appends_read_back_as_one_frame(tmp_path):
+    snapshot = ColumnarSnapshot(str(tmp_path))
+    snapshot.append([make_job(0), make_job(1)])
+    snapshot.append([make_job(2)])
+    frame = ColumnarSnapshot(str(tmp_path)).read_frame(columns=['company', 'url'])
+    assert list(frame.columns) == ['company', 'url']
+    assert list(frame['url']) == [make_job(n)['url'] for n in range(3)]
+    assert list(frame['company']) == ['Company 0', 'Company 1', 'Company 2']
+
+
+def test_compaction_retires_segments_for_readers_of_the_old_manifest(tmp_path, monkeypatch):
+    writer = ColumnarSnapshot(str(tmp_path))
+    for n in range(MAX_SEGMENTS):
+        writer.append([make_job(n)])
+    reader = ColumnarSnapshot(str(tmp_path))
+    old_ids = [entry['id'] for entry in reader.manifest['segments']]
+
+    # One more segment compacts them all; the old files stay for the reader
+    writer.append([make_job(MAX_SEGMENTS)])
+    assert len(writer.manifest['segments']) == 1
+    assert sorted(entry['id'] for entry in writer.manifest['retired']) == old_ids + [MAX_SEGMENTS]
+    assert list(reader.read_frame(columns=['url'])['url']) == [make_job(n)['url'] for n in range(MAX_SEGMENTS)]
+
+    # Ids are never reused and retired files go once they are old enough
+    monkeypatch.setattr(columnar_snapshot, 'RETIRE_SECONDS', -1)
+    writer.append([make_job(MAX_SEGMENTS + 1)])
+    assert writer.manifest['retired'] == []
+    assert not list(tmp_path.joinpath('snapshot').glob(f'{old_ids[0]:06d}.*'))
+    assert writer.manifest['segments'][-1]['id'] > max(old_ids)
+    assert len(ColumnarSnapshot(str(tmp_path)).read_frame(columns=['url'])) == MAX_SEGMENTS + 2
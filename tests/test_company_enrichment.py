@@ -0,0 +1,36 @@
+import pytest
+
+from company_enrichment import CompanyEnricher
+from job_scraper import Company, init_db
+
+
+class FakeScraper:
+    def __init__(self):
+        self.searches = []
+
+    def find_company_url(self, name):
+        self.searches.append(name)
+        return f'https://www.crunchbase.com/organization/{name.split()[0].lower()}'
+
+    def scrape_company_info(self, url):
+        return {'name': 'Acme Corporation', 'website': 'https://acme.test', 'employee_count': 50}
+
+
+def test_refresh_keeps_the_stored_company_name(tmp_path):
+    Session = init_db(f'sqlite:///{tmp_path}/jobs.db')
+    enricher = CompanyEnricher(Session, scraper=FakeScraper(), ttl_hours=0)
+    try:
+        assert enricher.get('Acme')['employee_count'] == 50
+        # An alias of the same company refreshes the row without renaming it
+        with Session() as session:
+            enricher._store(session, 'Acme, Inc.', {'employee_count': 60})
+    finally:
+        enricher.close()
+    with Session() as session:
+        rows = session.query(Company).all()
+    assert [(row.name, row.employee_count) for row in rows] == [('Acme', 60)]
+
+
+def test_enricher_without_a_driver_is_a_configuration_error(tmp_path):
+    with pytest.raises(ValueError):
+        CompanyEnricher(init_db(f'sqlite:///{tmp_path}/jobs.db'))
@@ -0,0 +1,72 @@
+import json
+
+import pytest
+
+from job_scraper import JobStorage
+
+
+def make_job(n):
+    return {
+        'title': f'Engineer {n}',
+        'company': f'Company {n}',
+        'location': 'Remote',
+        'url': f'https://example.com/jobs/{n}',
+        'source': 'Dice',
+        'category': 'software',
+    }
+
+
+def test_failed_write_keeps_batch_for_retry(tmp_path, monkeypatch):
+    storage = JobStorage(str(tmp_path))
+    storage.save_jobs([make_job(0)])
+
+    append_jobs = storage._append_jobs
+    failures = []
+
+    def fail_once(jobs):
+        if not failures:
+            failures.append(jobs)
+            raise OSError('disk full')
+        append_jobs(jobs)
+
+    monkeypatch.setattr(storage, '_append_jobs', fail_once)
+    batch = [make_job(1), make_job(2)]
+    with pytest.raises(OSError):
+        storage.save_jobs(batch)
+
+    # Nothing from the failed batch is recorded in memory or on disk
+    assert len(storage.jobs) == 1
+    assert storage.stats['total_jobs'] == 1
+    assert len(json.loads(storage.jobs_file.read_text())) == 1
+
+    assert storage.save_jobs(batch) == 2
+    reloaded = JobStorage(str(tmp_path))
+    assert [job['url'] for job in reloaded.jobs] == [make_job(n)['url'] for n in range(3)]
+    assert reloaded.stats['total_jobs'] == 3
+    assert reloaded.stats['sources'] == {'Dice': 3}
+
+
+def test_duplicates_within_a_batch_are_saved_once(tmp_path):
+    storage = JobStorage(str(tmp_path))
+    assert storage.save_jobs([make_job(1), make_job(1), make_job(2)]) == 2
+    assert storage.save_jobs([make_job(2)]) == 0
+    assert len(JobStorage(str(tmp_path)).jobs) == 2
+
+
+def test_appended_batches_keep_the_json_dump_layout(tmp_path):
+    storage = JobStorage(str(tmp_path))
+    storage.save_jobs([make_job(0), make_job(1)])
+    storage.save_jobs([make_job(2)])
+    storage.save_jobs([make_job(3), make_job(4)])
+    expected = json.dumps([make_job(n) for n in range(5)], indent=2)
+    assert storage.jobs_file.read_text() == expected
+
+
+def test_snapshot_is_refreshed_once_per_run(tmp_path):
+    storage = JobStorage(str(tmp_path))
+    storage.save_jobs([make_job(0)])
+    storage.save_jobs([make_job(1)])
+    assert storage.snapshot.rows == 0
+    storage.refresh_snapshot()
+    assert storage.snapshot.rows == 2
+    assert len(storage.snapshot.manifest['segments']) == 1
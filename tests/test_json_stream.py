@@ -0,0 +1,17 @@
+import io
+import json
+
+import pytest
+
+from json_stream import iter_json_array
+
+
+def test_elements_survive_chunk_boundaries():
+    jobs = [{'title': 'Engineer, "Platform"', 'tags': ['a', ']', '{']}, 3, None, 'x' * 50]
+    assert list(iter_json_array(io.StringIO(json.dumps(jobs, indent=2)), chunk_size=7)) == jobs
+
+
+@pytest.mark.parametrize('text', ['[1, 2,]', '[1, 2', '{"a": 1}', '[1 2]'])
+def test_malformed_arrays_raise_value_error(text):
+    with pytest.raises(ValueError):
+        list(iter_json_array(io.StringIO(text), chunk_size=4))
@@ -0,0 +1,15 @@
+from high_water_marks import HighWaterMarks
+from task_planner import SearchTask, TaskPlanner
+
+
+def test_generic_listing_boards_get_one_task_per_run(tmp_path):
+    planner = TaskPlanner(HighWaterMarks(storage_dir=str(tmp_path)))
+    tasks = planner.plan({
+        'keywords': ['python', 'data engineer'],
+        'locations': ['Remote', 'Berlin'],
+        'use_dice': True,
+        'use_techstars': True,
+    })
+
+    assert [task for task in tasks if task.source == 'techstars'] == [SearchTask('techstars', '', '')]
+    assert len([task for task in tasks if task.source == 'dice']) == 4
@@ -0,0 +1,26 @@
+import time
+
+from work_queue import SQLiteWorkQueue
+
+
+def test_only_the_current_lease_owner_can_ack(tmp_path):
+    queue = SQLiteWorkQueue(str(tmp_path / 'queue.db'))
+    queue.publish([{'key': 'dice|python|remote'}])
+
+    task_id, payload = queue.claim('worker-a', lease_seconds=0.05)
+    assert payload == {'key': 'dice|python|remote'}
+    assert not queue.ack(task_id, 'worker-b', [{'url': 'https://example.com/stolen'}])
+
+    # The lease runs out and another worker reclaims the task
+    time.sleep(0.1)
+    assert queue.claim('worker-b', lease_seconds=30)[0] == task_id
+    assert not queue.extend(task_id, 'worker-a', 30)
+    assert not queue.ack(task_id, 'worker-a', [{'url': 'https://example.com/late'}])
+    assert queue.ack(task_id, 'worker-b', [{'url': 'https://example.com/1'}], crawl={'key': payload['key']})
+
+    batch = queue.read_results()
+    assert batch.jobs == [{'url': 'https://example.com/1'}]
+    assert batch.crawls == [{'key': 'dice|python|remote'}]
+    queue.delete_results(batch)
+    assert queue.read_results() is None
+    assert queue.stats() == {'results': 0, 'crawls': 0}
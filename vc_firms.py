@@ -161,26 +161,123 @@ CAREERS_PAGE_PATHS = [
     "/job-openings"
 ]
 
-# Common job board platforms used by startups
+# Common job board platforms used by startups, as extractor selector specs
+# (see extractors.py) for their hosted board pages. CareerDiscovery falls back to
+# these when a platform's ATS_FEEDS feed cannot be read.
 JOB_BOARD_PLATFORMS = {
     "greenhouse.io": {
-        "job_selector": "div.opening",
-        "title_selector": "a.opening-title",
-        "location_selector": "span.location"
+        "card": "div.opening",
+        "title": "a.opening-title",
+        "location": "span.location",
+        "url": "a.opening-title",
+        "url_prefix": "https://boards.greenhouse.io",
+        "source": "Greenhouse"
     },
     "lever.co": {
-        "job_selector": "div.posting",
-        "title_selector": "h5.posting-title",
-        "location_selector": "span.location"
+        "card": "div.posting",
+        "title": "h5.posting-title",
+        "location": "span.location",
+        "url": "a",
+        "url_prefix": "https://jobs.lever.co",
+        "source": "Lever"
     },
     "workday.com": {
-        "job_selector": "li.job-item",
-        "title_selector": "a.job-title",
-        "location_selector": "span.location"
+        "card": "li.job-item",
+        "title": "a.job-title",
+        "location": "span.location",
+        "url": "a.job-title",
+        "source": "Workday"
     },
     "ashbyhq.com": {
-        "job_selector": "div.job-posting",
-        "title_selector": "div.job-title",
-        "location_selector": "div.job-location"
+        "card": "div.job-posting",
+        "title": "div.job-title",
+        "location": "div.job-location",
+        "url": "a",
+        "url_prefix": "https://jobs.ashbyhq.com",
+        "source": "Ashby"
     }
-} 
\ No newline at end of file
+}
+
+# Structured job feeds exposed by ATS platforms, keyed like JOB_BOARD_PLATFORMS.
+# `board_patterns` find the board in career page links; their named groups fill
+# `feed_url`, `board_url` and `url_prefix`. `fields` map job keys to dotted paths
+# in each feed item. When a feed cannot be read, the hosted board page at
+# `board_url` is scraped with the platform's JOB_BOARD_PLATFORMS spec instead.
+# Feeds with a `total_path` are paged: the payload's `offset` is advanced by each
+# page's size until the reported total has been read.
+ATS_FEEDS = {
+    "greenhouse.io": {
+        "name": "Greenhouse",
+        "board_patterns": [
+            r"boards-api\.greenhouse\.io/v1/boards/(?P<board>[\w-]+)",
+            r"(?:boards|job-boards)\.greenhouse\.io/embed/job_board(?:/js)?\?for=(?P<board>[\w-]+)",
+            r"(?:boards|job-boards)\.greenhouse\.io/(?P<board>[\w-]+)"
+        ],
+        "feed_url": "https://boards-api.greenhouse.io/v1/boards/{board}/jobs?content=true",
+        "board_url": "https://boards.greenhouse.io/{board}",
+        "jobs_path": "jobs",
+        "fields": {
+            "title": "title",
+            "location": "location.name",
+            "url": "absolute_url",
+            "description": "content",
+            "date_posted": "updated_at"
+        }
+    },
+    "lever.co": {
+        "name": "Lever",
+        "board_patterns": [
+            r"api\.lever\.co/v0/postings/(?P<board>[\w.-]+)",
+            r"jobs\.lever\.co/(?P<board>[\w.-]+)"
+        ],
+        "feed_url": "https://api.lever.co/v0/postings/{board}?mode=json",
+        "board_url": "https://jobs.lever.co/{board}",
+        "jobs_path": None,
+        "fields": {
+            "title": "text",
+            "location": "categories.location",
+            "job_type": "categories.commitment",
+            "url": "hostedUrl",
+            "description": "descriptionPlain",
+            "date_posted": "createdAt"
+        },
+        "date_format": "epoch_ms"
+    },
+    "ashbyhq.com": {
+        "name": "Ashby",
+        "board_patterns": [
+            r"api\.ashbyhq\.com/posting-api/job-board/(?P<board>[\w.-]+)",
+            r"jobs\.ashbyhq\.com/(?P<board>[\w.-]+)"
+        ],
+        "feed_url": "https://api.ashbyhq.com/posting-api/job-board/{board}",
+        "board_url": "https://jobs.ashbyhq.com/{board}",
+        "jobs_path": "jobs",
+        "fields": {
+            "title": "title",
+            "location": "location",
+            "job_type": "employmentType",
+            "url": "jobUrl",
+            "description": "descriptionPlain",
+            "date_posted": "publishedAt"
+        }
+    },
+    "workday.com": {
+        "name": "Workday",
+        "board_patterns": [
+            r"(?P<tenant>[\w-]+)\.(?P<instance>wd\d+)\.myworkdayjobs\.com/(?:[a-z]{2}-[A-Z]{2}/)?(?P<site>[\w-]+)"
+        ],
+        "feed_url": "https://{tenant}.{instance}.myworkdayjobs.com/wday/cxs/{tenant}/{site}/jobs",
+        "board_url": "https://{tenant}.{instance}.myworkdayjobs.com/{site}",
+        "method": "POST",
+        # Workday serves at most 20 postings per request
+        "payload": {"appliedFacets": {}, "limit": 20, "offset": 0, "searchText": ""},
+        "jobs_path": "jobPostings",
+        "total_path": "total",
+        "fields": {
+            "title": "title",
+            "location": "locationsText",
+            "url": "externalPath"
+        },
+        "url_prefix": "https://{tenant}.{instance}.myworkdayjobs.com/{site}"
+    }
+}
@@ -0,0 +1,382 @@
+"""
+Durable work queue for distributing scrape tasks across worker processes.
+
+Tasks are published to a queue backend and claimed by any number of workers
+under a lease. A worker that crashes simply stops renewing its lease, and the
+task becomes claimable again once the lease expires, so every task is run at
+least once. A worker whose lease was lost cannot ack the task any more, so only
+the worker holding the lease hands back results.
+
+Workers only collect: they never open JobStorage or write marks, fingerprints,
+rollups or the snapshot. They hand matched postings back with the ack, together
+with the task's crawl state (see job_boards.record_crawl), and a single ingesting
+process moves them into JobStorage through the bulk save_jobs() path (which also
+drops the duplicates at-least-once delivery can produce). Results are only
+removed from the queue once they have been saved, and only then are the crawls
+recorded in the ingesting process's high-water marks and page fingerprints.
+
+SQLiteWorkQueue is the bundled backend. SQLite locking does not work over network
+filesystems, so its workers must run on the host that holds the database. Other
+backends implement WorkQueue.
+"""
+import argparse
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+from loguru import logger
+
+from circuit_breaker import retry_budget
+from job_boards import record_crawl
+from task_planner import SearchTask
+
+
+class ResultBatch(NamedTuple):
+    """Results read from a queue, removed with delete_results() once they are stored"""
+    last_result: int
+    jobs: List[Dict[str, Any]]
+    crawl_ids: List[int]
+    crawls: List[Dict[str, Any]]
+
+
+class WorkQueue(ABC):
+    """Interface for queue backends"""
+
+    @abstractmethod
+    def publish(self, tasks: List[Dict[str, Any]]) -> int:
+        """Add tasks, skipping ones already queued under the same key; returns how many were added"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def claim(self, worker_id: str, lease_seconds: float) -> Optional[Tuple[int, Dict[str, Any]]]:
+        """Lease the next available task, or return None if there is none"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def extend(self, task_id: int, worker_id: str, lease_seconds: float) -> bool:
+        """Renew a lease; returns False if the worker no longer holds it"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def ack(self, task_id: int, worker_id: str, results: Optional[List[Dict[str, Any]]] = None,
+            crawl: Optional[Dict[str, Any]] = None) -> bool:
+        """Complete a task and hand back its results and crawl state
+
+        Returns False, without storing anything, if the worker no longer holds the lease.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def nack(self, task_id: int, worker_id: str, error: str = ''):
+        """Release a failed task so it can be retried"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def read_results(self, limit: int = 1000) -> Optional[ResultBatch]:
+        """Return the oldest results without removing them, or None if there are none
+
+        The batch holds up to `limit` jobs and the crawls of the tasks whose jobs
+        are all in it or in earlier batches.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def delete_results(self, batch: ResultBatch):
+        """Remove a batch of results once it has been stored"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def stats(self) -> Dict[str, int]:
+        """Number of tasks per state"""
+        raise NotImplementedError
+
+
+class SQLiteWorkQueue(WorkQueue):
+    """Work queue stored in a SQLite database shared by all workers"""
+
+    def __init__(self, path: str = 'data/work_queue.db', max_attempts: int = 3):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_attempts = max_attempts
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.executescript('''
+                CREATE TABLE IF NOT EXISTS tasks (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    key TEXT NOT NULL,
+                    payload TEXT NOT NULL,
+                    state TEXT NOT NULL DEFAULT 'pending',
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    lease_owner TEXT,
+                    lease_expires REAL,
+                    last_error TEXT,
+                    created REAL NOT NULL
+                );
+                CREATE UNIQUE INDEX IF NOT EXISTS tasks_active_key
+                    ON tasks (key) WHERE state IN ('pending', 'leased');
+                CREATE INDEX IF NOT EXISTS tasks_state ON tasks (state, lease_expires);
+                CREATE TABLE IF NOT EXISTS results (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    task_id INTEGER NOT NULL,
+                    job TEXT NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS crawls (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    task_id INTEGER NOT NULL,
+                    last_result INTEGER NOT NULL,
+                    crawl TEXT NOT NULL
+                );
+            ''')
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def publish(self, tasks: List[Dict[str, Any]]) -> int:
+        conn = self._connect()
+        now = time.time()
+        with conn:
+            conn.execute('BEGIN IMMEDIATE')
+            before = conn.total_changes
+            conn.executemany(
+                'INSERT OR IGNORE INTO tasks (key, payload, created) VALUES (?, ?, ?)',
+                [(task['key'], json.dumps(task), now) for task in tasks]
+            )
+            return conn.total_changes - before
+
+    def claim(self, worker_id: str, lease_seconds: float) -> Optional[Tuple[int, Dict[str, Any]]]:
+        conn = self._connect()
+        now = time.time()
+        with conn:
+            conn.execute('BEGIN IMMEDIATE')
+            while True:
+                # Expired leases belong to crashed or stalled workers and are reclaimed here
+                row = conn.execute(
+                    '''SELECT id, payload, attempts FROM tasks
+                       WHERE state = 'pending' OR (state = 'leased' AND lease_expires < ?)
+                       ORDER BY id LIMIT 1''',
+                    (now,)
+                ).fetchone()
+                if row is None:
+                    return None
+                task_id, payload, attempts = row
+                if attempts < self.max_attempts:
+                    break
+                conn.execute(
+                    "UPDATE tasks SET state = 'failed', lease_owner = NULL WHERE id = ?", (task_id,)
+                )
+                logger.warning(f"Task {task_id} failed after {attempts} attempts")
+
+            conn.execute(
+                '''UPDATE tasks SET state = 'leased', attempts = attempts + 1,
+                   lease_owner = ?, lease_expires = ? WHERE id = ?''',
+                (worker_id, now + lease_seconds, task_id)
+            )
+            return task_id, json.loads(payload)
+
+    def extend(self, task_id: int, worker_id: str, lease_seconds: float) -> bool:
+        conn = self._connect()
+        with conn:
+            cursor = conn.execute(
+                '''UPDATE tasks SET lease_expires = ?
+                   WHERE id = ? AND state = 'leased' AND lease_owner = ?''',
+                (time.time() + lease_seconds, task_id, worker_id)
+            )
+            return cursor.rowcount == 1
+
+    def ack(self, task_id: int, worker_id: str, results: Optional[List[Dict[str, Any]]] = None,
+            crawl: Optional[Dict[str, Any]] = None) -> bool:
+        conn = self._connect()
+        with conn:
+            conn.execute('BEGIN IMMEDIATE')
+            cursor = conn.execute(
+                "DELETE FROM tasks WHERE id = ? AND state = 'leased' AND lease_owner = ?",
+                (task_id, worker_id)
+            )
+            if cursor.rowcount != 1:
+                # The lease expired and the task was claimed again; its new owner reports it
+                return False
+            conn.executemany(
+                'INSERT INTO results (task_id, job) VALUES (?, ?)',
+                [(task_id, json.dumps(job)) for job in results or []]
+            )
+            if crawl is not None:
+                last_result = conn.execute('SELECT COALESCE(MAX(id), 0) FROM results').fetchone()[0]
+                conn.execute(
+                    'INSERT INTO crawls (task_id, last_result, crawl) VALUES (?, ?, ?)',
+                    (task_id, last_result, json.dumps(crawl))
+                )
+            return True
+
+    def nack(self, task_id: int, worker_id: str, error: str = ''):
+        conn = self._connect()
+        with conn:
+            conn.execute(
+                '''UPDATE tasks SET state = 'pending', lease_owner = NULL, lease_expires = NULL,
+                   last_error = ? WHERE id = ? AND lease_owner = ?''',
+                (error[:1000], task_id, worker_id)
+            )
+
+    def read_results(self, limit: int = 1000) -> Optional[ResultBatch]:
+        conn = self._connect()
+        with conn:
+            # One snapshot for both tables, so no crawl is read without its results
+            conn.execute('BEGIN')
+            rows = conn.execute('SELECT id, job FROM results ORDER BY id LIMIT ?', (limit,)).fetchall()
+            last_result = rows[-1][0] if rows else 0
+            crawls = conn.execute(
+                'SELECT id, crawl FROM crawls WHERE last_result <= ? ORDER BY id', (last_result,)
+            ).fetchall()
+        if not rows and not crawls:
+            return None
+        return ResultBatch(
+            last_result=last_result,
+            jobs=[json.loads(job) for _, job in rows],
+            crawl_ids=[crawl_id for crawl_id, _ in crawls],
+            crawls=[json.loads(crawl) for _, crawl in crawls]
+        )
+
+    def delete_results(self, batch: ResultBatch):
+        conn = self._connect()
+        with conn:
+            conn.execute('BEGIN IMMEDIATE')
+            conn.execute('DELETE FROM results WHERE id <= ?', (batch.last_result,))
+            conn.executemany('DELETE FROM crawls WHERE id = ?', [(crawl_id,) for crawl_id in batch.crawl_ids])
+
+    def stats(self) -> Dict[str, int]:
+        conn = self._connect()
+        counts = dict(conn.execute('SELECT state, COUNT(*) FROM tasks GROUP BY state').fetchall())
+        counts['results'] = conn.execute('SELECT COUNT(*) FROM results').fetchone()[0]
+        counts['crawls'] = conn.execute('SELECT COUNT(*) FROM crawls').fetchone()[0]
+        return counts
+
+
+class QueueWorker:
+    """Claim scrape tasks from a queue and collect their postings with a JobScraper
+
+    The scraper is only used through collect(), which neither loads nor writes
+    JobStorage, marks or fingerprints.
+    """
+
+    def __init__(self, queue: WorkQueue, scraper, worker_id: Optional[str] = None,
+                 lease_seconds: float = 300, poll_seconds: float = 5):
+        self.queue = queue
+        self.scraper = scraper
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+        self.lease_seconds = lease_seconds
+        self.poll_seconds = poll_seconds
+        self.stop_event = threading.Event()
+
+    def _heartbeat(self, task_id: int, done: threading.Event):
+        """Renew the lease until the task finishes"""
+        while not done.wait(self.lease_seconds / 3):
+            if not self.queue.extend(task_id, self.worker_id, self.lease_seconds):
+                logger.warning(f"Lost lease on task {task_id}")
+                return
+
+    def run_one(self) -> bool:
+        """Claim and run a single task; returns False if the queue was empty"""
+        claimed = self.queue.claim(self.worker_id, self.lease_seconds)
+        if claimed is None:
+            return False
+        task_id, payload = claimed
+        task = SearchTask(payload['source'], payload['keyword'], payload['location'])
+        # A long-lived worker never starts a scrape run, so each task gets its own retry budget
+        retry_budget.reset()
+
+        done = threading.Event()
+        heartbeat = threading.Thread(target=self._heartbeat, args=(task_id, done), daemon=True)
+        heartbeat.start()
+        try:
+            jobs = self.scraper.collect(task)
+            if self.queue.ack(task_id, self.worker_id, jobs, jobs.crawl):
+                logger.info(f"{self.worker_id} completed {task} with {len(jobs)} matching jobs")
+            else:
+                logger.warning(f"{self.worker_id} lost the lease on {task}; dropped its results")
+        except Exception as e:
+            logger.error(f"{self.worker_id} failed {task}: {e}")
+            self.queue.nack(task_id, self.worker_id, str(e))
+        finally:
+            done.set()
+        return True
+
+    def run(self, drain: bool = False):
+        """Run tasks until stopped, or until the queue is empty when drain is set"""
+        while not self.stop_event.is_set():
+            if not self.run_one():
+                if drain:
+                    return
+                self.stop_event.wait(self.poll_seconds)
+
+
+def publish_tasks(queue: WorkQueue, tasks: List[SearchTask]) -> int:
+    """Publish planned SearchTasks to a queue"""
+    return queue.publish([dict(task._asdict(), key=task.key) for task in tasks])
+
+
+def ingest_results(queue: WorkQueue, storage, marks=None, fingerprints=None,
+                   batch_size: int = 1000) -> int:
+    """Move worker results into storage in bulk; returns how many jobs were new
+
+    A batch is removed from the queue only after save_jobs() stored it, and its
+    crawls are then recorded in `marks` and `fingerprints`. If saving raises, the
+    batch stays queued for the next ingest. The columnar snapshot is refreshed
+    once the queue is drained.
+    """
+    saved = 0
+    while True:
+        batch = queue.read_results(batch_size)
+        if batch is None:
+            if saved:
+                storage.refresh_snapshot()
+            return saved
+        if batch.jobs:
+            saved += storage.save_jobs(batch.jobs)
+        for crawl in batch.crawls:
+            record_crawl(crawl, marks, fingerprints)
+        if batch.crawls:
+            if marks is not None:
+                marks.save()
+            if fingerprints is not None:
+                fingerprints.save()
+        queue.delete_results(batch)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Distributed scrape task queue")
+    parser.add_argument("command", choices=["publish", "worker", "ingest", "stats"])
+    parser.add_argument("--queue", default="data/work_queue.db", help="SQLite queue path")
+    parser.add_argument("--config", default="config.json")
+    parser.add_argument("--lease-seconds", type=float, default=300)
+    parser.add_argument("--drain", action="store_true", help="Exit once the queue is empty")
+    args = parser.parse_args()
+
+    work_queue = SQLiteWorkQueue(args.queue)
+    if args.command == "stats":
+        print(work_queue.stats())
+    else:
+        from job_scraper import JobScraper
+
+        with open(args.config, 'r') as f:
+            config = json.load(f)
+        scraper = JobScraper(config)
+        if args.command == "publish":
+            added = publish_tasks(work_queue, scraper.planner.plan(config))
+            logger.info(f"Published {added} tasks")
+        elif args.command == "worker":
+            QueueWorker(work_queue, scraper, lease_seconds=args.lease_seconds).run(drain=args.drain)
+        else:
+            marks = scraper.marks if config.get('incremental', True) else None
+            saved = ingest_results(work_queue, scraper.storage, marks, scraper.fingerprints)
+            logger.info(f"Ingested {saved} new jobs")